@@ -0,0 +1,188 @@
+import asyncio
+import collections
+import os
+import time
+from typing import Optional
+
+import deadline
+from metrics import REGISTRY
+
+
+# Searches allowed to run at once per worker process
+MAX_IN_FLIGHT = int(os.getenv("NAVICA_MAX_INFLIGHT_SEARCHES", "4"))
+
+# Searches allowed to wait for a slot; beyond this they are shed with 503
+MAX_QUEUED = int(os.getenv("NAVICA_SEARCH_QUEUE_SIZE", "16"))
+
+# Longest a search waits for a slot (also capped by its request deadline)
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("NAVICA_SEARCH_QUEUE_TIMEOUT_SECONDS", "10"))
+
+# Searches that had to queue run in the cheaper degraded mode (set to 0 to disable)
+DEGRADE_QUEUED = os.getenv("NAVICA_DEGRADE_QUEUED_SEARCHES", "1") not in ("0", "false", "False")
+
+# Jobs returned by a degraded search (which also skips Gemini)
+DEGRADED_TARGET_RESULTS = int(os.getenv("NAVICA_DEGRADED_TARGET_RESULTS", "3"))
+
+ADMISSION_IN_FLIGHT = REGISTRY.gauge(
+    "navica_admission_in_flight",
+    "Searches currently running"
+)
+
+ADMISSION_QUEUE_DEPTH = REGISTRY.gauge(
+    "navica_admission_queue_depth",
+    "Searches waiting for a slot"
+)
+
+ADMISSION_QUEUE_WAIT = REGISTRY.histogram(
+    "navica_admission_queue_wait_seconds",
+    "Time admitted searches waited for a slot"
+)
+
+ADMISSION_SHED = REGISTRY.counter(
+    "navica_admission_shed_total",
+    "Searches rejected with 503 by reason (queue_full, queue_timeout)",
+    ("reason",)
+)
+
+ADMISSION_DEGRADED = REGISTRY.counter(
+    "navica_admission_degraded_total",
+    "Searches admitted in degraded mode after queueing"
+)
+
+
+class OverloadedError(Exception):
+    """The search was shed; `retry_after` is the suggested back-off in seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Server overloaded ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Admission:
+    """A granted slot. `degraded` is set when the search had to queue for it."""
+
+    __slots__ = ("controller", "degraded", "started", "released")
+
+    def __init__(self, controller: "AdmissionController", degraded: bool):
+        self.controller = controller
+        self.degraded = degraded
+        self.started = time.monotonic()
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.controller._finished(self)
+
+
+class AdmissionController:
+    """
+    Caps concurrent searches and keeps a bounded FIFO queue in front of them.
+
+    A search that finds a free slot runs immediately; otherwise it waits in the
+    queue until a slot frees up, its queue timeout or request deadline passes,
+    or it is rejected outright because the queue is full. Rejections carry a
+    Retry-After estimate from the recent service time. All state lives on the
+    event loop, so no locking is needed.
+    """
+
+    def __init__(self, max_in_flight: int, max_queued: int, queue_timeout: float, degrade_queued: bool = True):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queued = max(0, max_queued)
+        self.queue_timeout = queue_timeout
+        self.degrade_queued = degrade_queued
+        self.in_flight = 0
+        self._waiters: collections.deque = collections.deque()
+        # Decayed average of how long an admitted search holds its slot
+        self._service_time = 5.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up for a new arrival."""
+        backlog = (len(self._waiters) + 1) / self.max_in_flight
+        return max(1, int(round(backlog * self._service_time)))
+
+    async def acquire(self) -> Admission:
+        """
+        Waits for a slot.
+
+        Returns:
+            Admission to release when the search finishes
+
+        Raises:
+            OverloadedError: When the queue is full or the wait times out
+        """
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            return self._grant(degraded=False)
+
+        if len(self._waiters) >= self.max_queued:
+            ADMISSION_SHED.inc(reason="queue_full")
+            raise OverloadedError("queue_full", self.retry_after())
+
+        timeout = self.queue_timeout
+        remaining = deadline.remaining()
+        if remaining is not None:
+            timeout = min(timeout, remaining)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+        queued_at = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=max(0.0, timeout))
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self._release()
+            else:
+                waiter.cancel()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            ADMISSION_SHED.inc(reason="queue_timeout")
+            raise OverloadedError("queue_timeout", self.retry_after()) from None
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+
+        ADMISSION_QUEUE_WAIT.observe(time.monotonic() - queued_at)
+        # _release kept the slot counted as in flight when it handed it over
+        if self.degrade_queued:
+            ADMISSION_DEGRADED.inc()
+        return Admission(self, degraded=self.degrade_queued)
+
+    def _grant(self, degraded: bool) -> Admission:
+        self.in_flight += 1
+        ADMISSION_IN_FLIGHT.set(self.in_flight)
+        return Admission(self, degraded)
+
+    def _finished(self, admission: Admission):
+        # Fold the search's duration into the Retry-After estimate
+        self._service_time = 0.8 * self._service_time + 0.2 * (time.monotonic() - admission.started)
+        self._release()
+
+    def _release(self):
+        # Hand the slot straight to the oldest live waiter so arrivals cannot jump the queue
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+                return
+        self.in_flight -= 1
+        ADMISSION_IN_FLIGHT.set(self.in_flight)
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_search_admission() -> AdmissionController:
+    """Admission controller for search_and_analyze, configured from NAVICA_* environment variables."""
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(MAX_IN_FLIGHT, MAX_QUEUED, QUEUE_TIMEOUT_SECONDS, DEGRADE_QUEUED)
+    return _controller
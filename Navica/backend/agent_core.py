@@ -1,19 +1,159 @@
 import json
-from typing import List
+from typing import List, Optional
 from jobspy import scrape_jobs
 import pandas as pd # Required by JobSpy
-from models import JobPosting, SkillAnalysis
+from models import JobPosting
+from records import JobRecord, AnalysisRecord
+from experience_filter import experience_match_positions, FilterYieldTracker
+from dedup import NearDuplicateDetector
+from jd_preprocess import PreprocessedDescription, preprocess_job_description
+from metrics import STAGE_LATENCY, SCRAPE_LATENCY, SCRAPE_REQUESTS, SCRAPED_POSTINGS, GEMINI_LATENCY, SUGGESTIONS
+from tracing import start_span, current_span, traced
+from llm_scheduler import get_scheduler, LLMUnavailableError, DeadlineExpiredError, PRIORITY_INTERACTIVE
+from logging_config import sampled
+from executors import get_pool
+from scrape_scheduler import get_site_scheduler, ScrapeThrottledError, SCRAPE_PROXIES
+from cache import get_cache, make_key
+import logging
+import deadline
+import asyncio
+import functools
 import os
+import time
 import google.generativeai as genai
+from concurrent.futures import Future
 
 import re
 
+logger = logging.getLogger(__name__)
+
+# Number of postings returned by each search
+TARGET_RESULTS = 5
+# Bounds for the per-site `results_wanted` of a single scrape
+MIN_RESULTS_WANTED = 10
+MAX_RESULTS_WANTED = 50
+# Maximum number of scrapes (first query + follow-up pages) per search
+MAX_SCRAPE_ROUNDS = 3
+# Sites scraped by every search (one scrape_jobs call per site and round)
+JOB_SITES = ["indeed", "google"]
+
+# Learns the experience filter pass rate per (role, experience level) so each
+# scrape asks for roughly as many postings as the filter will leave 5 of
+yield_tracker = FilterYieldTracker()
+
+# Search results and Gemini suggestions are shared across workers through the
+# cache tier (see cache.py); TTLs in seconds
+JOBS_CACHE_TTL = float(os.getenv("NAVICA_JOBS_CACHE_TTL", "900"))
+SUGGESTION_CACHE_TTL = float(os.getenv("NAVICA_SUGGESTION_CACHE_TTL", "86400"))
+jobs_cache = get_cache("jobs", JOBS_CACHE_TTL, l1_max_bytes=32 * 1024 * 1024)
+suggestion_cache = get_cache("suggestions", SUGGESTION_CACHE_TTL, l1_max_bytes=8 * 1024 * 1024)
+
+# Every posting returned by a search, by job_id, for the job detail endpoint
+# (slim search responses leave the descriptions out); kept at least as long as
+# a session, since clients open details while browsing the results
+POSTING_CACHE_TTL = float(os.getenv("NAVICA_POSTING_CACHE_TTL", "3600"))
+posting_cache = get_cache("postings", POSTING_CACHE_TTL, l1_max_bytes=16 * 1024 * 1024)
+
+
+def jobs_cache_skills(user_skills: Optional[List[str]]) -> List[str]:
+    """The user skills as they appear in the jobs cache key (the cache warmer groups searches by them)."""
+    return sorted(skill.lower() for skill in user_skills or [])
+
+
+def _scrape_site(site: str, **scrape_kwargs):
+    """
+    Runs `scrape_jobs` for a single site in one of the site's scrape slots
+    (see scrape_scheduler), recording its latency and yield.
+    """
+    with start_span("scrape_jobs", site=site, results_wanted=scrape_kwargs.get("results_wanted")) as span:
+        with SCRAPE_LATENCY.time(site=site):
+            try:
+                with get_site_scheduler(site).slot():
+                    site_df = scrape_jobs(site_name=[site], **scrape_kwargs)
+            except ScrapeThrottledError as e:
+                # The site is backing off: skip it for this round rather than pile on
+                SCRAPE_REQUESTS.inc(site=site, outcome="throttled")
+                span.set_attribute("throttled", True)
+                logger.warning("Skipped scraping %s: %s", site, e, extra={"site": site})
+                return None
+            except Exception as e:
+                SCRAPE_REQUESTS.inc(site=site, outcome="error")
+                span.record_exception(e)
+                logger.warning("JobSpy scraping failed for %s: %s", site, e, extra={"site": site})
+                return None
+
+        SCRAPE_REQUESTS.inc(site=site, outcome="success")
+        if site_df is not None:
+            SCRAPED_POSTINGS.inc(len(site_df), site=site)
+            span.set_attribute("postings_count", len(site_df))
+        return site_df
+
+
+def _scrape_sites(job_sites: list[str], **scrape_kwargs):
+    """
+    Scrapes every site in parallel (one `scrape_jobs` call per site, so each
+    site is measured separately) and concatenates the results.
+
+    Returns:
+        (combined DataFrame or None when every site failed, rows returned per
+        site with 0 for a failed site)
+    """
+    # The scrape pool runs each call in a copy of this context so spans nest under the caller
+    pool = get_pool("scrape")
+    futures = [pool.submit(_scrape_site, site, **scrape_kwargs) for site in job_sites]
+    frames = [future.result() for future in futures]
+    site_rows = {site: 0 if frame is None else len(frame) for site, frame in zip(job_sites, frames)}
+
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        return None, site_rows
+    return pd.concat(frames, ignore_index=True), site_rows
+
+
+@traced()
 def fetch_jobs_with_jobspy(
     user_skills: list[str],
     selected_roles: list[str],
     experience_level: str,
-    work_model: str
-) -> list[JobPosting]:
+    work_model: str,
+    target_results: int = TARGET_RESULTS,
+    refresh: bool = False
+) -> list[JobRecord]:
+    """
+    Scrapes the job sites and returns up to `target_results` postings that
+    pass the experience filter. Results are cached per search.
+
+    Args:
+        user_skills: Skills from the user's resume (part of the search term)
+        selected_roles: Roles to search for
+        experience_level: Experience filter (e.g. "1 to 2")
+        work_model: Remote, Onsite or Hybrid
+        target_results: Postings wanted
+        refresh: Scrape even when the search is cached (the result replaces
+            the cached one); used by the cache warmer
+
+    Returns:
+        Up to `target_results` job records
+    """
+    span = current_span()
+    span.set_attributes(
+        selected_roles=", ".join(selected_roles or []),
+        experience_level=experience_level or "",
+        work_model=work_model or "",
+        user_skill_count=len(user_skills or [])
+    )
+    
+    cache_key = make_key(
+        sorted(selected_roles or []),
+        jobs_cache_skills(user_skills),
+        experience_level,
+        work_model,
+        target_results
+    )
+    cached_postings = None if refresh else jobs_cache.get(cache_key)
+    if cached_postings is not None:
+        span.set_attributes(cache_hit=True, postings_count=len(cached_postings))
+        return cached_postings
     
     # --- 1. Simplified Filter Mapping and Search Term Build ---
     is_remote_flag = (work_model or "").strip().lower() == "remote"
@@ -32,55 +172,94 @@ def fetch_jobs_with_jobspy(
     elif skills_query:
         search_term = skills_query
     
-    # --- 2. Define Strict Filtering Criteria (Regex) ---
-    # Convert human-readable experience into a precise regex filter
-    # This filter will be applied to the 'description' and 'title' columns.
-    
-    strict_filters = {
-        "1 to 2": r"\b(junior|entry[- ]level|0-2 years|1-3 years experience)\b",
-        "3 to 4": r"\b(mid[- ]level|associate|3-5 years experience)\b",
-        "above 5": r"\b(senior|lead|principal|staff|5\+ years|8\+ years experience)\b"
-    }
-    
-    # Get the regex for the user's selected experience
-    user_regex = strict_filters.get((experience_level or "").lower().strip(), None)
+    # --- 2. Strict Filtering Criteria ---
+    # The experience regexes are precompiled in experience_filter and applied
+    # to the 'title' and 'description' columns after scraping.
 
-    # --- 3. JobSpy Call (No Change to this block) ---
-    job_sites = ["indeed", "google"]
-    RESULTS_WANTED = 25 # Increase results wanted to filter down to 5 relevant ones
-    
-    try:
-        jobs_df = scrape_jobs(
-            site_name=job_sites,
+    # --- 3. Adaptive JobSpy Calls ---
+    # Size each scrape from the observed filter pass rate, and only fetch the
+    # next page when the filtered yield is still short of the target.
+    job_sites = JOB_SITES
+    qualified_frames = []
+    seen_urls = set()
+    # The same job is often listed on several sites (and re-posted under new URLs)
+    duplicate_detector = NearDuplicateDetector()
+    found = 0
+    offset = 0
+
+    for scrape_round in range(MAX_SCRAPE_ROUNDS):
+        # Follow-up pages are only worth it while the request still has budget
+        if scrape_round > 0 and deadline.expired():
+            span.add_event("deadline_expired", found=found)
+            break
+
+        needed = target_results - found
+        results_wanted = yield_tracker.results_wanted(
+            selected_roles,
+            experience_level,
+            needed=needed,
+            site_count=len(job_sites),
+            minimum=MIN_RESULTS_WANTED,
+            maximum=MAX_RESULTS_WANTED
+        )
+
+        jobs_df, site_rows = _scrape_sites(
+            job_sites,
             search_term=search_term, # Use the simpler search_term here
             location="India",
             country_indeed="India",
             is_remote=is_remote_flag,
-            results_wanted=RESULTS_WANTED, # Get more results to ensure filtering yields 5
+            results_wanted=results_wanted,
+            offset=offset,
             hours_old=72,
+            proxies=SCRAPE_PROXIES or None,
         )
-    except Exception as e:
-        print(f"JobSpy scraping failed: {e}")
-        return []
-
-    # --- 4. Strict Pandas Post-Filtering ---
-    if jobs_df is not None and not jobs_df.empty:
-        # Step 4a: Apply the strict experience filter using regex on the description/title
-        if user_regex and jobs_df.get('description') is not None:
-            # Create a mask where either title or description contains the regex pattern
-            title_match = jobs_df['title'].astype(str).str.contains(user_regex, case=False, regex=True, na=False)
-            desc_match = jobs_df['description'].astype(str).str.contains(user_regex, case=False, regex=True, na=False)
-            
-            jobs_df = jobs_df[title_match | desc_match]
 
-        # Step 4b: Trim the filtered DataFrame to the required 5 results
-        jobs_df = jobs_df.head(5)
+        if jobs_df is None or jobs_df.empty:
+            break
+
+        # Later pages can overlap earlier ones
+        scraped_count = len(jobs_df)
+        if 'job_url' in jobs_df:
+            jobs_df = jobs_df[~jobs_df['job_url'].isin(seen_urls)]
+            seen_urls.update(jobs_df['job_url'].dropna())
+
+        # Drop near-duplicates before filtering, so they neither use up the
+        # target nor skew the yield estimate
+        with STAGE_LATENCY.time(stage="dedup"):
+            unique = duplicate_detector.unique_mask(jobs_df)
+        duplicates = int(len(unique) - unique.sum())
+        if duplicates:
+            jobs_df = jobs_df[unique]
+
+        # --- 4. Strict Pandas Post-Filtering ---
+        # Apply the strict experience filter (title first, then description)
+        # and stop scanning as soon as the missing results are found
+        with STAGE_LATENCY.time(stage="experience_filter"):
+            positions = experience_match_positions(jobs_df, experience_level, limit=needed)
+        scanned = positions[-1] + 1 if len(positions) >= needed else len(jobs_df)
+        yield_tracker.record(selected_roles, experience_level, scanned=scanned, passed=len(positions))
 
-        # --- 5. Final Pydantic Conversion ---
-        job_postings: list[JobPosting] = []
-        for _, row in jobs_df.iterrows():
-            # ... (safe_get and JobPosting append logic remains the same)
-            # You should use the safe_get logic you defined previously here:
+        span.add_event("scrape_round", results_wanted=results_wanted, offset=offset, scraped=scraped_count, duplicates=duplicates, passed=len(positions))
+        qualified_frames.append(jobs_df.iloc[positions])
+        found += len(positions)
+        offset += results_wanted
+
+        # Only sites that filled the page can have a next one (failed sites are
+        # not retried at a later offset either)
+        job_sites = [site for site in job_sites if site_rows[site] >= results_wanted]
+
+        # Stop early once enough postings qualified, or when every site ran dry
+        if found >= target_results or not job_sites:
+            break
+
+    if qualified_frames:
+        jobs_df = pd.concat(qualified_frames, ignore_index=True)
+
+        # --- 5. Conversion to internal records ---
+        # (Pydantic models are only built at the API boundary, see records.py)
+        job_postings: list[JobRecord] = []
+        for index, row in enumerate(jobs_df.to_dict("records")):
             
             def safe_get(key, default="N/A"):
                  value = row.get(key, default)
@@ -88,8 +267,8 @@ def fetch_jobs_with_jobspy(
                      return default
                  return str(value) if value else default
 
-            job_id = safe_get("job_url", "").split('/')[-1] or f"{row.get('site')}_{str(_)}"
-            job_postings.append(JobPosting(
+            job_id = safe_get("job_url", "").split('/')[-1] or f"{row.get('site')}_{index}"
+            job_postings.append(JobRecord(
                  job_id=job_id,
                  title=safe_get("title"),
                  company=safe_get("company"),
@@ -98,10 +277,23 @@ def fetch_jobs_with_jobspy(
                  external_url=safe_get("job_url", "")
             ))
             
+        span.set_attribute("postings_count", len(job_postings))
+        jobs_cache.set(cache_key, job_postings)
         return job_postings
     
     return []
 
+
+async def remember_postings(job_postings: List[JobRecord]):
+    """Stores postings in the posting cache so their details can be fetched by job_id."""
+    await asyncio.gather(*(posting_cache.aset(make_key(job.job_id), job) for job in job_postings))
+
+
+async def get_posting(job_id: str) -> Optional[JobRecord]:
+    """A posting returned by a recent search, or None once it expired."""
+    return await posting_cache.aget(make_key(job_id))
+
+
 async def _get_filtered_mock_jobs(roles: List[str]) -> List[JobPosting]:
     """
     Returns mock job data filtered by selected roles.
@@ -505,41 +697,18 @@ async def _get_filtered_mock_jobs(roles: List[str]) -> List[JobPosting]:
     if not filtered_jobs:
         filtered_jobs = all_mock_jobs.get("Software Engineer", [])
     
-    print(f"✓ Returning {len(filtered_jobs)} filtered mock jobs for roles: {', '.join(roles)}")
+    logger.info("Returning %d filtered mock jobs for roles: %s", len(filtered_jobs), ', '.join(roles))
     return filtered_jobs
 
 
-def generate_gemini_improvement_suggestion(
-    user_skills: List[str], 
-    matched_skills: List[str], 
+def _build_gemini_prompt(
+    user_skills: List[str],
+    matched_skills: List[str],
     missing_skills: List[str],
-    job_title: str = "this position"
+    job_title: str
 ) -> str:
-    """
-    Uses Google Gemini (FREE) to generate personalized career improvement suggestions.
-    
-    Args:
-        user_skills: All skills the user has
-        matched_skills: Skills that match the job requirements
-        missing_skills: Skills the user is missing for the job
-        job_title: The job title for context
-        
-    Returns:
-        Detailed improvement suggestion from Gemini AI (FREE)
-    """
-    try:
-        # Get Gemini API key from environment (FREE - no credit card needed)
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            print("⚠️  Gemini API key not found, falling back to rule-based suggestions")
-            return None
-        
-        # Configure Gemini
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash')  # Latest stable Gemini model (FREE and FAST)
-        
-        # Prepare the prompt for Gemini
-        prompt = f"""You are a career advisor helping a job seeker improve their profile for a job position.
+    """Prompt asking Gemini for a personalized improvement suggestion."""
+    return f"""You are a career advisor helping a job seeker improve their profile for a job position.
 
 Job Title: {job_title}
 
@@ -555,99 +724,397 @@ Generate a personalized, actionable, and encouraging improvement suggestion for
 
 Keep it concise, professional, and focused on actionable next steps."""
 
-        # Call Gemini API (FREE)
-        print("🤖 Calling Google Gemini (FREE) for personalized suggestion...")
+
+@traced("gemini.generate_content")
+def _gemini_generate(api_key: str, prompt: str) -> str:
+    """
+    Makes a single Gemini call. Raises on any provider error so the LLM
+    scheduler can retry transient failures and drive its circuit breaker.
+    """
+    span = current_span()
+
+    # Configure Gemini
+    genai.configure(api_key=api_key)
+    model = genai.GenerativeModel('gemini-2.5-flash')  # Latest stable Gemini model (FREE and FAST)
+
+    # Call Gemini API (FREE)
+    logger.debug("Calling Google Gemini for personalized suggestion", extra=sampled())
+    started = time.perf_counter()
+    try:
         response = model.generate_content(prompt)
-        
         suggestion = response.text.strip()
-        print(f"✓ Gemini suggestion generated ({len(suggestion)} chars)")
-        return suggestion
-        
     except Exception as e:
-        print(f"❌ Gemini generation failed: {str(e)}")
+        GEMINI_LATENCY.observe(time.perf_counter() - started, outcome="error")
+        span.record_exception(e)
+        raise
+    GEMINI_LATENCY.observe(time.perf_counter() - started, outcome="success")
+
+    span.set_attributes(prompt_length=len(prompt), suggestion_length=len(suggestion))
+    return suggestion
+
+
+def submit_gemini_improvement_suggestion(
+    user_skills: List[str],
+    matched_skills: List[str],
+    missing_skills: List[str],
+    job_title: str = "this position",
+    priority: int = PRIORITY_INTERACTIVE,
+    deadline_at: Optional[float] = None
+) -> Optional[Future]:
+    """
+    Queues a Gemini suggestion on the shared LLM scheduler (rate limit,
+    priority queue, retries and circuit breaker).
+
+    Args:
+        priority: Scheduler priority (lower is served first)
+        deadline_at: Absolute time.monotonic() after which the call is dropped
+
+    Returns:
+        Future resolving to the suggestion, or None when no API key is configured
+    """
+    # Get Gemini API key from environment (FREE - no credit card needed)
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        logger.debug("Gemini API key not found, falling back to rule-based suggestions", extra=sampled())
         return None
 
+    prompt = _build_gemini_prompt(user_skills, matched_skills, missing_skills, job_title)
+    return get_scheduler().submit(
+        functools.partial(_gemini_generate, api_key, prompt),
+        priority=priority,
+        deadline=deadline_at
+    )
+
 
-async def analyze_job_and_resume(job_desc: str, user_skills: List[str], job_title: str = "") -> SkillAnalysis:
+def generate_gemini_improvement_suggestion(
+    user_skills: List[str], 
+    matched_skills: List[str], 
+    missing_skills: List[str],
+    job_title: str = "this position",
+    priority: int = PRIORITY_INTERACTIVE
+) -> str:
     """
-    Analyzes the match between a job description and user skills using NLP-based skill extraction.
+    Uses Google Gemini (FREE) to generate personalized career improvement suggestions.
     
-    AGENTIC BEHAVIOR:
-    1. Perception: Extracts required skills from job description using spaCy NLP
-    2. Reasoning: Compares job requirements with candidate skills
-    3. Action: Generates personalized improvement recommendations using FREE Gemini AI
+    Blocks until the scheduled call completes.
     
     Args:
-        job_desc: The job description text
-        user_skills: List of skills extracted from user's resume
+        user_skills: All skills the user has
+        matched_skills: Skills that match the job requirements
+        missing_skills: Skills the user is missing for the job
+        job_title: The job title for context
+        priority: LLM scheduler priority
         
     Returns:
-        SkillAnalysis object with matched skills, missing skills, and advice
+        Detailed improvement suggestion from Gemini AI (FREE), or None if unavailable
+    """
+    future = submit_gemini_improvement_suggestion(user_skills, matched_skills, missing_skills, job_title, priority)
+    if future is None:
+        return None
+
+    try:
+        suggestion = future.result()
+    except Exception as e:
+        logger.warning("Gemini generation failed: %s", e)
+        return None
+
+    logger.info("Gemini suggestion generated", extra=sampled(chars=len(suggestion)))
+    return suggestion
+
+
+def _suggestion_key(user_skills: List[str], matched_skills: List[str], missing_skills: List[str], job_title: str) -> str:
+    return make_key(job_title, user_skills, matched_skills, missing_skills)
+
+
+def _cache_suggestion(key: str, future: Future):
+    # Runs on the scheduler thread when the call finishes, whether or not the
+    # request was still waiting for it
+    if future.cancelled() or future.exception() is not None or not future.result():
+        return
+    suggestion_cache.set(key, future.result())
+
+
+async def _generate_suggestion_within_deadline(
+    user_skills: List[str],
+    matched_skills: List[str],
+    missing_skills: List[str],
+    job_title: str,
+    priority: int = PRIORITY_INTERACTIVE
+) -> tuple:
+    """
+    Calls Gemini without letting it outlive the request deadline.
+
+    The call goes through the LLM scheduler. If the remaining budget is too
+    small it is not attempted, and the scheduler drops it if the deadline
+    passes while it is queued; if it is still running when the budget runs
+    out, the request stops waiting. Every successful suggestion, including
+    late ones, goes to the shared suggestion cache for identical requests.
+
+    Returns:
+        (suggestion or None, source) where source is 'gemini', 'gemini_cached',
+        'fallback' or 'deadline'
     """
-    from resume_processor import extract_key_skills
+    key = _suggestion_key(user_skills, matched_skills, missing_skills, job_title)
+    cached = await suggestion_cache.aget(key)
+    if cached:
+        return cached, "gemini_cached"
+
+    budget = deadline.llm_budget()
+    if budget is not None and budget <= 0:
+        return None, "deadline"
+
+    scheduled = submit_gemini_improvement_suggestion(
+        user_skills=user_skills,
+        matched_skills=matched_skills,
+        missing_skills=missing_skills,
+        job_title=job_title,
+        priority=priority,
+        deadline_at=time.monotonic() + budget if budget is not None else None
+    )
+    if scheduled is None:
+        return None, "fallback"
+    scheduled.add_done_callback(functools.partial(_cache_suggestion, key))
+
+    future = asyncio.wrap_future(scheduled)
+    try:
+        # shield() keeps the call running on timeout so the late result still gets cached
+        suggestion = await asyncio.wait_for(asyncio.shield(future), timeout=budget)
+    except asyncio.TimeoutError:
+        logger.info("Gemini call abandoned at request deadline", extra=sampled(job_title=job_title))
+        return None, "deadline"
+    except DeadlineExpiredError:
+        return None, "deadline"
+    except LLMUnavailableError as e:
+        logger.info("Gemini skipped: %s", e, extra=sampled())
+        return None, "fallback"
+    except Exception as e:
+        logger.warning("Gemini generation failed: %s", e)
+        return None, "fallback"
+
+    logger.info("Gemini suggestion generated", extra=sampled(chars=len(suggestion)))
+    return suggestion, ("gemini" if suggestion else "fallback")
+
+
+def rule_based_suggestion(user_skills: List[str], matched: List[str], missing: List[str]) -> str:
+    """Advice built from the skill overlap alone, used whenever Gemini is not."""
+    if matched:
+        strength_skills = ', '.join(matched[:3])
+        suggestion = f"Great match! Your expertise in {strength_skills} aligns well with this role. "
+    else:
+        strength_skills = ', '.join(user_skills[:2]) if len(user_skills) >= 2 else "your skills"
+        suggestion = f"You have a solid foundation with {strength_skills}. "
     
-    # Step 1: PERCEPTION - Extract skills from job description using NLP
-    print(f"Analyzing job description ({len(job_desc)} chars)...")
-    job_required_skills = extract_key_skills(job_desc)
-    print(f"Found {len(job_required_skills)} required skills in job description")
+    if missing and missing[0] != "No critical gaps identified":
+        top_missing = ', '.join(missing[:3])
+        suggestion += f"To strengthen your application, consider developing skills in {top_missing}. "
+        suggestion += "Focus on hands-on projects or certifications in these areas to stand out."
+    else:
+        suggestion += "Your skill set is comprehensive for this position. Highlight relevant project experience in your application."
+    return suggestion
+
+
+def shorten_skill_gap(user_skills: List[str], matched: List[str], missing: List[str]) -> tuple:
+    """
+    The matched/missing lists shown to the user and sent to Gemini: at most 8
+    of each, a few of the user's skills when nothing matched, and a note when
+    nothing is missing.
+
+    Returns:
+        (matched_final, missing_final)
+    """
+    matched_final = matched[:8] if matched else user_skills[:3]
+    missing_final = missing[:8] if missing else ["No critical gaps identified"]
+    return matched_final, missing_final
+
+
+async def generate_suggestion(
+    user_skills: List[str],
+    matched_skills: List[str],
+    missing_skills: List[str],
+    job_title: str = "",
+    priority: int = PRIORITY_INTERACTIVE,
+    use_llm: bool = True
+) -> tuple:
+    """
+    Improvement suggestion for an already computed skill match: Gemini within
+    the request deadline, else the rule-based one. The lists are shortened
+    as in `analyze_job_and_resume`, so the same match gets the same suggestion.
+    
+    Returns:
+        (suggestion, source) with the sources of `analyze_job_and_resume`
+    """
+    if use_llm:
+        matched_final, missing_final = shorten_skill_gap(user_skills, matched_skills, missing_skills)
+        suggestion, source = await _generate_suggestion_within_deadline(
+            user_skills=user_skills,
+            matched_skills=matched_final,
+            missing_skills=missing_final,
+            job_title=job_title,
+            priority=priority
+        )
+    else:
+        suggestion, source = None, "degraded"
+    SUGGESTIONS.inc(source=source)
+    return suggestion or rule_based_suggestion(user_skills, matched_skills, missing_skills), source
+
+
+def prepare_job_description(job_desc: str) -> PreprocessedDescription:
+    """Preprocesses a job description (see `jd_preprocess`), timed and recorded on the current span."""
+    with STAGE_LATENCY.time(stage="jd_preprocess"):
+        prepared = preprocess_job_description(job_desc)
+    current_span().set_attributes(**{f"jd_{stage}_bytes": count for stage, count in prepared.byte_counts.items()})
+    return prepared
+
+
+async def extract_job_skills(job_desc: str, prepared: Optional[PreprocessedDescription] = None) -> List[str]:
+    """
+    Skills required by a job, extracted from its relevant sections only
+    (markup and boilerplate are stripped first, see `jd_preprocess`).
+    `prepared` is the already preprocessed description, if the caller has it.
+    """
+    from resume_processor import extract_key_skills_async
+    if prepared is None:
+        prepared = prepare_job_description(job_desc)
+    return await extract_key_skills_async(prepared.relevant_text)
+
+
+def compute_skill_gap(
+    job_desc: str,
+    job_required_skills: List[str],
+    user_skills: List[str],
+    prepared: Optional[PreprocessedDescription] = None
+) -> tuple:
+    """
+    Compares a job's required skills with the candidate's. Only the relevant
+    sections of the description count, and skills the job merely prefers
+    ("nice to have") are listed after the required ones among the missing.
+    Pass `prepared` when the description was already preprocessed (for
+    skill extraction) so it is not preprocessed again.
     
+    Returns:
+        (matched, missing, matched_final, missing_final): the full lists, and
+        the shortened ones shown to the user and sent to Gemini
+    """
     # Normalize skills for comparison (lowercase)
     user_skills_lower = [s.lower() for s in user_skills]
     job_skills_lower = [s.lower() for s in job_required_skills]
     
-    # Step 2: REASONING - Find matched skills (skills user has that job needs)
+    # Find matched skills (skills user has that job needs)
     matched = []
     for skill in user_skills:
         if skill.lower() in job_skills_lower:
             matched.append(skill)
     
     # Also check if user skills appear in job description text (flexible matching)
+    if prepared is None:
+        prepared = preprocess_job_description(job_desc)
+    job_desc_lower = prepared.relevant_text.lower()
     for skill in user_skills:
-        if skill.lower() in job_desc.lower() and skill not in matched:
+        if skill.lower() in job_desc_lower and skill not in matched:
             matched.append(skill)
     
-    # Step 3: REASONING - Find missing skills (skills job needs that user lacks)
+    # Find missing skills (skills job needs that user lacks)
     missing = []
     for skill in job_required_skills:
         if skill.lower() not in user_skills_lower:
             missing.append(skill)
+    preferred = set(prepared.preferred_skills(missing))
+    if preferred:
+        missing.sort(key=lambda skill: skill in preferred)
     
     # Limit results for better UX
-    matched_final = matched[:8] if matched else user_skills[:3]
-    missing_final = missing[:8] if missing else ["No critical gaps identified"]
+    matched_final, missing_final = shorten_skill_gap(user_skills, matched, missing)
+    return matched, missing, matched_final, missing_final
+
+
+@traced()
+async def analyze_job_and_resume(
+    job_desc: str,
+    user_skills: List[str],
+    job_title: str = "",
+    priority: int = PRIORITY_INTERACTIVE,
+    use_llm: bool = True,
+    job_skills: Optional[List[str]] = None,
+    prepared: Optional[PreprocessedDescription] = None
+) -> AnalysisRecord:
+    """
+    Analyzes the match between a job description and user skills using NLP-based skill extraction.
+    
+    AGENTIC BEHAVIOR:
+    1. Perception: Extracts required skills from job description using spaCy NLP
+    2. Reasoning: Compares job requirements with candidate skills
+    3. Action: Generates personalized improvement recommendations using FREE Gemini AI
+    
+    The Gemini call is bounded by the request deadline (see `deadline`); when
+    there is not enough budget left the rule-based suggestion is used instead.
+    
+    Args:
+        job_desc: The job description text
+        user_skills: List of skills extracted from user's resume
+        job_title: The job title for context
+        priority: LLM scheduler priority for the Gemini call
+        use_llm: False skips Gemini and uses the rule-based suggestion (degraded mode)
+        job_skills: Skills already extracted from `job_desc` (skips extraction)
+        prepared: `job_desc` already preprocessed (see `prepare_job_description`)
+        
+    Returns:
+        AnalysisRecord with matched skills, missing skills, and advice
+        (`to_model()` gives the SkillAnalysis API model)
+    """
+    span = current_span()
+    span.set_attributes(job_title=job_title, description_length=len(job_desc), user_skill_count=len(user_skills))
+    
+    # Step 1: PERCEPTION - Extract skills from job description using NLP
+    logger.debug("Analyzing job description", extra=sampled(chars=len(job_desc)))
+    # Preprocessed once, for both extraction and the skill gap
+    if prepared is None:
+        prepared = prepare_job_description(job_desc)
+    if job_skills is None:
+        job_skills = await extract_job_skills(job_desc, prepared)
+    job_required_skills = job_skills
+    span.set_attribute("job_skill_count", len(job_required_skills))
+    
+    # Steps 2-3: REASONING - Find matched skills (skills user has that job needs)
+    # and missing skills (skills job needs that user lacks)
+    matched, missing, matched_final, missing_final = compute_skill_gap(job_desc, job_required_skills, user_skills, prepared)
     
     # Step 4: ACTION - Generate personalized improvement suggestion using FREE Gemini AI
-    print("Generating improvement suggestion...")
+    # Try to use Gemini AI first (FREE), within the request deadline
+    if use_llm:
+        suggestion, suggestion_source = await _generate_suggestion_within_deadline(
+            user_skills=user_skills,
+            matched_skills=matched_final,
+            missing_skills=missing_final,
+            job_title=job_title,
+            priority=priority
+        )
+    else:
+        suggestion, suggestion_source = None, "degraded"
     
-    # Try to use Gemini AI first (FREE)
-    suggestion = generate_gemini_improvement_suggestion(
-        user_skills=user_skills,
-        matched_skills=matched_final,
-        missing_skills=missing_final,
-        job_title=job_title
+    # Fallback to rule-based suggestion if Gemini fails or the deadline is too close
+    SUGGESTIONS.inc(source=suggestion_source)
+    span.set_attributes(
+        matched_count=len(matched),
+        missing_count=len(missing),
+        suggestion_source=suggestion_source
     )
-    
-    # Fallback to rule-based suggestion if Gemini fails
     if not suggestion:
-        print("Using fallback rule-based suggestion")
-        if matched:
-            strength_skills = ', '.join(matched[:3])
-            suggestion = f"Great match! Your expertise in {strength_skills} aligns well with this role. "
-        else:
-            strength_skills = ', '.join(user_skills[:2]) if len(user_skills) >= 2 else "your skills"
-            suggestion = f"You have a solid foundation with {strength_skills}. "
-        
-        if missing and missing[0] != "No critical gaps identified":
-            top_missing = ', '.join(missing[:3])
-            suggestion += f"To strengthen your application, consider developing skills in {top_missing}. "
-            suggestion += "Focus on hands-on projects or certifications in these areas to stand out."
-        else:
-            suggestion += "Your skill set is comprehensive for this position. Highlight relevant project experience in your application."
+        logger.debug("Using fallback rule-based suggestion", extra=sampled())
+        suggestion = rule_based_suggestion(user_skills, matched, missing)
     
-    print(f"✓ Analysis complete: {len(matched_final)} matched, {len(missing_final)} to develop")
+    logger.info(
+        "Analysis complete",
+        extra=sampled(
+            job_title=job_title,
+            required_skills=len(job_required_skills),
+            matched=len(matched_final),
+            missing=len(missing_final)
+        )
+    )
     
-    return SkillAnalysis(
+    return AnalysisRecord(
         matched_skills=matched_final,
         missing_skills=missing_final,
-        improvement_suggestion=suggestion
+        improvement_suggestion=suggestion,
+        suggestion_source=suggestion_source
     )
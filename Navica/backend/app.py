@@ -1,10 +1,9 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
-from typing import List
+from typing import List, Optional
 import logging
-from pathlib import Path
 from dotenv import load_dotenv
 import os
 
@@ -15,24 +14,51 @@ load_dotenv()
 from models import (
     UserSkillProfile,
     JobSearchParams,
-    JobResult,
+    SearchResult,
     JobPosting,
-    SkillAnalysis
+    SkillAnalysis,
+    BulkJobInput,
+    BulkMatchResult
 )
 from resume_processor import (
     setup_nlp,
     extract_text_from_pdf,
-    extract_key_skills
+    extract_key_skills_async
 )
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
 from agent_core import (
     fetch_jobs_with_jobspy,
-    analyze_job_and_resume
+    remember_postings,
+    get_posting,
+    TARGET_RESULTS
+)
+import time
+from metrics import HTTP_LATENCY, STAGE_LATENCY, PROMETHEUS_CONTENT_TYPE, render_metrics
+from tracing import configure_tracing, shutdown_tracing, start_trace, traceparent_header
+from logging_config import setup_logging, shutdown_logging
+import deadline
+from admission import get_search_admission, OverloadedError, DEGRADED_TARGET_RESULTS
+from llm_scheduler import shutdown_scheduler
+from executors import start_executors, shutdown_executors, run_in_pool
+from records import JOB_FIELDS, parse_job_fields, job_results_json
+from responses import dumps, json_response
+from bulk_match import bulk_match, BULK_MAX_RESUMES, BULK_MAX_JOBS, BULK_TOP_K, BULK_MAX_TOP_K, BULK_MAX_MATCHES
+from pydantic import TypeAdapter, ValidationError
+from sessions import AnalysisSession, SESSION_HEADER, SESSION_REQUESTS, new_session, load_session, save_session
+from cache_warmer import search_stats, start_cache_warmer, stop_cache_warmer
+from static_assets import ASSET_FILES, get_static_assets
+from profiling import (
+    PROFILE_FILE_HEADER,
+    authorized,
+    background_profile,
+    load_profile,
+    profile_request,
+    save_profile,
+    shutdown_profiler,
+    start_profiler
 )
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (structured, written from a background thread)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
@@ -49,8 +75,51 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[SESSION_HEADER, PROFILE_FILE_HEADER],
 )
 
+
+async def _call_profiled(request: Request, call_next):
+    """Runs the request under the sampling profiler and names the saved profile in a response header."""
+    with profile_request() as sampler:
+        response = await call_next(request)
+    response.headers[PROFILE_FILE_HEADER] = save_profile(sampler, request.url.path)
+    return response
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Records the end-to-end latency of every request and opens its root trace span."""
+    started = time.perf_counter()
+    status = 500
+    with start_trace(
+        f"{request.method} {request.url.path}",
+        traceparent=request.headers.get("traceparent"),
+        http_method=request.method
+    ) as span:
+        try:
+            if authorized(request.headers, request.query_params) and not request.url.path.startswith("/api/v1/admin/"):
+                response = await _call_profiled(request, call_next)
+            else:
+                response = await call_next(request)
+            status = response.status_code
+            trace_header = traceparent_header()
+            if trace_header:
+                response.headers["traceparent"] = trace_header
+            return response
+        finally:
+            # Use the route template (not the raw path) to keep label cardinality bounded
+            route = request.scope.get("route")
+            endpoint = getattr(route, "path", "unmatched")
+            span.update_name(f"{request.method} {endpoint}")
+            span.set_attribute("http_status_code", status)
+            HTTP_LATENCY.observe(
+                time.perf_counter() - started,
+                method=request.method,
+                endpoint=endpoint,
+                status=str(status)
+            )
+
 # Hardcoded list of available job roles
 AVAILABLE_ROLES = [
     "Software Engineer",
@@ -73,22 +142,34 @@ AVAILABLE_ROLES = [
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize NLP components on startup."""
+    """Initialize NLP components and worker pools on startup."""
     logger.info("Starting NAVICA API...")
     setup_nlp()
+    await start_executors()
     logger.info("NLP components initialized successfully")
+    configure_tracing()
+    start_profiler()
+    start_cache_warmer(AVAILABLE_ROLES)
+    get_static_assets()
 
 
-@app.get("/", response_class=HTMLResponse)
-async def root():
-    """Serve the web interface."""
-    try:
-        html_path = Path(__file__).parent / "index.html"
-        if html_path.exists():
-            with open(html_path, 'r', encoding='utf-8') as f:
-                return f.read()
-    except Exception as e:
-        logger.error(f"Error serving HTML: {e}")
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the cache warmer, worker pools, LLM scheduler and profiler, then flush pending traces and log records."""
+    stop_cache_warmer()
+    shutdown_executors()
+    shutdown_scheduler()
+    shutdown_profiler()
+    shutdown_tracing()
+    shutdown_logging()
+
+
+@app.api_route("/", methods=["GET", "HEAD"], response_class=HTMLResponse)
+async def root(request: Request):
+    """Serve the web interface (precompressed, from memory; see static_assets)."""
+    response = get_static_assets().response(request, "/")
+    if response is not None:
+        return response
     
     return """
     <html>
@@ -101,6 +182,19 @@ async def root():
     """
 
 
+async def static_asset(request: Request):
+    """Serve the other frontend files registered in static_assets."""
+    response = get_static_assets().response(request, request.url.path)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return response
+
+
+for _asset_url in ASSET_FILES:
+    if _asset_url != "/":
+        app.add_api_route(_asset_url, static_asset, methods=["GET", "HEAD"], include_in_schema=False)
+
+
 @app.post("/api/v1/analyze_resume", response_model=UserSkillProfile)
 async def analyze_resume(resume_file: UploadFile = File(...)):
     """
@@ -116,7 +210,7 @@ async def analyze_resume(resume_file: UploadFile = File(...)):
         UserSkillProfile with extracted_skills and available_roles
     """
     try:
-        logger.info(f"Processing resume: {resume_file.filename}")
+        logger.info("Processing resume", extra={"resume_filename": resume_file.filename})
         
         # Validate file type
         if not resume_file.filename.endswith('.pdf'):
@@ -126,7 +220,6 @@ async def analyze_resume(resume_file: UploadFile = File(...)):
             )
         
         # Step 1: Extract text from PDF
-        logger.info("Extracting text from PDF...")
         resume_text = await extract_text_from_pdf(resume_file)
         
         if not resume_text.strip():
@@ -135,11 +228,8 @@ async def analyze_resume(resume_file: UploadFile = File(...)):
                 detail="Could not extract text from PDF. Please ensure the file is not corrupted or encrypted."
             )
         
-        logger.info(f"Extracted {len(resume_text)} characters from resume")
-        
         # Step 2: Extract key skills
-        logger.info("Extracting skills...")
-        extracted_skills = extract_key_skills(resume_text)
+        extracted_skills = await extract_key_skills_async(resume_text)
         
         if not extracted_skills:
             # Check if document looks like a resume (contains common resume keywords)
@@ -157,7 +247,8 @@ async def analyze_resume(resume_file: UploadFile = File(...)):
                     detail="Could not identify any technical skills in the document. Please ensure your resume includes skills like programming languages, frameworks, tools, etc."
                 )
         
-        logger.info(f"Extracted {len(extracted_skills)} skills: {extracted_skills}")
+        logger.info("Resume analyzed", extra={"chars": len(resume_text), "skill_count": len(extracted_skills)})
+        logger.debug("Extracted skills: %s", extracted_skills)
         
         # Step 3: Return profile with skills and available roles
         return UserSkillProfile(
@@ -168,30 +259,107 @@ async def analyze_resume(resume_file: UploadFile = File(...)):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error processing resume: {str(e)}")
+        logger.exception("Error processing resume: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"An error occurred while processing the resume: {str(e)}"
         )
 
 
-@app.post("/api/v1/search_and_analyze", response_model=List[JobResult])
-async def search_and_analyze(params: JobSearchParams):
+async def _admit_search():
+    """
+    Admission control: waits for a search slot or sheds the request.
+
+    Raises:
+        HTTPException: 503 with Retry-After when the search is shed
+    """
+    try:
+        admission = await get_search_admission().acquire()
+    except OverloadedError as e:
+        logger.warning("Search shed", extra={"reason": e.reason, "retry_after": e.retry_after})
+        raise HTTPException(
+            status_code=503,
+            detail="Too many searches in progress. Please retry shortly.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    if admission.degraded:
+        logger.info("Search admitted in degraded mode")
+    return admission
+
+
+@app.post("/api/v1/search_and_analyze", response_model=List[SearchResult])
+async def search_and_analyze(
+    params: JobSearchParams,
+    request: Request,
+    fields: Optional[str] = Query(
+        None,
+        description=f"Comma-separated job_details fields to return (job_id is always included): {', '.join(JOB_FIELDS)}"
+    ),
+    description_chars: Optional[int] = Query(
+        None,
+        ge=0,
+        description="Truncate job descriptions to this many characters; 0 leaves them out (see /api/v1/jobs/{job_id})"
+    ),
+    x_request_deadline_ms: Optional[str] = Header(
+        None,
+        description="Latency budget for this request in milliseconds (defaults to NAVICA_REQUEST_DEADLINE_SECONDS)"
+    ),
+    x_navica_session: Optional[str] = Header(
+        None,
+        description="Session token from an earlier search, to refine it instead of searching again"
+    )
+):
     """
     Endpoint 2: Job Search and Agentic Analysis (Steps 4-5)
     
     Accepts user skills and selected roles, fetches relevant jobs,
     and performs AI-powered skill gap analysis for each job.
     
+    The request deadline (X-Request-Deadline-Ms header or the configured
+    default) bounds the Gemini calls; once it gets close, the remaining jobs
+    get rule-based suggestions (marked with `suggestion_source`).
+    
+    Concurrent searches are capped (see `admission`): excess requests queue
+    briefly and run in a cheaper degraded mode (fewer jobs, rule-based
+    suggestions), and are rejected with 503 + Retry-After when the queue is full.
+    
+    Every response carries a session token (X-Navica-Session). Sending it back
+    with the same roles, experience level and work model reuses the fetched
+    postings and their extracted skills: only the skill gaps are recomputed,
+    and Gemini is only called for jobs whose gap changed (see `sessions`).
+    
+    Descriptions make up most of the response. Clients that only list results
+    can ask for a slim response (`fields`, `description_chars`) and fetch a
+    posting's full details from /api/v1/jobs/{job_id} when it is opened.
+    
     Args:
         params: JobSearchParams containing user_skills and selected_roles
+        request: The request (for response compression)
+        fields: Optional job_details fields to return
+        description_chars: Optional description length limit
+        x_request_deadline_ms: Optional latency budget in milliseconds
+        x_navica_session: Optional session token from an earlier search
         
     Returns:
-        List of JobResult objects with job details and analysis
+        List of SearchResult objects with job details and analysis
     """
+    # The deadline is a context variable, so it follows the request into the
+    # scrape thread and every analyze_job_and_resume call
+    deadline_token = deadline.start(deadline.parse_budget(x_request_deadline_ms))
+    admission = None
+    # Analyses of a refined session that still hold for the new skills
+    reusable = None
     try:
-        logger.info(f"Starting job search for roles: {params.selected_roles}")
-        logger.info(f"User skills: {params.user_skills}")
+        logger.info(
+            "Starting job search",
+            extra={
+                "roles": params.selected_roles,
+                "skill_count": len(params.user_skills),
+                "experience_level": params.experience_level,
+                "work_model": params.work_model
+            }
+        )
+        logger.debug("User skills: %s", params.user_skills)
         
         # Validate input
         if not params.user_skills:
@@ -206,62 +374,199 @@ async def search_and_analyze(params: JobSearchParams):
                 detail="At least one role must be selected"
             )
         
-        # Step 4: Fetch jobs using JobSpy (synchronous, run in thread)
-        logger.info("Fetching jobs using JobSpy with filters: experience_level=%s, work_model=%s", params.experience_level, params.work_model)
-        loop = asyncio.get_event_loop()
-        job_postings = await loop.run_in_executor(
-            None,
-            fetch_jobs_with_jobspy,
+        try:
+            job_fields = parse_job_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        # A refinement of an earlier search (only the skills changed) reuses its
+        # postings, so it skips scraping; it only goes through admission when
+        # some job's analysis has to be recomputed
+        search = AnalysisSession.search_key(params.selected_roles, params.experience_level, params.work_model)
+        session = await load_session(x_navica_session)
+        if session is not None and session.jobs and session.search == search:
+            SESSION_REQUESTS.inc(outcome="refined")
+            logger.info("Refining session search", extra={"job_count": len(session.jobs)})
+            reusable = session.reusable_analyses(params.user_skills)
+            if len(reusable) < len(session.jobs):
+                admission = await _admit_search()
+        else:
+            admission = await _admit_search()
+            # Popular searches are kept warm (see cache_warmer)
+            search_stats.record(params.selected_roles, params.user_skills, params.experience_level, params.work_model)
+            
+            # Step 4: Fetch jobs using JobSpy (synchronous, run on the search pool;
+            # the pool copies the current context so the scrape joins this request's trace)
+            job_postings = await run_in_pool(
+                "search",
+                fetch_jobs_with_jobspy,
+                params.user_skills,
+                params.selected_roles,
+                params.experience_level,
+                params.work_model,
+                target_results=DEGRADED_TARGET_RESULTS if admission.degraded else TARGET_RESULTS
+            )
+            
+            logger.info("Retrieved job postings", extra={"job_count": len(job_postings)})
+            
+            if session is None:
+                SESSION_REQUESTS.inc(outcome="new")
+                session = new_session(search, job_postings)
+            else:
+                # Filters changed: keep what is known about postings that are still in the results
+                SESSION_REQUESTS.inc(outcome="refetched")
+                session.replace_jobs(search, job_postings)
+        
+        # Step 5: Analyze each job with LLM (Agent Action: FREE Gemini AI),
+        # reusing the session's earlier analyses where the skill gap is unchanged
+        analyzed = await session.analyze(
             params.user_skills,
-            params.selected_roles,
-            params.experience_level,
-            params.work_model
+            use_llm=admission is None or not admission.degraded,
+            reusable=reusable
         )
         
-        logger.info(f"Retrieved {len(job_postings)} job postings")
+        await save_session(session)
+        # Details of every returned job stay available from /api/v1/jobs/{job_id}
+        await remember_postings([job for job, _ in analyzed])
         
-        if not job_postings:
-            return []
+        logger.info("Completed analysis", extra={"job_count": len(analyzed)})
+        # Job details and analysis serialized straight from the records (no models,
+        # no revalidation); response_model still documents the schema
+        with STAGE_LATENCY.time(stage="response_encode"):
+            body = job_results_json(analyzed, job_fields, description_chars)
+        return json_response(request, body, headers={SESSION_HEADER: session.token})
         
-        # Step 5: Analyze each job with LLM
-        results: List[JobResult] = []
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error in search and analyze: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred during job search and analysis: {str(e)}"
+        )
+    finally:
+        if admission is not None:
+            admission.release()
+        deadline.reset(deadline_token)
+
+
+_BULK_JOBS = TypeAdapter(List[BulkJobInput])
+
+
+@app.post("/api/v1/bulk_match", response_model=BulkMatchResult)
+async def bulk_match_resumes(
+    request: Request,
+    resume_files: List[UploadFile] = File(..., description="Candidate resumes (PDF)"),
+    jobs: str = Form(..., description='JSON array of jobs: [{"title": "...", "job_description": "..."}]'),
+    top_k: int = Form(BULK_TOP_K, description="Best pairs that get an improvement suggestion"),
+    max_matches: int = Form(BULK_MAX_MATCHES, description="Ranked pairs to return"),
+    x_request_deadline_ms: Optional[str] = Header(
+        None,
+        description="Latency budget for this request in milliseconds (bounds the suggestions)"
+    )
+):
+    """
+    Endpoint 3: Bulk Screening
+    
+    Matches a batch of resumes against a set of job descriptions for
+    recruiters. Every candidate/job pair is scored by the share of the job's
+    required skills the candidate has; only the `top_k` best pairs get a
+    (Gemini, batch priority) improvement suggestion.
+    
+    Bulk matches go through the same admission control as searches: they
+    wait for a slot, get rule-based suggestions when admitted degraded, and
+    are rejected with 503 + Retry-After when the queue is full.
+    
+    Args:
+        request: The request (for response compression)
+        resume_files: PDF resumes
+        jobs: JSON array of job descriptions
+        top_k: Pairs that get a suggestion
+        max_matches: Ranked pairs to return
+        x_request_deadline_ms: Optional latency budget in milliseconds
         
-        for idx, job in enumerate(job_postings, 1):
-            logger.info(f"Analyzing job {idx}/{len(job_postings)}: {job.title}")
-            
-            try:
-                # Agent Action: LLM analysis for this job using FREE Gemini AI
-                analysis = await analyze_job_and_resume(
-                    job_desc=job.job_description,
-                    user_skills=params.user_skills,
-                    job_title=job.title
-                )
-                
-                # Combine job details and analysis
-                job_result = JobResult(
-                    job_details=job,
-                    analysis=analysis
-                )
-                
-                results.append(job_result)
-                logger.info(f"Successfully analyzed job: {job.title}")
-                
-            except Exception as e:
-                logger.error(f"Error analyzing job {job.title}: {str(e)}")
-                # Continue with other jobs even if one fails
-                continue
+    Returns:
+        BulkMatchResult with candidates, jobs, the full score matrix and ranked matches
+    """
+    deadline_token = deadline.start(deadline.parse_budget(x_request_deadline_ms))
+    admission = None
+    try:
+        try:
+            job_inputs = _BULK_JOBS.validate_json(jobs)
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid jobs: {e.errors(include_url=False)}")
         
-        logger.info(f"Completed analysis for {len(results)} jobs")
-        return results
+        if not resume_files or not job_inputs:
+            raise HTTPException(status_code=400, detail="At least one resume and one job are required")
+        if len(resume_files) > BULK_MAX_RESUMES or len(job_inputs) > BULK_MAX_JOBS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {BULK_MAX_RESUMES} resumes and {BULK_MAX_JOBS} jobs per request"
+            )
+        not_pdf = [f.filename for f in resume_files if not (f.filename or "").endswith('.pdf')]
+        if not_pdf:
+            raise HTTPException(status_code=400, detail=f"Only PDF files are supported: {not_pdf[:5]}")
+        
+        # The heaviest endpoint shares the search slots (see `admission`)
+        admission = await _admit_search()
+        logger.info("Starting bulk match", extra={"resume_count": len(resume_files), "job_count": len(job_inputs)})
+        resumes = [(f.filename, await f.read()) for f in resume_files]
+        result = await bulk_match(
+            resumes,
+            job_inputs,
+            top_k=max(0, min(top_k, BULK_MAX_TOP_K)),
+            max_matches=max(0, max_matches),
+            use_llm=not admission.degraded
+        )
+        logger.info("Completed bulk match", extra={"match_count": len(result.matches)})
+        # Built without revalidation; response_model still documents the schema
+        return json_response(request, result.model_dump_json().encode("utf-8"))
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error in search and analyze: {str(e)}")
+        logger.exception("Error in bulk match: %s", e)
         raise HTTPException(
             status_code=500,
-            detail=f"An error occurred during job search and analysis: {str(e)}"
+            detail=f"An error occurred during bulk matching: {str(e)}"
         )
+    finally:
+        if admission is not None:
+            admission.release()
+        deadline.reset(deadline_token)
+
+
+@app.get("/api/v1/jobs/{job_id}", response_model=JobPosting)
+async def job_details(
+    job_id: str,
+    request: Request,
+    x_navica_session: Optional[str] = Header(
+        None,
+        description="Session token of the search that returned the job (fallback once the posting cache expired)"
+    )
+):
+    """
+    Endpoint 4: Job Details
+    
+    The full posting, including its description, of a job returned by a
+    recent search; the companion of slim search responses.
+    
+    Args:
+        job_id: job_id from a search result
+        request: The request (for response compression)
+        x_navica_session: Optional session token of that search
+        
+    Returns:
+        JobPosting, or 404 when the job is unknown or expired
+    """
+    job = await get_posting(job_id)
+    if job is None:
+        session = await load_session(x_navica_session)
+        if session is not None:
+            job = next((candidate for candidate in session.jobs if candidate.job_id == job_id), None)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired; search again to refresh it")
+    return json_response(request, dumps(job.to_dict()))
 
 
 @app.get("/api/v1/health")
@@ -272,11 +577,36 @@ async def health_check():
         "service": "NAVICA API",
         "endpoints": {
             "analyze_resume": "/api/v1/analyze_resume",
-            "search_and_analyze": "/api/v1/search_and_analyze"
+            "search_and_analyze": "/api/v1/search_and_analyze",
+            "bulk_match": "/api/v1/bulk_match",
+            "job_details": "/api/v1/jobs/{job_id}"
         }
     }
 
 
+@app.get("/api/v1/admin/profile")
+async def hot_path_profile(request: Request):
+    """Collapsed stacks from the always-on sampler (requires the profile token)."""
+    if not authorized(request.headers, request.query_params):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(content=background_profile(), media_type="text/plain; charset=utf-8")
+
+
+@app.get("/api/v1/admin/profiles/{name}")
+async def request_profile(name: str, request: Request):
+    """A saved per-request profile, by the name returned in X-Navica-Profile-File."""
+    profile = load_profile(name) if authorized(request.headers, request.query_params) else None
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(content=profile, media_type="text/plain; charset=utf-8")
+
+
+@app.get("/metrics")
+async def metrics():
+    """Pipeline and endpoint metrics in Prometheus text format."""
+    return Response(content=render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
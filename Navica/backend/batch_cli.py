@@ -0,0 +1,415 @@
+"""
+Offline batch matching of a directory of PDF resumes against a file of job
+postings, for nightly jobs that should not go through the API:
+
+    python batch_cli.py --resumes resumes/ --jobs postings.jsonl --output report/
+    python batch_cli.py --resumes resumes/ --jobs postings.parquet --output report/ --workers 8 --top 20
+
+Job skills are extracted first (streamed from the postings file in chunks),
+then resumes are split into chunks that worker processes parse, extract and
+match independently, so throughput grows with the number of cores. Each chunk
+is written as its own report part (`part-00000.parquet`, ...; read them all
+with `pandas.read_parquet("report/")`) and recorded in `_progress.jsonl`, so
+re-running the same command after an interruption skips finished chunks.
+
+Jobs are ranked per resume by the share of their required skills the resume
+has (one matrix product, as in /api/v1/bulk_match); the matched and missing
+skills of the reported rows come from the API's `compute_skill_gap`.
+"""
+import argparse
+import hashlib
+import importlib.util
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from resume_processor import setup_nlp, pdf_bytes_to_text, extract_key_skills_batch, SKILLS_TAXONOMY_VERSION
+from bulk_match import SkillMatrix
+from agent_core import compute_skill_gap
+from jd_preprocess import preprocess_job_description
+from logging_config import setup_logging, shutdown_logging
+
+
+logger = logging.getLogger("batch_cli")
+
+# Leading underscores keep Parquet readers from treating these as report parts
+PROGRESS_FILE = "_progress.jsonl"
+JOBS_FILE = "_jobs.pkl"
+
+REPORT_COLUMNS = [
+    "resume", "rank", "job_id", "title", "score",
+    "matched_count", "required_count", "matched_skills", "missing_skills"
+]
+
+
+# --- Inputs ---
+
+def list_resumes(directory: str) -> List[str]:
+    """PDF paths under `directory` (recursive), relative to it and sorted so chunking is stable."""
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(".pdf"):
+                paths.append(os.path.relpath(os.path.join(root, name), directory))
+    return sorted(paths)
+
+
+def iter_job_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Streams postings from a JSONL or Parquet file in chunks, normalized to
+    job_id, title and job_description columns (JobSpy column names work too).
+    """
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        chunks = (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size))
+    else:
+        chunks = pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False)
+
+    offset = 0
+    for chunk in chunks:
+        chunk = chunk.reset_index(drop=True)
+        description = chunk.get("job_description", chunk.get("description"))
+        if description is None:
+            raise ValueError(f"{path}: postings need a 'job_description' or 'description' field")
+        job_id = chunk.get("job_id", chunk.get("job_url"))
+        if job_id is None:
+            job_id = pd.Series(range(offset, offset + len(chunk)))
+        title = chunk.get("title", pd.Series([""] * len(chunk)))
+        offset += len(chunk)
+        yield pd.DataFrame({
+            "job_id": job_id.fillna("").astype(str),
+            "title": title.fillna("").astype(str),
+            "job_description": description.fillna("").astype(str),
+        })
+
+
+def _digest(*parts) -> str:
+    return hashlib.blake2b(json.dumps(parts).encode("utf-8"), digest_size=8).hexdigest()
+
+
+# --- Worker side (runs in the pool processes) ---
+
+_worker_jobs: Dict[str, tuple] = {}
+_worker_error: Optional[str] = None
+
+
+def _init_worker():
+    global _worker_error
+    try:
+        setup_nlp()
+    except Exception as e:
+        # Raising here would make the pool respawn the worker forever; fail its tasks instead
+        _worker_error = f"{type(e).__name__}: {e}"
+
+
+def _check_worker():
+    if _worker_error is not None:
+        raise RuntimeError(f"Worker could not load the NLP model ({_worker_error})")
+
+
+def _extract_job_skills(descriptions: List[str]) -> tuple:
+    """Preprocessed descriptions and the skills extracted from them."""
+    _check_worker()
+    prepared = [preprocess_job_description(text) for text in descriptions]
+    return prepared, extract_key_skills_batch([description.relevant_text for description in prepared])
+
+
+def _load_jobs(jobs_path: str) -> tuple:
+    # Loaded once per worker process
+    if jobs_path not in _worker_jobs:
+        jobs = pd.read_pickle(jobs_path)
+        _worker_jobs[jobs_path] = (
+            jobs["job_id"].to_numpy(),
+            jobs["title"].to_numpy(),
+            jobs["prepared"].tolist(),
+            jobs["required_skills"].tolist()
+        )
+    return _worker_jobs[jobs_path]
+
+
+def _write_part(frame: pd.DataFrame, path: str, output_format: str):
+    # Written under a temporary name, so a part either exists completely or not at all
+    temporary = path + ".tmp"
+    if output_format == "parquet":
+        frame.to_parquet(temporary, index=False)
+    else:
+        frame = frame.assign(
+            matched_skills=frame["matched_skills"].str.join("; "),
+            missing_skills=frame["missing_skills"].str.join("; ")
+        )
+        frame.to_csv(temporary, index=False)
+    os.replace(temporary, path)
+
+
+def match_chunk(task: dict) -> dict:
+    """
+    Parses, extracts and matches one chunk of resumes and writes its report part.
+
+    Args:
+        task: chunk index, resume paths, input directory, jobs file, output
+            part path and format, and the number of jobs to keep per resume
+
+    Returns:
+        Progress record for the chunk
+    """
+    _check_worker()
+    started = time.perf_counter()
+    job_ids, titles, prepared, job_skills = _load_jobs(task["jobs_path"])
+
+    texts, parsed, errors = [], [], {}
+    for relative_path in task["paths"]:
+        try:
+            with open(os.path.join(task["resumes_dir"], relative_path), "rb") as f:
+                text = pdf_bytes_to_text(f.read())
+        except Exception as e:
+            errors[relative_path] = str(e) or type(e).__name__
+            continue
+        if not text.strip():
+            errors[relative_path] = "No text could be extracted"
+            continue
+        texts.append(text)
+        parsed.append(relative_path)
+
+    candidate_skills = extract_key_skills_batch(texts)
+    matrix = SkillMatrix(candidate_skills, job_skills)
+    pairs = matrix.top_jobs(task["top"])
+    candidates, jobs = pairs[:, 0], pairs[:, 1]
+    # Pairs are grouped by candidate in rank order
+    starts = np.searchsorted(candidates, candidates)
+    # The matrix only shortlists; the reported skills are the same as the API's
+    # (resume skills mentioned in the relevant description text count as matched,
+    # preferred skills are listed after the required ones among the missing), and
+    # every column is taken from those lists. The descriptions were preprocessed
+    # at extraction, so the raw text is not needed here
+    gaps = [compute_skill_gap("", job_skills[j], candidate_skills[c], prepared[j])[:2] for c, j in pairs]
+    required = np.array([len(job_skills[j]) for j in jobs], dtype=np.int64)
+    missing_counts = np.array([len(missing) for _, missing in gaps], dtype=np.int64)
+
+    frame = pd.DataFrame({
+        "resume": np.array(parsed, dtype=object)[candidates],
+        "rank": np.arange(len(pairs)) - starts + 1,
+        "job_id": job_ids[jobs],
+        "title": titles[jobs],
+        # Share of the job's required skills the resume has
+        "score": np.round(np.where(required > 0, 1 - missing_counts / np.maximum(required, 1), 0.0), 4),
+        "matched_count": [len(matched) for matched, _ in gaps],
+        "required_count": required,
+        "matched_skills": [matched for matched, _ in gaps],
+        "missing_skills": [missing for _, missing in gaps],
+    }, columns=REPORT_COLUMNS)
+    _write_part(frame, task["part_path"], task["format"])
+
+    return {
+        "chunk": task["chunk"],
+        "resumes": len(task["paths"]),
+        "rows": len(frame),
+        "errors": errors,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+# --- Driver ---
+
+def _read_progress(path: str) -> tuple:
+    """Returns (run header or None, finished chunk indexes)."""
+    if not os.path.exists(path):
+        return None, set()
+    header, finished = None, set()
+    line = "\n"
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut off by the interruption; its chunk is simply redone
+                continue
+            if "run" in record:
+                header = record["run"]
+            elif "chunk" in record:
+                finished.add(record["chunk"])
+    if not line.endswith("\n"):
+        # Terminate a cut-off last line so the next record starts on its own
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n")
+    return header, finished
+
+
+def _extract_jobs(pool, jobs_path: str, chunk_size: int, workers: int, destination: str) -> int:
+    """Streams the postings through the pool and stores (job_id, title, prepared, required_skills)."""
+    frames, pending = [], []
+
+    def collect():
+        chunk, result = pending.pop(0)
+        prepared, skills = result.get()
+        frames.append(chunk.drop(columns="job_description").assign(prepared=prepared, required_skills=skills))
+
+    for chunk in iter_job_chunks(jobs_path, chunk_size):
+        pending.append((chunk, pool.apply_async(_extract_job_skills, (chunk["job_description"].tolist(),))))
+        # Bounded read-ahead keeps memory flat on large files
+        while len(pending) > 2 * workers:
+            collect()
+    while pending:
+        collect()
+
+    jobs = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["job_id", "title", "prepared", "required_skills"])
+    temporary = destination + ".tmp"
+    jobs.to_pickle(temporary)
+    os.replace(temporary, destination)
+    return len(jobs)
+
+
+def run(
+    resumes_dir: str,
+    jobs_path: str,
+    output_dir: str,
+    workers: int,
+    chunk_size: int = 32,
+    top: int = 10,
+    output_format: str = "parquet",
+    restart: bool = False
+) -> dict:
+    """
+    Matches every resume under `resumes_dir` against the postings in `jobs_path`.
+
+    Args:
+        resumes_dir: Directory of PDF resumes (searched recursively)
+        jobs_path: JSONL or Parquet file of postings
+        output_dir: Directory for the report parts and progress file
+        workers: Worker processes
+        chunk_size: Resumes per task (and postings per extraction batch)
+        top: Best jobs reported per resume
+        output_format: "parquet" or "csv"
+        restart: Discard the progress of an earlier run in `output_dir`
+
+    Returns:
+        Summary with resume, chunk, row and error counts
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    progress_path = os.path.join(output_dir, PROGRESS_FILE)
+    jobs_store = os.path.join(output_dir, JOBS_FILE)
+
+    paths = list_resumes(resumes_dir)
+    stat = os.stat(jobs_path)
+    # Anything that changes the chunking or the results invalidates earlier progress
+    run_header = {
+        "resumes": _digest(os.path.abspath(resumes_dir), paths),
+        "jobs": _digest(os.path.abspath(jobs_path), stat.st_size, stat.st_mtime_ns),
+        "chunk_size": chunk_size,
+        "top": top,
+        "format": output_format,
+        "taxonomy": SKILLS_TAXONOMY_VERSION,
+        "skill_gap": 4,
+    }
+
+    header, finished = (None, set()) if restart else _read_progress(progress_path)
+    if header is not None and header != run_header:
+        raise SystemExit(
+            f"{output_dir} holds a run with different inputs or options; "
+            "use another --output directory or pass --restart"
+        )
+    if header is None:
+        for name in os.listdir(output_dir):
+            if name.startswith("part-") or name in (PROGRESS_FILE, JOBS_FILE):
+                os.remove(os.path.join(output_dir, name))
+        finished = set()
+
+    chunks = [paths[start:start + chunk_size] for start in range(0, len(paths), chunk_size)]
+    extension = "parquet" if output_format == "parquet" else "csv"
+    tasks = [
+        {
+            "chunk": index,
+            "paths": chunk,
+            "resumes_dir": resumes_dir,
+            "jobs_path": jobs_store,
+            "part_path": os.path.join(output_dir, f"part-{index:05d}.{extension}"),
+            "format": output_format,
+            "top": top,
+        }
+        for index, chunk in enumerate(chunks)
+        if index not in finished
+    ]
+    logger.info(
+        "Batch starting: %d resumes in %d chunks (%d already done), %d workers",
+        len(paths), len(chunks), len(chunks) - len(tasks), workers
+    )
+
+    # Fail fast here: a worker that cannot load the model would fail every task
+    try:
+        setup_nlp()
+    except Exception as e:
+        raise SystemExit(f"Could not load the spaCy model: {e}")
+
+    started = time.perf_counter()
+    rows = errors = 0
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers, initializer=_init_worker) as pool, open(progress_path, "a", encoding="utf-8") as progress:
+        if header is None:
+            job_count = _extract_jobs(pool, jobs_path, chunk_size, workers, jobs_store)
+            logger.info("Extracted skills of %d postings", job_count)
+            progress.write(json.dumps({"run": run_header}) + "\n")
+            progress.flush()
+
+        for done, record in enumerate(pool.imap_unordered(match_chunk, tasks), 1):
+            progress.write(json.dumps(record) + "\n")
+            progress.flush()
+            rows += record["rows"]
+            errors += len(record["errors"])
+            for path, error in record["errors"].items():
+                logger.warning("Could not parse %s: %s", path, error)
+            if done % max(1, len(tasks) // 20) == 0 or done == len(tasks):
+                logger.info("Finished %d/%d chunks", done, len(tasks))
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "resumes": len(paths),
+        "chunks": len(chunks),
+        "chunks_run": len(tasks),
+        "rows": rows,
+        "errors": errors,
+        "seconds": round(elapsed, 2),
+        "resumes_per_second": round(sum(len(task["paths"]) for task in tasks) / elapsed, 1) if tasks else None,
+        "output": output_dir,
+    }
+    logger.info("Batch complete", extra=summary)
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Match a directory of PDF resumes against a file of job postings.")
+    parser.add_argument("--resumes", required=True, help="Directory of PDF resumes (searched recursively)")
+    parser.add_argument("--jobs", required=True, help="Postings as JSONL or Parquet (title, job_description or description, job_id or job_url)")
+    parser.add_argument("--output", required=True, help="Directory for the report parts and progress file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=32, help="Resumes per task")
+    parser.add_argument("--top", type=int, default=10, help="Best jobs reported per resume")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet", help="Report part format")
+    parser.add_argument("--restart", action="store_true", help="Ignore the progress of an earlier run in --output")
+    args = parser.parse_args(argv)
+
+    if args.format == "parquet" or args.jobs.endswith(".parquet"):
+        if importlib.util.find_spec("pyarrow") is None:
+            parser.error("Parquet needs pyarrow (pip install pyarrow); use --format csv and JSONL postings without it")
+
+    setup_logging(log_format=os.getenv("NAVICA_LOG_FORMAT", "text"))
+    try:
+        summary = run(
+            args.resumes, args.jobs, args.output, max(1, args.workers),
+            chunk_size=max(1, args.chunk_size), top=max(1, args.top),
+            output_format=args.format, restart=args.restart
+        )
+    finally:
+        shutdown_logging()
+    json.dump(summary, sys.stdout, indent=2)
+    print()
+    return 1 if summary["errors"] and summary["errors"] == summary["resumes"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
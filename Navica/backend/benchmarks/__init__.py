@@ -0,0 +1,7 @@
+"""
+Offline benchmarks for the NAVICA backend.
+
+Run from the backend directory, e.g. `python -m benchmarks.run_benchmarks`.
+JobSpy and Gemini are replaced by the stand-ins in `benchmarks.fakes`, so no
+network access or API key is needed.
+"""
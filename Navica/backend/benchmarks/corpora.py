@@ -0,0 +1,150 @@
+"""
+Deterministic resume and job-description corpora of configurable size.
+
+Job descriptions are assembled from the mock postings in `agent_core` plus
+typical scraped boilerplate; resumes are rendered to real PDFs with PyMuPDF.
+"""
+import asyncio
+import random
+from typing import List
+
+import fitz  # PyMuPDF
+import pandas as pd # Required by JobSpy
+
+from agent_core import _get_filtered_mock_jobs
+from resume_processor import SKILLS_LIST
+
+
+ROLES = [
+    "Software Engineer", "Backend Developer", "Frontend Developer", "Full Stack Developer",
+    "Data Scientist", "Machine Learning Engineer", "DevOps Engineer", "Cloud Architect",
+    "Data Engineer", "QA Engineer", "Security Engineer", "Mobile Developer"
+]
+
+LEVEL_PHRASES = [
+    "Senior", "Junior", "Lead", "Mid-level", "Associate", "Staff", "Entry level", ""
+]
+
+BOILERPLATE = [
+    "We are an equal opportunity employer and value diversity at our company.",
+    "Benefits include health insurance, paid time off, a learning budget and flexible hours.",
+    "Founded over a decade ago, our company has grown into a global team across many offices.",
+    "All qualified applicants will receive consideration for employment without regard to any protected status.",
+    "Apply now to join a fast-growing team that ships products used by millions of people.",
+]
+
+RESUME_SECTIONS = [
+    "EXPERIENCE", "EDUCATION", "PROJECTS", "SKILLS", "CERTIFICATIONS", "ACHIEVEMENTS"
+]
+
+
+def _mock_descriptions() -> List[str]:
+    postings = asyncio.run(_get_filtered_mock_jobs(ROLES))
+    return [posting.job_description for posting in postings]
+
+
+_BASE_DESCRIPTIONS = None
+
+
+def base_descriptions() -> List[str]:
+    global _BASE_DESCRIPTIONS
+    if _BASE_DESCRIPTIONS is None:
+        _BASE_DESCRIPTIONS = _mock_descriptions()
+    return _BASE_DESCRIPTIONS
+
+
+def make_job_description(target_chars: int, seed: int = 0) -> str:
+    """Builds a job description of roughly `target_chars` characters."""
+    rng = random.Random(seed)
+    descriptions = base_descriptions()
+    parts = [rng.choice(descriptions)]
+    length = len(parts[0])
+    while length < target_chars:
+        if rng.random() < 0.6:
+            part = rng.choice(BOILERPLATE)
+        else:
+            skills = ", ".join(rng.sample(SKILLS_LIST, 5))
+            part = f"- {rng.randint(1, 8)}+ years of experience with {skills}"
+        parts.append(part)
+        length += len(part) + 1
+    return "\n".join(parts)[:max(target_chars, 1)]
+
+
+def make_markdown_job_description(target_chars: int, seed: int = 0) -> str:
+    """
+    Builds a description shaped like JobSpy's markdown output: headed sections
+    (about us, requirements, nice to have, benefits), bullets and escaped markup.
+    """
+    rng = random.Random(seed)
+    skills = [skill.replace("+", "\\+").replace("#", "\\#") for skill in SKILLS_LIST]
+    role = rng.choice(ROLES)
+    sections = [
+        ("**About Us**", [rng.choice(BOILERPLATE) for _ in range(3)]),
+        ("## What You'll Do", [rng.choice(base_descriptions()).strip().splitlines()[0]]),
+        ("## Requirements", [f"* {rng.randint(1, 8)}\\+ years as a {role} with **{rng.choice(skills)}**"]),
+        ("**Nice to have:**", [f"* Experience with {', '.join(rng.sample(skills, 3))}"]),
+        ("### Benefits", [f"* {rng.choice(BOILERPLATE)}"]),
+        ("**Equal Opportunity**", [BOILERPLATE[0], BOILERPLATE[3]]),
+    ]
+    length = sum(len(heading) + sum(len(line) + 1 for line in lines) for heading, lines in sections)
+    while length < target_chars:
+        section = rng.choice(sections)
+        if section[0] == "## Requirements":
+            line = f"* Hands-on experience with {', '.join(rng.sample(skills, 4))}"
+        else:
+            line = f"* {rng.choice(BOILERPLATE)} [Learn more](https://careers.example.com/{rng.randint(1, 999)})"
+        section[1].append(line)
+        length += len(line) + 1
+    return "\n\n".join(f"{heading}\n\n" + "\n".join(lines) for heading, lines in sections)
+
+
+def make_job_descriptions(count: int, target_chars: int, seed: int = 0) -> List[str]:
+    return [make_job_description(target_chars, seed * 100003 + i) for i in range(count)]
+
+
+def make_jobs_dataframe(count: int, description_chars: int = 3000, seed: int = 0, site: str = "indeed") -> pd.DataFrame:
+    """Builds a DataFrame shaped like the one `scrape_jobs` returns."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        level = rng.choice(LEVEL_PHRASES)
+        role = rng.choice(ROLES)
+        rows.append({
+            "site": site,
+            "title": f"{level} {role}".strip(),
+            "company": f"Company {rng.randint(1, 200)}",
+            "location": rng.choice(["Bengaluru, India", "Pune, India", "Remote", "Hyderabad, India"]),
+            "description": make_job_description(description_chars, seed * 100003 + i),
+            "job_url": f"https://{site}.example.com/jobs/{seed}-{i}",
+        })
+    return pd.DataFrame(rows)
+
+
+def make_resume_text(target_chars: int, seed: int = 0) -> str:
+    """Builds resume-like text of roughly `target_chars` characters."""
+    rng = random.Random(seed)
+    lines = ["Jane Doe", "Software professional"]
+    length = sum(len(line) + 1 for line in lines)
+    while length < target_chars:
+        section = rng.choice(RESUME_SECTIONS)
+        skills = ", ".join(rng.sample(SKILLS_LIST, 6))
+        block = [
+            section,
+            f"Worked on {rng.choice(ROLES).lower()} projects using {skills}.",
+            f"Delivered {rng.randint(2, 20)} releases and mentored {rng.randint(1, 6)} engineers.",
+        ]
+        lines.extend(block)
+        length += sum(len(line) + 1 for line in block)
+    return "\n".join(lines)
+
+
+def make_resume_pdf(pages: int, seed: int = 0) -> bytes:
+    """Renders a resume PDF with the given number of text-filled pages."""
+    document = fitz.open()
+    for page_index in range(pages):
+        page = document.new_page()
+        text = make_resume_text(2500, seed * 1009 + page_index)
+        page.insert_textbox(fitz.Rect(40, 40, 560, 800), text, fontsize=9)
+    data = document.tobytes()
+    document.close()
+    return data
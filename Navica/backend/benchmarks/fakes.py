@@ -0,0 +1,210 @@
+"""
+Offline stand-ins for JobSpy and Gemini.
+
+`FakeScraper` serves postings from a pre-generated DataFrame (honouring
+`results_wanted` and `offset`) and `FakeGemini` replaces the
+`google.generativeai` module with one whose `generate_content` sleeps for a
+configurable latency. Both are installed with `patch_backend`.
+`ThrottlingServer` is a local HTTP job site that rate limits its clients.
+"""
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Optional
+
+import pandas as pd # Required by JobSpy
+
+import agent_core
+from benchmarks.corpora import make_jobs_dataframe
+from llm_scheduler import TokenBucket
+
+
+class FakeScraper:
+    """
+    Callable with the `scrape_jobs` signature, backed by a fixture DataFrame per site.
+
+    With `duplicate_rate`, every site after the first re-posts that fraction of
+    the first site's jobs under its own URLs, as job boards do.
+    """
+
+    def __init__(
+        self,
+        postings_per_site: int = 200,
+        description_chars: int = 3000,
+        latency: float = 0.0,
+        seed: int = 0,
+        duplicate_rate: float = 0.0
+    ):
+        self.latency = latency
+        self.duplicate_rate = duplicate_rate
+        self.calls = 0
+        self.rows_served = 0
+        self._lock = threading.Lock()
+        self._fixtures = {}
+        self._fixture_args = (postings_per_site, description_chars, seed)
+
+    def _fixture(self, site: str) -> pd.DataFrame:
+        with self._lock:
+            if site not in self._fixtures:
+                count, chars, seed = self._fixture_args
+                fixture = make_jobs_dataframe(count, chars, seed=seed + len(self._fixtures), site=site)
+                reposted = int(count * self.duplicate_rate)
+                if self._fixtures and reposted:
+                    first = next(iter(self._fixtures.values()))
+                    copies = first.iloc[::max(1, count // reposted)].head(reposted)
+                    fixture.loc[copies.index, ["title", "company", "description"]] = copies[["title", "company", "description"]].values
+                self._fixtures[site] = fixture
+            return self._fixtures[site]
+
+    def __call__(self, site_name, results_wanted: int = 15, offset: int = 0, **kwargs) -> pd.DataFrame:
+        sites = [site_name] if isinstance(site_name, str) else list(site_name)
+        if self.latency:
+            time.sleep(self.latency)
+        frames = [self._fixture(site).iloc[offset:offset + results_wanted] for site in sites]
+        result = pd.concat(frames, ignore_index=True)
+        with self._lock:
+            self.calls += 1
+            self.rows_served += len(result)
+        return result
+
+
+class _FakeResponse:
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGemini:
+    """
+    Drop-in for the `google.generativeai` module. Each `generate_content`
+    call sleeps for `latency` seconds (plus up to `jitter`), and fails with
+    probability `failure_rate` to exercise the fallback path.
+    """
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.0, failure_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def configure(self, api_key: Optional[str] = None, **kwargs):
+        pass
+
+    def GenerativeModel(self, model_name: str):
+        return SimpleNamespace(generate_content=self.generate_content)
+
+    def generate_content(self, prompt: str) -> _FakeResponse:
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + self._rng.random() * self.jitter
+            fail = self._rng.random() < self.failure_rate
+        time.sleep(delay)
+        if fail:
+            raise RuntimeError("429 Resource has been exhausted (fake quota error)")
+        return _FakeResponse(
+            "You already bring strong fundamentals to this role. Build a small project around the "
+            "missing skills, follow an official course for each, and document the results on GitHub."
+        )
+
+
+class ThrottlingServer:
+    """
+    Local HTTP stand-in for a job site that throttles like one: it serves
+    `rate` requests per second (bursts of `burst`) and answers the rest with
+    429 and Retry-After. It counts served, throttled and connections opened,
+    so rate limiting and session reuse can be checked. Use as a context
+    manager; `url` is its address.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, retry_after: float = 1.0, latency: float = 0.0):
+        self.bucket = TokenBucket(rate * 60, burst)
+        self.retry_after = retry_after
+        self.latency = latency
+        self.served = 0
+        self.throttled = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/jobs"
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so reused sessions reuse connections
+
+            def setup(self):
+                super().setup()
+                with stand_in._lock:
+                    stand_in.connections += 1
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                if stand_in.latency:
+                    time.sleep(stand_in.latency)
+                allowed = stand_in.bucket.try_acquire() == 0
+                with stand_in._lock:
+                    if allowed:
+                        stand_in.served += 1
+                    else:
+                        stand_in.throttled += 1
+                body = b'{"jobs": []}' if allowed else b'{"error": "rate limited"}'
+                self.send_response(200 if allowed else 429)
+                if not allowed:
+                    self.send_header("Retry-After", f"{stand_in.retry_after:g}")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self) -> "ThrottlingServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="throttling-server", daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@contextmanager
+def patch_backend(scraper: Optional[FakeScraper] = None, gemini: Optional[FakeGemini] = None):
+    """Installs the fakes into `agent_core` for the duration of the block."""
+    original_scrape = agent_core.scrape_jobs
+    original_genai = agent_core.genai
+    original_key = os.environ.get("GEMINI_API_KEY")
+    try:
+        if scraper is not None:
+            agent_core.scrape_jobs = scraper
+        if gemini is not None:
+            agent_core.genai = gemini
+            os.environ["GEMINI_API_KEY"] = "benchmark-fake-key"
+        yield
+    finally:
+        agent_core.scrape_jobs = original_scrape
+        agent_core.genai = original_genai
+        if original_key is None:
+            os.environ.pop("GEMINI_API_KEY", None)
+        else:
+            os.environ["GEMINI_API_KEY"] = original_key
@@ -0,0 +1,276 @@
+"""
+Load generator for the two API endpoints.
+
+Drives /api/v1/analyze_resume and /api/v1/search_and_analyze either with a
+fixed number of concurrent clients (closed loop) or at a fixed arrival rate
+(open loop, Poisson arrivals), and reports throughput, p50/p95/p99 latency
+and error rates. Unless --url is given, it starts `benchmarks.stub_app`
+(JobSpy and Gemini replaced by latency-injecting fakes) under uvicorn for each
+worker count in --workers, so container sizing can be swept locally:
+
+    python -m benchmarks.load_test --workers 1 2 4 --concurrency 16 --duration 30
+    python -m benchmarks.load_test --rate 4 --duration 60 --mix 0.8
+    python -m benchmarks.load_test --url http://localhost:8000 --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.corpora import make_resume_pdf
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SEARCH_PAYLOAD = {
+    "user_skills": ["python", "docker", "aws", "sql", "react"],
+    "selected_roles": ["Backend Developer", "Data Engineer"],
+    "experience_level": "above 5",
+    "work_model": "Remote",
+}
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class Recorder:
+    """Collects per-endpoint latencies and status codes."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+
+    def record(self, endpoint: str, latency: float, status: str):
+        self.latencies.setdefault(endpoint, []).append(latency)
+        counts = self.statuses.setdefault(endpoint, {})
+        counts[status] = counts.get(status, 0) + 1
+
+    def summary(self, elapsed: float) -> Dict[str, dict]:
+        report = {}
+        endpoints = list(self.latencies) + (["total"] if len(self.latencies) > 1 else [])
+        for endpoint in endpoints:
+            if endpoint == "total":
+                latencies = [value for values in self.latencies.values() for value in values]
+                statuses: Dict[str, int] = {}
+                for counts in self.statuses.values():
+                    for status, count in counts.items():
+                        statuses[status] = statuses.get(status, 0) + count
+            else:
+                latencies = self.latencies[endpoint]
+                statuses = self.statuses[endpoint]
+            ordered = sorted(latencies)
+            errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+            report[endpoint] = {
+                "requests": len(ordered),
+                "errors": errors,
+                "error_rate": round(errors / len(ordered), 4) if ordered else 0.0,
+                "throughput_rps": round(len(ordered) / elapsed, 3) if elapsed else 0.0,
+                "p50_ms": round(_percentile(ordered, 0.50) * 1000, 1),
+                "p95_ms": round(_percentile(ordered, 0.95) * 1000, 1),
+                "p99_ms": round(_percentile(ordered, 0.99) * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1) if ordered else 0.0,
+                "statuses": statuses,
+            }
+        return report
+
+
+class LoadGenerator:
+    """Issues requests against a running server and records the outcome of each."""
+
+    def __init__(self, base_url: str, mix: float, timeout: float, seed: int = 0):
+        self.base_url = base_url.rstrip("/")
+        self.mix = mix
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.pdf = make_resume_pdf(2, seed=seed)
+
+    def _pick_endpoint(self) -> str:
+        return "search_and_analyze" if self.rng.random() < self.mix else "analyze_resume"
+
+    async def _send(self, client: httpx.AsyncClient, endpoint: str, recorder: Recorder, started: float):
+        try:
+            if endpoint == "search_and_analyze":
+                response = await client.post(f"{self.base_url}/api/v1/search_and_analyze", json=SEARCH_PAYLOAD)
+            else:
+                response = await client.post(
+                    f"{self.base_url}/api/v1/analyze_resume",
+                    files={"resume_file": ("resume.pdf", self.pdf, "application/pdf")}
+                )
+            status = str(response.status_code)
+        except httpx.TimeoutException:
+            status = "timeout"
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        recorder.record(endpoint, time.perf_counter() - started, status)
+
+    async def closed_loop(self, concurrency: int, duration: float) -> Recorder:
+        """`concurrency` clients each send their next request as soon as the previous one finishes."""
+        recorder = Recorder()
+        deadline = time.perf_counter() + duration
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+            async def user():
+                while time.perf_counter() < deadline:
+                    await self._send(client, self._pick_endpoint(), recorder, time.perf_counter())
+
+            await asyncio.gather(*(user() for _ in range(concurrency)))
+        return recorder
+
+    async def open_loop(self, rate: float, duration: float, max_outstanding: int) -> Recorder:
+        """
+        Poisson arrivals at `rate` requests/sec regardless of how fast the
+        server answers. Latency is measured from the scheduled arrival time so
+        queueing delay on our side is not hidden (no coordinated omission).
+        """
+        recorder = Recorder()
+        limits = httpx.Limits(max_connections=max_outstanding, max_keepalive_connections=max_outstanding)
+        tasks = set()
+
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+            start = time.perf_counter()
+            next_arrival = start
+            while next_arrival < start + duration:
+                delay = next_arrival - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if len(tasks) >= max_outstanding:
+                    # Count arrivals we could not even send as client-side errors
+                    recorder.record(self._pick_endpoint(), 0.0, "client_overloaded")
+                else:
+                    task = asyncio.create_task(self._send(client, self._pick_endpoint(), recorder, next_arrival))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                next_arrival += self.rng.expovariate(rate)
+            if tasks:
+                await asyncio.gather(*tasks)
+        return recorder
+
+
+def _wait_until_ready(base_url: str, timeout: float, process: subprocess.Popen):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/api/v1/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"Server at {base_url} did not become ready within {timeout:.0f}s")
+
+
+@contextmanager
+def stub_server(workers: int, port: int, stub_env: Dict[str, str]):
+    """Runs `benchmarks.stub_app` under uvicorn with the given number of workers."""
+    env = {**os.environ, **stub_env, "NAVICA_LOG_LEVEL": os.getenv("NAVICA_LOG_LEVEL", "WARNING")}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.stub_app:app",
+         "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_until_ready(base_url, timeout=120, process=process)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def run_scenario(base_url: str, args) -> dict:
+    generator = LoadGenerator(base_url, mix=args.mix, timeout=args.timeout, seed=args.seed)
+    if args.warmup > 0:
+        asyncio.run(generator.closed_loop(min(args.concurrency, 2), args.warmup))
+
+    started = time.perf_counter()
+    if args.rate:
+        recorder = asyncio.run(generator.open_loop(args.rate, args.duration, args.max_outstanding))
+    else:
+        recorder = asyncio.run(generator.closed_loop(args.concurrency, args.duration))
+    elapsed = time.perf_counter() - started
+    return recorder.summary(elapsed)
+
+
+def _print_table(rows: List[dict]):
+    header = f"{'workers':>7} {'endpoint':<20} {'reqs':>6} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'err%':>6}"
+    print(header, file=sys.stderr)
+    print("-" * len(header), file=sys.stderr)
+    for row in rows:
+        for endpoint, stats in row["endpoints"].items():
+            print(
+                f"{str(row['workers']):>7} {endpoint:<20} {stats['requests']:>6} {stats['throughput_rps']:>8.2f} "
+                f"{stats['p50_ms']:>7.0f}ms {stats['p95_ms']:>7.0f}ms {stats['p99_ms']:>7.0f}ms "
+                f"{stats['error_rate'] * 100:>5.1f}%",
+                file=sys.stderr
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the NAVICA API endpoints.")
+    parser.add_argument("--url", help="Target an already running server instead of starting stub servers")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1], help="uvicorn worker counts to sweep")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the stub server")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients (closed loop)")
+    parser.add_argument("--rate", type=float, default=None, help="Arrival rate in requests/sec (open loop)")
+    parser.add_argument("--max-outstanding", type=int, default=256, help="In-flight cap for open-loop mode")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured warm-up seconds")
+    parser.add_argument("--mix", type=float, default=0.5, help="Fraction of requests sent to search_and_analyze")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scrape-latency", type=float, default=1.0, help="Stub scrape_jobs latency (seconds)")
+    parser.add_argument("--gemini-latency", type=float, default=0.8, help="Stub Gemini latency (seconds)")
+    parser.add_argument("--gemini-failure-rate", type=float, default=0.0, help="Stub Gemini failure rate")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    stub_env = {
+        "NAVICA_STUB_SCRAPE_LATENCY": str(args.scrape_latency),
+        "NAVICA_STUB_GEMINI_LATENCY": str(args.gemini_latency),
+        "NAVICA_STUB_GEMINI_FAILURE_RATE": str(args.gemini_failure_rate),
+    }
+    mode = {"mode": "open_loop", "rate": args.rate} if args.rate else {"mode": "closed_loop", "concurrency": args.concurrency}
+
+    rows = []
+    if args.url:
+        rows.append({"workers": "external", "endpoints": run_scenario(args.url, args)})
+    else:
+        for workers in args.workers:
+            with stub_server(workers, args.port, stub_env) as base_url:
+                rows.append({"workers": workers, "endpoints": run_scenario(base_url, args)})
+
+    _print_table(rows)
+    report = {
+        "config": {**mode, "duration_s": args.duration, "mix": args.mix, **({} if args.url else stub_env)},
+        "scenarios": rows,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,621 @@
+"""
+End-to-end benchmark suite for the NAVICA backend.
+
+Measures each pipeline stage over generated corpora of several sizes, with
+JobSpy and Gemini replaced by offline fakes, and writes the results as JSON so
+runs from different commits can be compared:
+
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --compare bench.json
+"""
+import argparse
+import asyncio
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import requests
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+
+# Benchmarks measure this process only; never read or fill a shared cache
+os.environ["NAVICA_CACHE_URL"] = ""
+# The fake Gemini has no quota, so the scheduler's rate limit would only add waiting
+os.environ.setdefault("NAVICA_GEMINI_RPM", "1000000")
+os.environ.setdefault("NAVICA_GEMINI_BURST", "1000")
+# No background scrapes during measurements (warming is measured explicitly)
+os.environ.setdefault("NAVICA_WARM_TOP_N", "0")
+
+import agent_core
+import cache_warmer
+from agent_core import analyze_job_and_resume, fetch_jobs_with_jobspy
+from benchmarks.corpora import (
+    make_job_description, make_jobs_dataframe, make_markdown_job_description, make_resume_pdf, make_resume_text
+)
+from benchmarks.fakes import FakeGemini, FakeScraper, ThrottlingServer, patch_backend
+from cache import clear_local_caches, encode
+from dedup import NearDuplicateDetector
+from jd_preprocess import clear_preprocess_cache, preprocess_job_description
+from experience_filter import FilterYieldTracker
+from models import JobPosting, JobResult
+from pydantic import TypeAdapter
+from records import AnalysisRecord, JobRecord, job_results_json
+import responses
+import resume_processor
+from scrape_scheduler import ScrapeThrottledError, SiteScheduler
+from resume_processor import extract_key_skills, extract_text_from_pdf, match_skills, setup_nlp
+
+
+SEARCH_PARAMS = {
+    "user_skills": ["python", "docker", "aws", "sql", "react"],
+    "selected_roles": ["Backend Developer", "Data Engineer"],
+    "experience_level": "above 5",
+    "work_model": "Remote",
+}
+
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return {
+        "runs": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[p95_index] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _measure(func: Callable[[], object], repeat: int, warmup: int = 1, setup: Optional[Callable[[], object]] = None) -> Dict[str, float]:
+    """Times `func`; `setup` runs untimed before every call."""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        func()
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return _summarize(samples)
+
+
+def bench_pdf_extraction(loop, repeat: int, page_counts: List[int]) -> List[dict]:
+    results = []
+    for pages in page_counts:
+        data = make_resume_pdf(pages, seed=pages)
+
+        def run():
+            upload = UploadFile(file=io.BytesIO(data), filename="resume.pdf")
+            return loop.run_until_complete(extract_text_from_pdf(upload))
+
+        results.append({
+            "name": "extract_text_from_pdf",
+            "params": {"pages": pages, "pdf_bytes": len(data)},
+            "stats": _measure(run, repeat),
+        })
+    return results
+
+
+def bench_skill_extraction(repeat: int, sizes: List[int]) -> List[dict]:
+    results = []
+    for chars in sizes:
+        for kind, text in (("job_description", make_job_description(chars, seed=chars)),
+                           ("resume", make_resume_text(chars, seed=chars))):
+            results.append({
+                "name": "extract_key_skills",
+                "params": {"kind": kind, "chars": len(text)},
+                "stats": _measure(lambda: (clear_local_caches(), extract_key_skills(text)), repeat),
+            })
+            # Repeat postings: served from the skills cache
+            results.append({
+                "name": "extract_key_skills_cached",
+                "params": {"kind": kind, "chars": len(text)},
+                "stats": _measure(lambda: extract_key_skills(text), repeat),
+            })
+    return results
+
+
+def bench_jd_preprocess(repeat: int, sizes: List[int]) -> List[dict]:
+    results = []
+    for chars in sizes:
+        text = make_markdown_job_description(chars, seed=chars)
+
+        def run():
+            clear_preprocess_cache()
+            return preprocess_job_description(text)
+
+        prepared = run()
+        results.append({
+            "name": "jd_preprocess",
+            "params": {"chars": len(text)},
+            "stats": _measure(run, repeat),
+            "counters": {f"{stage}_bytes": count for stage, count in prepared.byte_counts.items()},
+        })
+        # Skill extraction on the raw markdown vs on the relevant sections only
+        for kind, source in (("raw", text), ("preprocessed", prepared.relevant_text)):
+            results.append({
+                "name": "extract_key_skills_scraped",
+                "params": {"input": kind, "chars": len(text)},
+                "stats": _measure(lambda: (clear_local_caches(), extract_key_skills(source)), repeat),
+            })
+    return results
+
+
+def bench_fetch_jobs(repeat: int, postings_per_site: List[int], description_chars: int) -> List[dict]:
+    results = []
+    for count in postings_per_site:
+        scraper = FakeScraper(postings_per_site=count, description_chars=description_chars, seed=count)
+
+        def run():
+            # Start every run with a cold pass-rate estimate and caches so runs are comparable
+            agent_core.yield_tracker = FilterYieldTracker()
+            clear_local_caches()
+            return fetch_jobs_with_jobspy(**SEARCH_PARAMS)
+
+        with patch_backend(scraper=scraper):
+            stats = _measure(run, repeat)
+        results.append({
+            "name": "fetch_jobs_with_jobspy",
+            "params": {"postings_per_site": count, "description_chars": description_chars},
+            "stats": stats,
+            "counters": {"scrape_calls": scraper.calls, "rows_served": scraper.rows_served},
+        })
+    return results
+
+
+def bench_dedup(repeat: int, postings_per_site: List[int], description_chars: int) -> List[dict]:
+    results = []
+    for count in postings_per_site:
+        # Two sites, a fifth of the second one's jobs re-posted from the first
+        scraper = FakeScraper(postings_per_site=count, description_chars=description_chars, seed=count, duplicate_rate=0.2)
+        jobs_df = scraper(["indeed", "google"], results_wanted=count)
+        removed = []
+
+        def run():
+            unique = NearDuplicateDetector().unique_mask(jobs_df)
+            removed.append(int(len(unique) - unique.sum()))
+
+        stats = _measure(run, repeat)
+        results.append({
+            "name": "near_duplicate_detection",
+            "params": {"rows": len(jobs_df), "description_chars": description_chars},
+            "stats": stats,
+            "counters": {"duplicates_removed": removed[-1]},
+        })
+    return results
+
+
+def bench_scrape_scheduling(scrapes: int, pages: int, site_rate: float) -> List[dict]:
+    """
+    Concurrent scrapes of a local site that throttles above `site_rate`
+    requests per second. Each scrape fetches `pages` pages and, like JobSpy,
+    stops at the first non-200 response: once with a fresh session per scrape
+    and no limits, once through a SiteScheduler with its pooled sessions.
+    """
+    results = []
+    for mode in ("fresh_sessions", "scheduled"):
+        with ThrottlingServer(rate=site_rate, burst=5, retry_after=0.2) as server:
+            scheduler = SiteScheduler("bench", rate=site_rate * 0.9, burst=5, concurrency=4, backoff_base=0.2)
+
+            def fetch_pages(session) -> int:
+                fetched = 0
+                for _ in range(pages):
+                    if session.get(server.url).status_code != 200:
+                        break
+                    fetched += 1
+                return fetched
+
+            def scrape(_) -> int:
+                if mode == "fresh_sessions":
+                    with requests.Session() as session:
+                        return fetch_pages(session)
+                try:
+                    with scheduler.slot():
+                        return fetch_pages(scheduler.pooled_session(lambda **kwargs: requests.Session()))
+                except ScrapeThrottledError:
+                    return 0
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(8) as executor:
+                fetched = sum(executor.map(scrape, range(scrapes)))
+            elapsed = time.perf_counter() - started
+            results.append({
+                "name": "scrape_scheduling",
+                "params": {"mode": mode, "scrapes": scrapes, "pages": pages, "site_rate": site_rate},
+                "stats": _summarize([elapsed]),
+                "counters": {
+                    "pages_fetched": fetched,
+                    "throttled": server.throttled,
+                    "connections": server.connections,
+                },
+            })
+    return results
+
+
+def bench_analyze(loop, repeat: int, sizes: List[int], gemini_latency: float) -> List[dict]:
+    results = []
+    gemini = FakeGemini(latency=gemini_latency)
+    with patch_backend(gemini=gemini):
+        for chars in sizes:
+            description = make_job_description(chars, seed=chars + 1)
+
+            def run():
+                clear_local_caches()
+                return loop.run_until_complete(analyze_job_and_resume(
+                    job_desc=description,
+                    user_skills=SEARCH_PARAMS["user_skills"],
+                    job_title="Senior Backend Developer"
+                ))
+
+            results.append({
+                "name": "analyze_job_and_resume",
+                "params": {"chars": len(description), "gemini_latency_s": gemini_latency},
+                "stats": _measure(run, repeat),
+            })
+    return results
+
+
+def _posting_rows(count: int, description_chars: int) -> List[dict]:
+    # Fresh string objects per row, as scraped postings arrive
+    return make_jobs_dataframe(count, description_chars, seed=count).to_dict("records")
+
+
+def _build_models(rows: List[dict]) -> list:
+    return [
+        JobPosting(
+            job_id=row["job_url"].rsplit("/", 1)[-1], title=row["title"], company=row["company"],
+            location=row["location"], job_description=row["description"], external_url=row["job_url"]
+        )
+        for row in rows
+    ]
+
+
+def _build_records(rows: List[dict]) -> list:
+    return [
+        JobRecord(
+            row["job_url"].rsplit("/", 1)[-1], row["title"], row["company"],
+            row["location"], row["description"], row["job_url"]
+        )
+        for row in rows
+    ]
+
+
+def _retained_memory(build: Callable[[List[dict]], list], count: int, description_chars: int) -> Dict[str, int]:
+    """Memory still held by the built postings once the scraped rows are gone."""
+    gc.collect()
+    tracemalloc.start()
+    rows = _posting_rows(count, description_chars)
+    held = build(rows)
+    del rows
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+    del held
+    return {"retained_bytes": current, "peak_bytes": peak, "retained_blocks": blocks}
+
+
+def bench_memory(repeat: int, count: int, description_chars: int) -> List[dict]:
+    """Building and holding `count` postings as validated models vs. slotted records."""
+    results = []
+    rows = _posting_rows(count, description_chars)
+    for kind, build in (("JobPosting", _build_models), ("JobRecord", _build_records)):
+        counters = _retained_memory(build, count, description_chars)
+        counters["cache_encoded_bytes"] = len(encode(build(rows)))
+        results.append({
+            "name": "hold_postings",
+            "params": {"type": kind, "postings": count, "description_chars": description_chars},
+            "stats": _measure(lambda: build(rows), repeat),
+            "counters": counters,
+        })
+    return results
+
+
+def _peak_memory(run: Callable[[], object]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def bench_large_documents(repeat: int, sizes: List[int]) -> List[dict]:
+    """Skill matching on huge texts, chunked vs. one Doc (where spaCy's max_length allows)."""
+    results = []
+    default_chunk_chars = resume_processor.NLP_CHUNK_CHARS
+    for chars in sizes:
+        text = make_resume_text(chars, seed=chars)
+        modes = [("chunked", default_chunk_chars)]
+        if len(text) <= resume_processor.nlp.max_length:
+            modes.append(("single_doc", len(text)))
+        for mode, chunk_chars in modes:
+            resume_processor.NLP_CHUNK_CHARS = chunk_chars
+            try:
+                results.append({
+                    "name": "match_skills_large",
+                    "params": {"mode": mode, "chars": len(text)},
+                    "stats": _measure(lambda: match_skills(text), repeat),
+                    "counters": {"peak_bytes": _peak_memory(lambda: match_skills(text))},
+                })
+            finally:
+                resume_processor.NLP_CHUNK_CHARS = default_chunk_chars
+    return results
+
+
+def bench_serialization(repeat: int, counts: List[int], description_chars: int) -> List[dict]:
+    """Encoding search results: pydantic models vs records straight to JSON, full vs slim, and compression."""
+    results = []
+    adapter = TypeAdapter(List[JobResult])
+    for count in counts:
+        jobs = _build_records(_posting_rows(count, description_chars))
+        analyzed = [
+            (job, AnalysisRecord(["python", "docker", "sql"], ["aws", "kubernetes"], "Learn AWS and Kubernetes.", "gemini"))
+            for job in jobs
+        ]
+        models = [JobResult.model_construct(job_details=job.to_model(), analysis=analysis.to_model()) for job, analysis in analyzed]
+        cases = {
+            ("pydantic", "full"): lambda: adapter.dump_json(models),
+            ("records", "full"): lambda: job_results_json(analyzed),
+            ("records", "slim"): lambda: job_results_json(analyzed, description_chars=0),
+        }
+        for (encoder, mode), run in cases.items():
+            body = run()
+            results.append({
+                "name": "job_results_json",
+                "params": {"jobs": count, "encoder": encoder, "mode": mode},
+                "stats": _measure(run, repeat),
+                "counters": {"body_bytes": len(body)},
+            })
+        full = job_results_json(analyzed)
+        for coding in ("gzip", "br") if responses.brotli else ("gzip",):
+            results.append({
+                "name": "response_compress",
+                "params": {"jobs": count, "coding": coding},
+                "stats": _measure(lambda: responses.compress(full, coding), repeat),
+                "counters": {"body_bytes": len(full), "compressed_bytes": len(responses.compress(full, coding))},
+            })
+    return results
+
+
+def bench_endpoints(repeat: int, gemini_latency: float, description_chars: int) -> List[dict]:
+    from app import app
+
+    results = []
+    pdf = make_resume_pdf(2, seed=7)
+    scraper = FakeScraper(postings_per_site=100, description_chars=description_chars)
+    gemini = FakeGemini(latency=gemini_latency)
+
+    with patch_backend(scraper=scraper, gemini=gemini), TestClient(app) as client:
+        def analyze_resume():
+            clear_local_caches()
+            response = client.post(
+                "/api/v1/analyze_resume",
+                files={"resume_file": ("resume.pdf", pdf, "application/pdf")}
+            )
+            response.raise_for_status()
+
+        def search_and_analyze(query: str = ""):
+            agent_core.yield_tracker = FilterYieldTracker()
+            clear_local_caches()
+            response = client.post("/api/v1/search_and_analyze" + query, json=SEARCH_PARAMS)
+            response.raise_for_status()
+            return response
+
+        def frontend(headers):
+            response = client.get("/", headers=headers)
+            assert response.status_code in (200, 304), response.status_code
+            return response
+
+        page = frontend({"Accept-Encoding": "gzip, br"})
+        for case, headers in (("compressed", {"Accept-Encoding": "gzip, br"}),
+                              ("revalidated", {"If-None-Match": page.headers["etag"]})):
+            results.append({
+                "name": "GET /",
+                "params": {"case": case},
+                "stats": _measure(lambda: frontend(headers), repeat),
+                "counters": {"wire_bytes": int(frontend(headers).headers.get("content-length", 0))},
+            })
+
+        results.append({
+            "name": "POST /api/v1/analyze_resume",
+            "params": {"pages": 2, "pdf_bytes": len(pdf)},
+            "stats": _measure(analyze_resume, repeat),
+        })
+        # Full results, and the slim list the frontend asks for (descriptions left out)
+        for mode, query in (("full", ""), ("slim", "?description_chars=0")):
+            response = search_and_analyze(query)
+            results.append({
+                "name": "POST /api/v1/search_and_analyze",
+                "params": {"gemini_latency_s": gemini_latency, "description_chars": description_chars, "mode": mode},
+                "stats": _measure(lambda: search_and_analyze(query), repeat),
+                "counters": {"response_bytes": len(response.content), "wire_bytes": response.num_bytes_downloaded},
+            })
+
+        job_id = response.json()[0]["job_details"]["job_id"]
+        results.append({
+            "name": "GET /api/v1/jobs/{job_id}",
+            "params": {"description_chars": description_chars},
+            "stats": _measure(lambda: client.get(f"/api/v1/jobs/{job_id}").raise_for_status(), repeat),
+        })
+
+        # The first user of a popular search after the cache warmer ran (jobs
+        # and their skills prefetched; only the analysis is left)
+        def warm_search_cache():
+            agent_core.yield_tracker = FilterYieldTracker()
+            clear_local_caches()
+            cache_warmer.search_stats.record(
+                SEARCH_PARAMS["selected_roles"], SEARCH_PARAMS["user_skills"],
+                SEARCH_PARAMS["experience_level"], SEARCH_PARAMS["work_model"]
+            )
+            asyncio.run(cache_warmer.warm_once("benchmark", top_n=1))
+
+        def warmed_search():
+            client.post("/api/v1/search_and_analyze", json=SEARCH_PARAMS).raise_for_status()
+
+        cache_warmer.WARM_PAUSE = 0
+        results.append({
+            "name": "POST /api/v1/search_and_analyze (after cache warming)",
+            "params": {"gemini_latency_s": gemini_latency, "description_chars": description_chars},
+            "stats": _measure(warmed_search, repeat, setup=warm_search_cache),
+        })
+
+        # Refining that search with its session token (skills edited, filters kept)
+        token = search_and_analyze().headers["X-Navica-Session"]
+        refined = dict(SEARCH_PARAMS, user_skills=SEARCH_PARAMS["user_skills"] + ["technical writing"])
+
+        def refine_search():
+            response = client.post("/api/v1/search_and_analyze", json=refined, headers={"X-Navica-Session": token})
+            response.raise_for_status()
+
+        results.append({
+            "name": "POST /api/v1/search_and_analyze (session refinement)",
+            "params": {"gemini_latency_s": gemini_latency, "description_chars": description_chars},
+            "stats": _measure(refine_search, repeat),
+        })
+
+        # Recruiter screening: 50 resumes x 10 jobs, suggestions for the top 5 pairs
+        bulk_files = [
+            ("resume_files", (f"resume_{i}.pdf", make_resume_pdf(2, seed=i), "application/pdf"))
+            for i in range(50)
+        ]
+        bulk_jobs = json.dumps([
+            {"title": f"Job {i}", "job_description": make_job_description(description_chars, seed=i)}
+            for i in range(10)
+        ])
+
+        def bulk_match():
+            clear_local_caches()
+            response = client.post("/api/v1/bulk_match", files=bulk_files, data={"jobs": bulk_jobs, "top_k": "5"})
+            response.raise_for_status()
+
+        results.append({
+            "name": "POST /api/v1/bulk_match",
+            "params": {"resumes": len(bulk_files), "jobs": 10, "top_k": 5, "gemini_latency_s": gemini_latency},
+            "stats": _measure(bulk_match, repeat),
+        })
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """Lists benchmarks whose mean regressed by more than `threshold` (e.g. 0.1 = 10%)."""
+    def key(result):
+        return result["name"], json.dumps(result["params"], sort_keys=True)
+
+    previous = {key(result): result for result in baseline.get("results", [])}
+    lines = []
+    for result in current["results"]:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        before, after = old["stats"]["mean_ms"], result["stats"]["mean_ms"]
+        change = (after - before) / before if before else 0.0
+        marker = "REGRESSION" if change > threshold else "ok"
+        lines.append(f"{marker:>10}  {result['name']} {result['params']}: {before:.2f} ms -> {after:.2f} ms ({change:+.1%})")
+    return lines
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the NAVICA backend benchmarks.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("--quick", action="store_true", help="Smaller corpora and fewer runs")
+    parser.add_argument("--gemini-latency", type=float, default=0.05, help="Injected Gemini latency (seconds)")
+    parser.add_argument("--only", nargs="*", default=None,
+                        choices=["pdf", "skills", "fetch", "analyze", "memory", "endpoints"],
+                        help="Run only these groups")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Regression threshold for --compare")
+    args = parser.parse_args(argv)
+
+    repeat = 2 if args.quick else args.repeat
+    page_counts = [1, 5] if args.quick else [1, 5, 20]
+    text_sizes = [1_000, 10_000] if args.quick else [1_000, 10_000, 50_000]
+    postings = [25, 100] if args.quick else [25, 100, 400]
+    description_chars = 3_000
+    held_postings = 2_000 if args.quick else 10_000
+    large_document_sizes = [200_000] if args.quick else [200_000, 900_000, 5_000_000]
+    groups = set(args.only or ["pdf", "skills", "fetch", "analyze", "memory", "endpoints"])
+    # Keep per-request logging out of the measurements (and out of stdout)
+    os.environ.setdefault("NAVICA_LOG_LEVEL", "WARNING")
+
+    setup_nlp()
+    loop = asyncio.new_event_loop()
+    results: List[dict] = []
+    try:
+        if "pdf" in groups:
+            results += bench_pdf_extraction(loop, repeat, page_counts)
+        if "skills" in groups:
+            results += bench_skill_extraction(repeat, text_sizes)
+            results += bench_jd_preprocess(repeat, text_sizes)
+        if "fetch" in groups:
+            results += bench_fetch_jobs(repeat, postings, description_chars)
+            results += bench_dedup(repeat, postings, description_chars)
+            results += bench_scrape_scheduling(16, 5, site_rate=20)
+        if "analyze" in groups:
+            results += bench_analyze(loop, repeat, text_sizes, args.gemini_latency)
+        if "memory" in groups:
+            results += bench_memory(repeat, held_postings, 1_000)
+            results += bench_large_documents(repeat, large_document_sizes)
+        if "endpoints" in groups:
+            results += bench_serialization(repeat, postings, description_chars)
+            results += bench_endpoints(repeat, args.gemini_latency, description_chars)
+    finally:
+        loop.close()
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        lines = compare(report, baseline, args.threshold)
+        print("\n".join(lines), file=sys.stderr)
+        if any(line.lstrip().startswith("REGRESSION") for line in lines):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""
+The NAVICA app with JobSpy and Gemini replaced by the offline fakes, for load
+testing. Each uvicorn worker imports this module, so the fakes are installed
+per process:
+
+    uvicorn benchmarks.stub_app:app --workers 4
+
+Stub behaviour is configured through environment variables:
+    NAVICA_STUB_SCRAPE_LATENCY     seconds per scrape_jobs call (default 1.0)
+    NAVICA_STUB_POSTINGS_PER_SITE  fixture size per job site (default 200)
+    NAVICA_STUB_DESCRIPTION_CHARS  characters per job description (default 3000)
+    NAVICA_STUB_GEMINI_LATENCY     seconds per Gemini call (default 0.8)
+    NAVICA_STUB_GEMINI_JITTER      extra random Gemini latency (default 0.4)
+    NAVICA_STUB_GEMINI_FAILURE_RATE  fraction of Gemini calls that fail (default 0)
+"""
+import os
+
+import agent_core
+from benchmarks.fakes import FakeGemini, FakeScraper
+
+
+scraper = FakeScraper(
+    postings_per_site=int(os.getenv("NAVICA_STUB_POSTINGS_PER_SITE", "200")),
+    description_chars=int(os.getenv("NAVICA_STUB_DESCRIPTION_CHARS", "3000")),
+    latency=float(os.getenv("NAVICA_STUB_SCRAPE_LATENCY", "1.0")),
+)
+gemini = FakeGemini(
+    latency=float(os.getenv("NAVICA_STUB_GEMINI_LATENCY", "0.8")),
+    jitter=float(os.getenv("NAVICA_STUB_GEMINI_JITTER", "0.4")),
+    failure_rate=float(os.getenv("NAVICA_STUB_GEMINI_FAILURE_RATE", "0")),
+    seed=os.getpid(),
+)
+
+agent_core.scrape_jobs = scraper
+agent_core.genai = gemini
+os.environ["GEMINI_API_KEY"] = "load-test-fake-key"
+
+from app import app  # noqa: E402  (imported after the fakes are installed)
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models import BulkJobInput, BulkCandidate, BulkJob, CandidateJobMatch, BulkMatchResult
+from resume_processor import pdf_bytes_to_text, extract_key_skills_batch_async
+from agent_core import generate_suggestion
+from llm_scheduler import PRIORITY_BATCH
+from executors import run_in_pool
+from metrics import STAGE_LATENCY
+from tracing import traced, current_span
+from jd_preprocess import preprocess_job_description
+
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds per bulk request
+BULK_MAX_RESUMES = int(os.getenv("NAVICA_BULK_MAX_RESUMES", "500"))
+BULK_MAX_JOBS = int(os.getenv("NAVICA_BULK_MAX_JOBS", "50"))
+
+# Pairs that get a (Gemini) suggestion, by default and at most
+BULK_TOP_K = int(os.getenv("NAVICA_BULK_TOP_K", "10"))
+BULK_MAX_TOP_K = int(os.getenv("NAVICA_BULK_MAX_TOP_K", "50"))
+
+# Ranked pairs returned in `matches` by default (the score matrix is always complete)
+BULK_MAX_MATCHES = int(os.getenv("NAVICA_BULK_MAX_MATCHES", "200"))
+
+
+def _indicator(skill_lists: Sequence[Sequence[str]], index: Dict[str, int]) -> np.ndarray:
+    """Boolean (documents x vocabulary) matrix of which skills each document has."""
+    matrix = np.zeros((len(skill_lists), len(index)), dtype=bool)
+    lengths = [len(skills) for skills in skill_lists]
+    rows = np.repeat(np.arange(len(skill_lists)), lengths)
+    columns = np.fromiter((index[skill] for skills in skill_lists for skill in skills), dtype=np.int64, count=sum(lengths))
+    matrix[rows, columns] = True
+    return matrix
+
+
+class SkillMatrix:
+    """
+    Skill overlap of every candidate with every job.
+
+    Candidates and jobs become boolean rows over a shared skill vocabulary, so
+    the matched-skill counts for all pairs are one matrix product and the
+    per-pair skill lists are row intersections.
+    """
+
+    def __init__(self, candidate_skills: Sequence[Sequence[str]], job_skills: Sequence[Sequence[str]]):
+        vocabulary = sorted(set().union(*candidate_skills, *job_skills))
+        index = {skill: position for position, skill in enumerate(vocabulary)}
+        self.vocabulary = np.array(vocabulary, dtype=object)
+        self.candidates = _indicator(candidate_skills, index)
+        self.jobs = _indicator(job_skills, index)
+
+        # float32 goes through BLAS and is exact for counts far beyond any skill list
+        self.matched_counts = (self.candidates.astype(np.float32) @ self.jobs.T.astype(np.float32)).astype(np.int32)
+        required = self.jobs.sum(axis=1)
+        self.scores = np.divide(
+            self.matched_counts, required[None, :],
+            out=np.zeros(self.matched_counts.shape), where=required[None, :] > 0
+        )
+
+    def ranked_pairs(self) -> np.ndarray:
+        """(candidate, job) index pairs with any overlap, by score and then matched count."""
+        scores = self.scores.ravel()
+        counts = self.matched_counts.ravel()
+        order = np.lexsort((-counts, -scores))
+        order = order[counts[order] > 0]
+        return np.column_stack(np.unravel_index(order, self.scores.shape))
+
+    def top_jobs(self, count: int) -> np.ndarray:
+        """(candidate, job) index pairs of each candidate's `count` best jobs with any overlap, grouped by candidate."""
+        best = np.argsort(-self.scores, axis=1, kind="stable")[:, :count]
+        candidates = np.repeat(np.arange(len(self.scores)), best.shape[1])
+        jobs = best.ravel()
+        keep = self.matched_counts[candidates, jobs] > 0
+        return np.column_stack((candidates[keep], jobs[keep]))
+
+    def matched_skills(self, candidate: int, job: int) -> List[str]:
+        return self.vocabulary[self.candidates[candidate] & self.jobs[job]].tolist()
+
+    def missing_skills(self, candidate: int, job: int) -> List[str]:
+        return self.vocabulary[self.jobs[job] & ~self.candidates[candidate]].tolist()
+
+
+async def _parse_resumes(resumes: List[Tuple[str, bytes]]) -> List[Tuple[str, Optional[str]]]:
+    """Extracts the text of every PDF in parallel on the "nlp" pool; returns (text, error) per resume."""
+    with STAGE_LATENCY.time(stage="pdf_extraction_batch"):
+        texts = await asyncio.gather(
+            *(run_in_pool("nlp", pdf_bytes_to_text, content) for _, content in resumes),
+            return_exceptions=True
+        )
+
+    parsed = []
+    for (filename, _), text in zip(resumes, texts):
+        if isinstance(text, Exception):
+            logger.warning("Could not parse resume %s: %s", filename, text)
+            parsed.append(("", "Could not read PDF"))
+        elif not text.strip():
+            parsed.append(("", "No text could be extracted"))
+        else:
+            parsed.append((text, None))
+    return parsed
+
+
+@traced()
+async def bulk_match(
+    resumes: List[Tuple[str, bytes]],
+    jobs: List[BulkJobInput],
+    top_k: int = BULK_TOP_K,
+    max_matches: int = BULK_MAX_MATCHES,
+    use_llm: bool = True
+) -> BulkMatchResult:
+    """
+    Matches many resumes against many job descriptions.
+
+    Resumes are parsed in parallel, skills of all resumes and jobs are
+    extracted in batched passes, and every candidate/job pair is scored at
+    once (see `SkillMatrix`). Only the `top_k` best of the returned pairs get
+    an improvement suggestion, at batch priority on the Gemini scheduler.
+
+    Args:
+        resumes: (filename, PDF bytes) per candidate
+        jobs: Job descriptions to match against
+        top_k: Best pairs that get a suggestion (at most `max_matches`)
+        max_matches: Ranked pairs to return
+        use_llm: False gives every suggestion the rule-based way (degraded mode)
+
+    Returns:
+        BulkMatchResult with the parsed candidates, jobs, full score matrix
+        and ranked matches
+    """
+    parsed = await _parse_resumes(resumes)
+    skills = await extract_key_skills_batch_async(
+        [text for text, _ in parsed] + [preprocess_job_description(job.job_description).relevant_text for job in jobs]
+    )
+    candidate_skills, job_skills = skills[:len(parsed)], skills[len(parsed):]
+
+    with STAGE_LATENCY.time(stage="bulk_match_matrix"):
+        matrix = SkillMatrix(candidate_skills, job_skills)
+        ranked = matrix.ranked_pairs()
+        pairs = ranked[:max_matches]
+    # Suggestions for pairs that are not returned would only use up Gemini quota
+    top_k = min(top_k, max_matches)
+
+    matches = [
+        CandidateJobMatch.model_construct(
+            candidate_index=int(candidate),
+            job_index=int(job),
+            score=round(float(matrix.scores[candidate, job]), 4),
+            matched_skills=matrix.matched_skills(candidate, job),
+            missing_skills=matrix.missing_skills(candidate, job),
+            improvement_suggestion=None,
+            suggestion_source=None
+        )
+        for candidate, job in pairs
+    ]
+
+    suggestions = await asyncio.gather(*(
+        generate_suggestion(
+            user_skills=candidate_skills[match.candidate_index],
+            matched_skills=match.matched_skills,
+            missing_skills=match.missing_skills,
+            job_title=jobs[match.job_index].title,
+            priority=PRIORITY_BATCH,
+            use_llm=use_llm
+        )
+        for match in matches[:top_k]
+    ))
+    for match, (suggestion, source) in zip(matches, suggestions):
+        match.improvement_suggestion = suggestion
+        match.suggestion_source = source
+
+    current_span().set_attributes(
+        candidates=len(resumes), jobs=len(jobs), pairs_matched=len(ranked), suggestions=len(suggestions)
+    )
+    return BulkMatchResult.model_construct(
+        candidates=[
+            BulkCandidate.model_construct(filename=filename, extracted_skills=list(skills), error=error)
+            for (filename, _), (_, error), skills in zip(resumes, parsed, candidate_skills)
+        ],
+        jobs=[
+            BulkJob.model_construct(title=job.title, required_skills=list(skills))
+            for job, skills in zip(jobs, job_skills)
+        ],
+        score_matrix=np.round(matrix.scores, 4).tolist(),
+        matches=matches
+    )
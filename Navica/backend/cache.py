@@ -0,0 +1,383 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from metrics import REGISTRY
+from models import JobPosting, SkillAnalysis
+from records import JobRecord, AnalysisRecord
+
+
+logger = logging.getLogger(__name__)
+
+# Shared tier: redis://host:6379/0 (or fakeredis:// for local testing); empty = in-process only
+CACHE_URL = os.getenv("NAVICA_CACHE_URL", "")
+
+# Key prefix, so several deployments can share one Redis
+CACHE_PREFIX = os.getenv("NAVICA_CACHE_PREFIX", "navica")
+
+# Socket timeout for shared-tier calls; a slow cache must not slow down requests
+CACHE_TIMEOUT_SECONDS = float(os.getenv("NAVICA_CACHE_TIMEOUT_SECONDS", "0.1"))
+
+# After a shared-tier error, skip it for this long before trying again
+CACHE_RETRY_SECONDS = float(os.getenv("NAVICA_CACHE_RETRY_SECONDS", "5"))
+
+# Values at least this large (encoded) are zlib-compressed
+COMPRESS_MIN_BYTES = 512
+
+CACHE_REQUESTS = REGISTRY.counter(
+    "navica_cache_requests_total",
+    "Cache lookups by cache and result (l1_hit, l2_hit, miss)",
+    ("cache", "result")
+)
+
+CACHE_ERRORS = REGISTRY.counter(
+    "navica_cache_errors_total",
+    "Shared cache (L2) operations that failed",
+    ("cache",)
+)
+
+CACHE_L1_BYTES = REGISTRY.gauge(
+    "navica_cache_l1_bytes",
+    "Bytes held in the in-process cache tier",
+    ("cache",)
+)
+
+
+# --- Serialization ---
+# Models and records are stored as positional field lists (no repeated field
+# names). The schema version below is part of every key, so changing their
+# fields makes old entries unreachable instead of undecodable.
+
+_TYPES = {cls.__name__: cls for cls in (JobPosting, SkillAnalysis, JobRecord, AnalysisRecord)}
+_FIELDS = {
+    name: tuple(cls.model_fields) if issubclass(cls, BaseModel) else cls.__slots__
+    for name, cls in _TYPES.items()
+}
+SCHEMA_VERSION = hashlib.blake2b(repr(sorted(_FIELDS.items())).encode(), digest_size=4).hexdigest()
+
+
+def _to_plain(value: Any) -> Any:
+    name = type(value).__name__
+    if name in _TYPES:
+        return {"~": name, "v": [_to_plain(getattr(value, field)) for field in _FIELDS[name]]}
+    if isinstance(value, (list, tuple)):
+        return [_to_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_plain(item) for key, item in value.items()}
+    return value
+
+
+def _from_plain(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_from_plain(item) for item in value]
+    if isinstance(value, dict):
+        name = value.get("~")
+        if name is not None:
+            cls = _TYPES[name]
+            values = [_from_plain(item) for item in value["v"]]
+            if issubclass(cls, BaseModel):
+                # Written by us from validated models, so validation is skipped
+                return cls.model_construct(**dict(zip(_FIELDS[name], values)))
+            return cls(*values)
+        return {key: _from_plain(item) for key, item in value.items()}
+    return value
+
+
+def encode(value: Any) -> bytes:
+    """Serializes JSON-compatible values and the job/analysis models and records (also nested in lists/dicts)."""
+    data = json.dumps(_to_plain(value), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if len(data) >= COMPRESS_MIN_BYTES:
+        return b"z" + zlib.compress(data)
+    return b"j" + data
+
+
+def decode(data: bytes) -> Any:
+    body = zlib.decompress(data[1:]) if data[:1] == b"z" else data[1:]
+    return _from_plain(json.loads(body))
+
+
+def make_key(*parts: Any) -> str:
+    """Stable, fixed-length key for arbitrary JSON-compatible parts."""
+    raw = json.dumps(parts, separators=(",", ":"), sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+# --- Tiers ---
+
+class LocalTier:
+    """In-process LRU of encoded values, bounded by total size in bytes."""
+
+    def __init__(self, name: str, max_bytes: int):
+        self.name = name
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            data, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return data
+
+    def set(self, key: str, data: bytes, ttl: float):
+        if len(data) + len(key) > self.max_bytes:
+            return
+        with self._lock:
+            self._put(key, data, ttl)
+
+    def add(self, key: str, data: bytes, ttl: float) -> bool:
+        """Stores `data` only if `key` holds no live entry; returns whether it did."""
+        if len(data) + len(key) > self.max_bytes:
+            return False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                return False
+            self._put(key, data, ttl)
+            return True
+
+    def _put(self, key: str, data: bytes, ttl: float):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (data, time.monotonic() + ttl)
+        self._bytes += len(data) + len(key)
+        while self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+        CACHE_L1_BYTES.set(self._bytes, cache=self.name)
+
+    def _remove(self, key: str):
+        data, _ = self._entries.pop(key)
+        self._bytes -= len(data) + len(key)
+        CACHE_L1_BYTES.set(self._bytes, cache=self.name)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            CACHE_L1_BYTES.set(0, cache=self.name)
+
+
+class RedisTier:
+    """Shared tier speaking the Redis protocol (redis-py client, or fakeredis in tests)."""
+
+    def __init__(self, client):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisTier":
+        if url.startswith("fakeredis://"):
+            import fakeredis
+            return cls(fakeredis.FakeRedis())
+        import redis
+        return cls(redis.Redis.from_url(
+            url,
+            socket_timeout=CACHE_TIMEOUT_SECONDS,
+            socket_connect_timeout=CACHE_TIMEOUT_SECONDS
+        ))
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """Returns the value and its remaining TTL in seconds, or None."""
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.get(key)
+        pipeline.pttl(key)
+        data, ttl_ms = pipeline.execute()
+        if data is None:
+            return None
+        return data, (ttl_ms / 1000.0 if ttl_ms and ttl_ms > 0 else 0.0)
+
+    def set(self, key: str, data: bytes, ttl: float):
+        self.client.set(key, data, px=max(1, int(ttl * 1000)))
+
+    def add(self, key: str, data: bytes, ttl: float) -> bool:
+        """SET NX PX: stores `data` only if `key` is absent; returns whether it did."""
+        return bool(self.client.set(key, data, px=max(1, int(ttl * 1000)), nx=True))
+
+
+class Cache:
+    """
+    Two-tier cache: a per-process L1 in front of an optional shared L2.
+
+    L2 hits are copied into L1 for the rest of their TTL. If the shared tier
+    fails, it is skipped for CACHE_RETRY_SECONDS and the cache keeps working
+    from L1 alone. Keys are namespaced with the cache name and SCHEMA_VERSION.
+    """
+
+    def __init__(self, name: str, ttl: float, l1_max_bytes: int, l2: Optional[RedisTier] = None):
+        self.name = name
+        self.ttl = ttl
+        self.l1 = LocalTier(name, l1_max_bytes)
+        self.l2 = l2
+        self._l2_down_until = 0.0
+
+    def _key(self, key: str) -> str:
+        return f"{CACHE_PREFIX}:{SCHEMA_VERSION}:{self.name}:{key}"
+
+    def _l2_available(self) -> bool:
+        return self.l2 is not None and time.monotonic() >= self._l2_down_until
+
+    def _l2_failed(self, operation: str, error: Exception):
+        CACHE_ERRORS.inc(cache=self.name)
+        self._l2_down_until = time.monotonic() + CACHE_RETRY_SECONDS
+        logger.warning("Shared cache %s failed for %s: %s", operation, self.name, error)
+
+    def _l2_get(self, full_key: str) -> Optional[bytes]:
+        if not self._l2_available():
+            return None
+        try:
+            found = self.l2.get(full_key)
+        except Exception as e:
+            self._l2_failed("get", e)
+            return None
+        if found is None:
+            return None
+        data, ttl = found
+        if ttl > 0:
+            self.l1.set(full_key, data, ttl)
+        return data
+
+    def _l2_set(self, full_key: str, data: bytes, ttl: float):
+        if not self._l2_available():
+            return
+        try:
+            self.l2.set(full_key, data, ttl)
+        except Exception as e:
+            self._l2_failed("set", e)
+
+    def _l2_add(self, full_key: str, data: bytes, ttl: float) -> Optional[bool]:
+        """Whether the shared tier stored the value, or None when it is unavailable."""
+        if not self._l2_available():
+            return None
+        try:
+            return self.l2.add(full_key, data, ttl)
+        except Exception as e:
+            self._l2_failed("add", e)
+            return None
+
+    def _added(self, full_key: str, data: bytes, ttl: float, added: Optional[bool]) -> bool:
+        # Without the shared tier, L1 decides (per process only)
+        if added is None:
+            return self.l1.add(full_key, data, ttl)
+        if added:
+            self.l1.set(full_key, data, ttl)
+        return added
+
+    def _decode(self, data: Optional[bytes], result: str, default: Any) -> Any:
+        if data is None:
+            CACHE_REQUESTS.inc(cache=self.name, result="miss")
+            return default
+        CACHE_REQUESTS.inc(cache=self.name, result=result)
+        return decode(data)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        full_key = self._key(key)
+        data = self.l1.get(full_key)
+        if data is not None:
+            return self._decode(data, "l1_hit", default)
+        return self._decode(self._l2_get(full_key), "l2_hit", default)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        full_key = self._key(key)
+        data = encode(value)
+        ttl = ttl or self.ttl
+        self.l1.set(full_key, data, ttl)
+        self._l2_set(full_key, data, ttl)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """
+        Stores `value` only if `key` is absent, atomically (SET NX on the
+        shared tier), e.g. to take a lease.
+
+        Returns:
+            Whether the value was stored
+        """
+        full_key = self._key(key)
+        data = encode(value)
+        ttl = ttl or self.ttl
+        return self._added(full_key, data, ttl, self._l2_add(full_key, data, ttl))
+
+    async def aget(self, key: str, default: Any = None) -> Any:
+        """Like `get`, but a shared-tier round trip does not block the event loop."""
+        full_key = self._key(key)
+        data = self.l1.get(full_key)
+        if data is not None:
+            return self._decode(data, "l1_hit", default)
+        if not self._l2_available():
+            return self._decode(None, "l2_hit", default)
+        data = await asyncio.get_running_loop().run_in_executor(None, self._l2_get, full_key)
+        return self._decode(data, "l2_hit", default)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None):
+        full_key = self._key(key)
+        data = encode(value)
+        ttl = ttl or self.ttl
+        self.l1.set(full_key, data, ttl)
+        if self._l2_available():
+            await asyncio.get_running_loop().run_in_executor(None, self._l2_set, full_key, data, ttl)
+
+    async def aadd(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Like `add`, but a shared-tier round trip does not block the event loop."""
+        full_key = self._key(key)
+        data = encode(value)
+        ttl = ttl or self.ttl
+        added = None
+        if self._l2_available():
+            added = await asyncio.get_running_loop().run_in_executor(None, self._l2_add, full_key, data, ttl)
+        return self._added(full_key, data, ttl, added)
+
+
+_shared_tier: Optional[RedisTier] = None
+_shared_tier_loaded = False
+_caches: Dict[str, Cache] = {}
+_caches_lock = threading.Lock()
+
+
+def _get_shared_tier() -> Optional[RedisTier]:
+    global _shared_tier, _shared_tier_loaded
+    if not _shared_tier_loaded:
+        _shared_tier_loaded = True
+        if CACHE_URL:
+            try:
+                _shared_tier = RedisTier.from_url(CACHE_URL)
+            except ImportError as e:
+                logger.warning("NAVICA_CACHE_URL is set but its client is not installed (%s); using in-process cache only", e)
+    return _shared_tier
+
+
+def clear_local_caches():
+    """Empties the in-process tier of every cache (the shared tier is left alone)."""
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.l1.clear()
+
+
+def get_cache(name: str, ttl: float, l1_max_bytes: int) -> Cache:
+    """
+    Returns the named cache, creating it on first use. All caches share the
+    L2 configured by NAVICA_CACHE_URL.
+
+    Args:
+        name: Cache name (key namespace and metrics label)
+        ttl: Default time to live in seconds
+        l1_max_bytes: Size bound of the in-process tier
+    """
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = Cache(name, ttl, l1_max_bytes, _get_shared_tier())
+        return cache
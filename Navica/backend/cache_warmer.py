@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import os
+import secrets
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from agent_core import fetch_jobs_with_jobspy, extract_job_skills, jobs_cache_skills, JOB_SITES, MAX_SCRAPE_ROUNDS
+from admission import get_search_admission
+from cache import get_cache, make_key
+from executors import run_in_pool
+from metrics import REGISTRY, SCRAPE_REQUESTS
+
+
+logger = logging.getLogger(__name__)
+
+# Searches warmed per cycle (0 disables warming; requests are still counted)
+WARM_TOP_N = int(os.getenv("NAVICA_WARM_TOP_N", "5"))
+
+# Time between warming cycles; below NAVICA_JOBS_CACHE_TTL so warmed searches
+# are refreshed before they expire
+WARM_INTERVAL = float(os.getenv("NAVICA_WARM_INTERVAL_SECONDS", "600"))
+
+# First cycle after startup (lets the worker pools and NLP model come up first)
+WARM_START_DELAY = float(os.getenv("NAVICA_WARM_START_DELAY_SECONDS", "10"))
+
+# scrape_jobs calls one cycle may make, and the pause between warmed searches,
+# so warming stays well below the job sites' rate limits
+WARM_SCRAPE_BUDGET = int(os.getenv("NAVICA_WARM_SCRAPE_BUDGET", "12"))
+WARM_PAUSE = float(os.getenv("NAVICA_WARM_PAUSE_SECONDS", "2"))
+
+# "experience level/work model" pairs combined with the seed roles (the
+# available roles) while no searches are recorded, e.g. after a deploy when the
+# stats lived in the in-process cache
+WARM_SEED_FILTERS = [
+    tuple(pair.split("/", 1))
+    for pair in os.getenv("NAVICA_WARM_SEED_FILTERS", "1 to 2/Remote").split(",")
+    if "/" in pair
+]
+
+# Request counts halve over this period, so the warmed set follows demand
+STATS_HALF_LIFE = float(os.getenv("NAVICA_WARM_STATS_HALF_LIFE_HOURS", "24")) * 3600
+
+# Searches tracked, and skill sets tracked per search
+MAX_TRACKED_SEARCHES = 200
+MAX_SKILL_SETS = 3
+
+# Worst-case scrapes of one search
+SEARCH_SCRAPES = MAX_SCRAPE_ROUNDS * len(JOB_SITES)
+
+# Stats and the warming lease live in the shared cache, so with Redis they
+# outlive a deploy and all workers count into one set of stats (and only one of
+# them warms)
+warm_cache = get_cache("warming", 7 * 24 * 3600, l1_max_bytes=1024 * 1024)
+
+WARM_SEARCHES = REGISTRY.counter(
+    "navica_cache_warm_searches_total",
+    "Searches considered by the cache warmer, by outcome (warmed, failed, over_budget, busy)",
+    ("outcome",)
+)
+
+WARM_SCRAPES = REGISTRY.counter(
+    "navica_cache_warm_scrapes_total",
+    "scrape_jobs calls made while warming"
+)
+
+
+class SearchStats:
+    """
+    Request counts per search (roles, experience level, work model) and the
+    skill sets searched with it, since the skills are part of the jobs cache
+    key. Counted locally and merged into the shared stats once per cycle.
+    """
+
+    def __init__(self):
+        self._pending: Dict[str, dict] = {}
+
+    def record(self, selected_roles: List[str], user_skills: List[str], experience_level: str, work_model: str):
+        roles = sorted(selected_roles or [])
+        search_id = make_key(roles, experience_level, work_model)
+        entry = self._pending.get(search_id)
+        if entry is None:
+            entry = self._pending[search_id] = {
+                "roles": roles, "experience_level": experience_level, "work_model": work_model,
+                "count": 0.0, "skills": {}
+            }
+        entry["count"] += 1
+        skills = jobs_cache_skills(user_skills)
+        skill_entry = entry["skills"].setdefault(make_key(skills), [skills, 0.0])
+        skill_entry[1] += 1
+
+    async def sync(self) -> Dict[str, dict]:
+        """
+        Decays the shared stats by the time since their last update, adds the
+        requests counted here since the last sync, and stores them back.
+
+        Returns:
+            The merged stats: search id -> entry
+        """
+        pending, self._pending = self._pending, {}
+        shared = await warm_cache.aget("stats") or {"updated": time.time(), "searches": {}}
+        now = time.time()
+        decay = 0.5 ** (max(0.0, now - shared["updated"]) / STATS_HALF_LIFE)
+
+        searches = shared["searches"]
+        for entry in searches.values():
+            entry["count"] *= decay
+            for skill_entry in entry["skills"].values():
+                skill_entry[1] *= decay
+        for search_id, new in pending.items():
+            entry = searches.setdefault(search_id, {**new, "count": 0.0, "skills": {}})
+            entry["count"] += new["count"]
+            for skills_id, (skills, count) in new["skills"].items():
+                entry["skills"].setdefault(skills_id, [skills, 0.0])[1] += count
+
+        # Keep the stats bounded: most requested searches, most common skill sets
+        kept = sorted(searches.items(), key=lambda item: item[1]["count"], reverse=True)[:MAX_TRACKED_SEARCHES]
+        for _, entry in kept:
+            skill_sets = sorted(entry["skills"].items(), key=lambda item: item[1][1], reverse=True)
+            entry["skills"] = dict(skill_sets[:MAX_SKILL_SETS])
+        stats = {"updated": now, "searches": dict(kept)}
+        await warm_cache.aset("stats", stats)
+        return stats["searches"]
+
+
+search_stats = SearchStats()
+
+
+def top_searches(searches: Dict[str, dict], count: int, seed_roles: Sequence[str] = ()) -> List[Tuple]:
+    """
+    The `count` most requested searches, each with its most common skill set.
+
+    While no searches are recorded, seed searches are returned instead: single
+    `seed_roles` with the seed filters and no skills. The skills are part of
+    the jobs cache key, so these do not fill it for user searches, but they do
+    fill the skills cache (the spaCy extraction of each posting), which is
+    shared by every search that returns the same postings.
+
+    Returns:
+        (user_skills, selected_roles, experience_level, work_model) tuples
+    """
+    ranked = sorted(
+        (entry for entry in searches.values() if entry["skills"]),
+        key=lambda entry: entry["count"],
+        reverse=True
+    )[:count]
+    if not ranked:
+        seeds = [([], [role], experience, work) for experience, work in WARM_SEED_FILTERS for role in seed_roles]
+        return seeds[:count]
+    return [
+        (
+            max(entry["skills"].values(), key=lambda skill_entry: skill_entry[1])[0],
+            entry["roles"], entry["experience_level"], entry["work_model"]
+        )
+        for entry in ranked
+    ]
+
+
+async def _acquire_lease(owner: str) -> bool:
+    """
+    Whether this worker warms this cycle: it takes the shared lease with an
+    atomic set-if-absent. The lease expires before the next cycle, so the
+    first worker to wake up after that warms next.
+    """
+    return await warm_cache.aadd("lease", owner, ttl=WARM_INTERVAL * 0.9)
+
+
+def _search_slots_busy() -> bool:
+    admission = get_search_admission()
+    return admission.queue_depth > 0 or admission.in_flight >= admission.max_in_flight
+
+
+async def warm_once(owner: str, seed_roles: Sequence[str] = (), top_n: int = WARM_TOP_N) -> Dict[str, int]:
+    """
+    One warming cycle: syncs the request stats and, if this worker holds the
+    lease, re-fetches the top searches (refreshing the jobs cache) and
+    extracts the skills of their postings (filling the skills cache). While
+    no searches are recorded, seed searches are warmed (see `top_searches`).
+
+    Stops when the scrape budget could be exceeded by the next search, or
+    when user searches are waiting for a slot.
+
+    Args:
+        owner: Identifies this worker in the shared lease
+        seed_roles: Roles of the seed searches
+        top_n: Searches to warm
+
+    Returns:
+        Searches per outcome in this cycle
+    """
+    outcomes = {"warmed": 0, "failed": 0, "over_budget": 0, "busy": 0}
+    searches = await search_stats.sync()
+    targets = top_searches(searches, top_n, seed_roles)
+    if not targets or not await _acquire_lease(owner):
+        return outcomes
+
+    budget = WARM_SCRAPE_BUDGET
+    for position, (user_skills, roles, experience_level, work_model) in enumerate(targets):
+        if budget < SEARCH_SCRAPES:
+            outcomes["over_budget"] = len(targets) - position
+            break
+        if _search_slots_busy():
+            outcomes["busy"] = len(targets) - position
+            break
+
+        # Counts every scrape of the process meanwhile, so warming backs off under load
+        scrapes_before = SCRAPE_REQUESTS.total()
+        try:
+            postings = await run_in_pool(
+                "search", fetch_jobs_with_jobspy, user_skills, roles, experience_level, work_model, refresh=True
+            )
+            await asyncio.gather(*(extract_job_skills(posting.job_description) for posting in postings))
+            outcomes["warmed"] += 1
+        except Exception as e:
+            logger.warning("Cache warming failed for %s: %s", roles, e)
+            outcomes["failed"] += 1
+        scrapes = int(SCRAPE_REQUESTS.total() - scrapes_before)
+        WARM_SCRAPES.inc(scrapes)
+        budget -= scrapes
+        await asyncio.sleep(WARM_PAUSE)
+
+    for outcome, count in outcomes.items():
+        WARM_SEARCHES.inc(count, outcome=outcome)
+    logger.info("Cache warming cycle finished", extra={**outcomes, "scrapes": WARM_SCRAPE_BUDGET - budget})
+    return outcomes
+
+
+async def _warm_forever(seed_roles: Sequence[str]):
+    owner = f"{os.getpid()}-{secrets.token_hex(4)}"
+    await asyncio.sleep(WARM_START_DELAY)
+    while True:
+        try:
+            await warm_once(owner, seed_roles)
+        except Exception as e:
+            logger.error("Cache warming cycle failed: %s", e)
+        await asyncio.sleep(WARM_INTERVAL)
+
+
+_warmer_task: Optional[asyncio.Task] = None
+
+
+def start_cache_warmer(seed_roles: Sequence[str] = ()):
+    """Starts the warming loop on the running event loop (once per process)."""
+    global _warmer_task
+    if _warmer_task is None:
+        _warmer_task = asyncio.get_running_loop().create_task(_warm_forever(list(seed_roles)))
+
+
+def stop_cache_warmer():
+    global _warmer_task
+    if _warmer_task is not None:
+        _warmer_task.cancel()
+        _warmer_task = None
@@ -0,0 +1,77 @@
+import contextvars
+import os
+import time
+from typing import Optional
+
+
+# Request header carrying the caller's latency budget in milliseconds
+DEADLINE_HEADER = "X-Request-Deadline-Ms"
+
+# Budget applied when the caller sends no header (0 disables the deadline)
+DEFAULT_DEADLINE_SECONDS = float(os.getenv("NAVICA_REQUEST_DEADLINE_SECONDS", "30"))
+
+# Below this much remaining budget an LLM call is not attempted at all
+LLM_MIN_BUDGET_SECONDS = float(os.getenv("NAVICA_LLM_MIN_BUDGET_SECONDS", "2.0"))
+
+# Time kept back from an LLM call to assemble and send the response
+RESPONSE_MARGIN_SECONDS = 0.25
+
+# Absolute deadline (time.monotonic()) of the current request, or None
+_deadline: contextvars.ContextVar = contextvars.ContextVar("navica_deadline", default=None)
+
+
+def parse_budget(header_value: Optional[str]) -> Optional[float]:
+    """
+    Converts the deadline header (milliseconds) into seconds, falling back to
+    NAVICA_REQUEST_DEADLINE_SECONDS when it is missing or invalid.
+
+    Returns:
+        Budget in seconds, or None when the request has no deadline
+    """
+    if header_value:
+        try:
+            budget_ms = float(header_value)
+            if budget_ms > 0:
+                return budget_ms / 1000.0
+        except ValueError:
+            pass
+    return DEFAULT_DEADLINE_SECONDS if DEFAULT_DEADLINE_SECONDS > 0 else None
+
+
+def start(budget_seconds: Optional[float]) -> contextvars.Token:
+    """Sets the deadline for the current request; pass the token to `reset` when done."""
+    deadline = time.monotonic() + budget_seconds if budget_seconds is not None else None
+    return _deadline.set(deadline)
+
+
+def reset(token: contextvars.Token):
+    _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline, or None if it has none."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def expired() -> bool:
+    budget = remaining()
+    return budget is not None and budget <= 0
+
+
+def llm_budget() -> Optional[float]:
+    """
+    Time an LLM call may take within the current deadline.
+
+    Returns:
+        None when there is no deadline, 0 when the remaining budget is too
+        small to attempt a call, otherwise the timeout to use in seconds
+    """
+    budget = remaining()
+    if budget is None:
+        return None
+    if budget < LLM_MIN_BUDGET_SECONDS:
+        return 0.0
+    return budget - RESPONSE_MARGIN_SECONDS
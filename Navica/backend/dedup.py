@@ -0,0 +1,184 @@
+import itertools
+import os
+import re
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd # Required by JobSpy
+
+from metrics import REGISTRY
+
+
+# Estimated Jaccard similarity (of word shingles) above which two postings are
+# treated as the same job; 0 disables de-duplication
+DEDUP_THRESHOLD = float(os.getenv("NAVICA_DEDUP_THRESHOLD", "0.8"))
+
+# MinHash signature length; more permutations give a tighter similarity estimate
+DEDUP_NUM_PERM = int(os.getenv("NAVICA_DEDUP_NUM_PERM", "64"))
+
+# Words per shingle
+SHINGLE_SIZE = 3
+
+# Columns compared, in this order
+DEDUP_COLUMNS = ("title", "company", "description")
+
+DUPLICATES_REMOVED = REGISTRY.counter(
+    "navica_duplicate_postings_removed_total",
+    "Scraped postings dropped as near-duplicates of an earlier posting"
+)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Prime just above 2**32: (a * x + b) stays below 2**64 for 32-bit x and a < 2**31
+_PRIME = np.uint64(4294967311)
+_MASK32 = np.uint64(0xFFFFFFFF)
+
+
+def lsh_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Picks (bands, rows per band) so the LSH S-curve, whose midpoint is about
+    (1 / bands) ** (1 / rows), sits at `threshold`.
+    """
+    best = (num_perm, 1)
+    best_error = float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class NearDuplicateDetector:
+    """
+    Finds near-duplicate postings (e.g. the same job on Indeed and Google)
+    with shingling + MinHash + LSH.
+
+    Stateful across calls: rows kept by earlier calls (earlier scrape rounds)
+    also count as originals, so later pages cannot re-introduce them.
+    """
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, num_perm: int = DEDUP_NUM_PERM, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = lsh_bands(threshold, num_perm)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2 ** 31, size=num_perm, dtype=np.uint64)
+        self._blank_texts = 0
+        self._kept = np.empty((0, num_perm), dtype=np.uint64)
+
+    def _shingles(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        32-bit hashes of the word shingles of all texts, vectorized over the
+        concatenated token stream.
+
+        Returns:
+            (shingle hashes, index of the owning text), grouped by text
+        """
+        token_lists = [_TOKEN_PATTERN.findall(text.lower()) for text in texts]
+        lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(texts))
+        tokens = np.fromiter(itertools.chain.from_iterable(token_lists), dtype=object, count=int(lengths.sum()))
+        # Stable across calls and processes, unlike hash()
+        hashes = pd.util.hash_array(tokens) if len(tokens) else np.empty(0, dtype=np.uint64)
+        owner = np.repeat(np.arange(len(texts)), lengths)
+
+        values, owners = [], []
+        window = len(hashes) - SHINGLE_SIZE + 1
+        if window > 0:
+            shingles = hashes[:window].copy()
+            for offset in range(1, SHINGLE_SIZE):
+                shingles = shingles * np.uint64(1000003) ^ hashes[offset:window + offset]
+            # Drop shingles spanning two texts
+            inside = owner[:window] == owner[SHINGLE_SIZE - 1:]
+            values.append(shingles[inside])
+            owners.append(owner[:window][inside])
+
+        # Texts too short for a single shingle are compared on their words
+        short = np.flatnonzero(lengths < SHINGLE_SIZE)
+        if len(short):
+            in_short = np.isin(owner, short)
+            values.append(hashes[in_short])
+            owners.append(owner[in_short])
+
+        folded = np.concatenate(values) if values else np.empty(0, dtype=np.uint64)
+        folded = (folded ^ (folded >> np.uint64(32))) & _MASK32
+        owner_of = np.concatenate(owners) if owners else np.empty(0, dtype=np.int64)
+
+        # Blank texts have nothing to compare: give each a shingle no other text has
+        blank = short[lengths[short] == 0]
+        if len(blank):
+            sentinels = _MASK32 + np.uint64(1 + self._blank_texts) + np.arange(len(blank), dtype=np.uint64)
+            self._blank_texts += len(blank)
+            folded = np.concatenate([folded, sentinels])
+            owner_of = np.concatenate([owner_of, blank])
+
+        order = np.argsort(owner_of, kind="stable")
+        return folded[order], owner_of[order]
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        """MinHash signatures, one row per text, computed for all texts at once."""
+        if not texts:
+            return np.empty((0, self.num_perm), dtype=np.uint64)
+        shingles, owner = self._shingles(texts)
+        offsets = np.searchsorted(owner, np.arange(len(texts)))
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint64)
+        # Permutations in chunks keep the (permutations x shingles) matrix small
+        for start in range(0, self.num_perm, 16):
+            a = self._a[start:start + 16, None]
+            b = self._b[start:start + 16, None]
+            hashed = (a * shingles[None, :] + b) % _PRIME
+            signatures[:, start:start + 16] = np.minimum.reduceat(hashed, offsets, axis=1).T
+        return signatures
+
+    def _candidate_pairs(self, signatures: np.ndarray) -> set:
+        """Index pairs sharing at least one LSH band bucket."""
+        pairs = set()
+        for band in range(self.bands):
+            band_values = np.ascontiguousarray(signatures[:, band * self.rows:(band + 1) * self.rows])
+            keys = band_values.view(np.dtype((np.void, band_values.dtype.itemsize * self.rows))).ravel()
+            _, bucket_of = np.unique(keys, return_inverse=True)
+            order = np.argsort(bucket_of, kind="stable")
+            boundaries = np.flatnonzero(np.diff(bucket_of[order])) + 1
+            for bucket in np.split(order, boundaries):
+                if len(bucket) > 1:
+                    first = bucket[0]
+                    pairs.update((first, other) for other in bucket[1:])
+        return pairs
+
+    def unique_mask(self, jobs_df: pd.DataFrame) -> np.ndarray:
+        """
+        Marks the rows to keep: the first occurrence of each job, compared with
+        every row kept so far. Order is preserved, so the earlier site wins.
+
+        Returns:
+            Boolean array aligned with `jobs_df` rows
+        """
+        if self.threshold <= 0 or jobs_df.empty:
+            return np.ones(len(jobs_df), dtype=bool)
+
+        columns = [jobs_df[column].fillna("").astype(str) for column in DEDUP_COLUMNS if column in jobs_df]
+        texts = columns[0].str.cat(columns[1:], sep=" ").tolist() if columns else [""] * len(jobs_df)
+        new_signatures = self.signatures(texts)
+
+        kept_count = len(self._kept)
+        signatures = np.vstack([self._kept, new_signatures])
+        # Union-find over verified candidate pairs; the lowest index is the original
+        parent = list(range(len(signatures)))
+
+        def root(index):
+            while parent[index] != index:
+                parent[index] = parent[parent[index]]
+                index = parent[index]
+            return index
+
+        for first, other in self._candidate_pairs(signatures):
+            similarity = np.mean(signatures[first] == signatures[other])
+            if similarity >= self.threshold:
+                low, high = sorted((root(first), root(other)))
+                parent[high] = low
+
+        keep = np.array([root(index) == index for index in range(kept_count, len(signatures))], dtype=bool)
+        self._kept = np.vstack([self._kept, new_signatures[keep]])
+        DUPLICATES_REMOVED.inc(int((~keep).sum()))
+        return keep
@@ -0,0 +1,172 @@
+import asyncio
+import contextvars
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict
+
+from metrics import REGISTRY
+
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_QUEUE_LENGTH = REGISTRY.gauge(
+    "navica_executor_queue_length",
+    "Tasks submitted to a pool and waiting for a free worker",
+    ("pool",)
+)
+
+EXECUTOR_ACTIVE = REGISTRY.gauge(
+    "navica_executor_active",
+    "Tasks currently running in a pool",
+    ("pool",)
+)
+
+EXECUTOR_UTILIZATION = REGISTRY.gauge(
+    "navica_executor_utilization",
+    "Fraction of a pool's workers that are busy",
+    ("pool",)
+)
+
+EXECUTOR_TASK_LATENCY = REGISTRY.histogram(
+    "navica_executor_task_seconds",
+    "Time from submitting a task to a pool until it completes (queueing included)",
+    ("pool",)
+)
+
+
+def report_pool_usage(pool: str, outstanding: int, workers: int):
+    """Publishes queue length and utilization for a pool with `outstanding` unfinished tasks."""
+    active = min(outstanding, workers)
+    EXECUTOR_ACTIVE.set(active, pool=pool)
+    EXECUTOR_QUEUE_LENGTH.set(max(0, outstanding - workers), pool=pool)
+    EXECUTOR_UTILIZATION.set(active / workers if workers else 0.0, pool=pool)
+
+
+class WorkloadPool:
+    """
+    A named executor for one class of work, with usage metrics.
+
+    Thread pools run tasks in a copy of the submitting context (so spans and
+    deadlines carry over); process pools cannot, and their arguments must be
+    picklable.
+    """
+
+    def __init__(self, name: str, executor: Executor, max_workers: int, copy_context: bool):
+        self.name = name
+        self.executor = executor
+        self.max_workers = max_workers
+        self.copy_context = copy_context
+        self._outstanding = 0
+        self._lock = threading.Lock()
+        report_pool_usage(name, 0, max_workers)
+
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        if self.copy_context:
+            future = self.executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
+        else:
+            future = self.executor.submit(func, *args, **kwargs)
+        submitted_at = time.perf_counter()
+        self._track(+1)
+        future.add_done_callback(lambda _: self._done(submitted_at))
+        return future
+
+    def _done(self, submitted_at: float):
+        EXECUTOR_TASK_LATENCY.observe(time.perf_counter() - submitted_at, pool=self.name)
+        self._track(-1)
+
+    def _track(self, delta: int):
+        with self._lock:
+            self._outstanding += delta
+            report_pool_usage(self.name, self._outstanding, self.max_workers)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        report_pool_usage(self.name, 0, self.max_workers)
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _create_pool(name: str) -> WorkloadPool:
+    if name == "search":
+        # Runs fetch_jobs_with_jobspy; mostly waits on the scrape pool
+        workers = _env_int("NAVICA_SEARCH_WORKERS", 4)
+        return WorkloadPool(name, ThreadPoolExecutor(workers, thread_name_prefix="navica-search"), workers, True)
+    if name == "scrape":
+        # One task per scrape_jobs call (network bound)
+        workers = _env_int("NAVICA_SCRAPE_WORKERS", 8)
+        return WorkloadPool(name, ThreadPoolExecutor(workers, thread_name_prefix="navica-scrape"), workers, True)
+    if name == "nlp":
+        # spaCy and PyMuPDF are CPU bound; separate processes keep them off the
+        # event loop and out of the GIL contention with request handling
+        workers = _env_int("NAVICA_NLP_WORKERS", 2)
+        if _env_int("NAVICA_NLP_PROCESSES", 1):
+            from resume_processor import setup_nlp
+            executor = ProcessPoolExecutor(
+                workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=setup_nlp
+            )
+            return WorkloadPool(name, executor, workers, False)
+        return WorkloadPool(name, ThreadPoolExecutor(workers, thread_name_prefix="navica-nlp"), workers, True)
+    raise ValueError(f"Unknown pool: {name}")
+
+
+POOL_NAMES = ("search", "scrape", "nlp")
+
+_pools: Dict[str, WorkloadPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name: str) -> WorkloadPool:
+    """
+    Returns the named pool, creating it on first use.
+
+    Pools: "search" (job search orchestration), "scrape" (JobSpy calls) and
+    "nlp" (PDF extraction and skill matching). LLM calls have their own
+    workers in `llm_scheduler`.
+    """
+    pool = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                pool = _pools[name] = _create_pool(name)
+    return pool
+
+
+async def run_in_pool(name: str, func: Callable, *args, **kwargs):
+    """Runs `func(*args, **kwargs)` on the named pool and awaits its result."""
+    return await asyncio.wrap_future(get_pool(name).submit(func, *args, **kwargs))
+
+
+async def start_executors():
+    """
+    Creates every pool up front and starts the NLP workers (loading spaCy once
+    per worker). The event loop keeps running while the workers start.
+    """
+    for name in POOL_NAMES:
+        get_pool(name)
+    nlp_pool = get_pool("nlp")
+    if not nlp_pool.copy_context:
+        from resume_processor import match_skills
+        await asyncio.gather(*(
+            asyncio.wrap_future(nlp_pool.submit(match_skills, "python")) for _ in range(nlp_pool.max_workers)
+        ))
+    logger.info("Executors started", extra={
+        name: pool.max_workers for name, pool in _pools.items()
+    })
+
+
+def shutdown_executors():
+    """Cancels queued tasks and waits for running ones in every pool."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
@@ -0,0 +1,217 @@
+import math
+import re
+import threading
+from typing import Optional
+import pandas as pd # Required by JobSpy
+
+
+# Regex filters for each human-readable experience level. These are compiled
+# once at import time instead of on every search.
+EXPERIENCE_PATTERNS = {
+    "1 to 2": r"\b(junior|entry[- ]level|0-2 years|1-3 years experience)\b",
+    "3 to 4": r"\b(mid[- ]level|associate|3-5 years experience)\b",
+    "above 5": r"\b(senior|lead|principal|staff|5\+ years|8\+ years experience)\b"
+}
+
+# Accepted range of "N+ years" requirements for each experience level
+# (inclusive lower bound, inclusive upper bound or None for open-ended).
+EXPERIENCE_YEAR_RANGES = {
+    "1 to 2": (0, 2),
+    "3 to 4": (3, 4),
+    "above 5": (5, None)
+}
+
+# Matches "5+ years", "3-5 years", "2 to 4 yrs", "10 years" and captures the
+# minimum number of years asked for.
+YEARS_PATTERN = re.compile(
+    r"\b(\d{1,2})\s*(?:\+|(?:-|–|to)\s*\d{1,2})?\s*\+?\s*(?:years?|yrs?)\b",
+    re.IGNORECASE
+)
+
+# Wording that ties a years phrase to required experience, right after it
+# ("5+ years of experience", "10+ years required", "3 years in Python") or
+# just before it ("minimum 3 years", "experience: 2-4 years"). Other years
+# phrases ("founded 10 years ago", "2 years of tuition support") are ignored.
+_EXPERIENCE_AFTER = re.compile(
+    r"[^.;\n]{0,20}?\b(?:experience|exp\b|required|requirement|professional|hands[- ]on|"
+    r"working|industry|relevant|in (?:a |an )?[a-z])",
+    re.IGNORECASE
+)
+_EXPERIENCE_BEFORE = re.compile(
+    r"\b(?:experience|exp|minimum|min\.?|at least|requires?|required|over)\b[^.;\n]{0,15}$",
+    re.IGNORECASE
+)
+
+
+class ExperienceRule:
+    """Precompiled matcher for a single experience level."""
+
+    __slots__ = ("level", "pattern", "min_years", "max_years")
+
+    def __init__(self, level: str, pattern: str, year_range: tuple):
+        self.level = level
+        self.pattern = re.compile(pattern, re.IGNORECASE)
+        self.min_years, self.max_years = year_range
+
+    def matches_title(self, title) -> bool:
+        """Cheap check against the (short) job title only."""
+        return isinstance(title, str) and self.pattern.search(title) is not None
+
+    def matches_description(self, description) -> bool:
+        """
+        Regex check against the description, falling back to its experience
+        requirement: the smallest years value stated as required experience
+        must be in the level's range.
+        """
+        if not isinstance(description, str) or not description:
+            return False
+        if self.pattern.search(description) is not None:
+            return True
+        required = extract_years_of_experience(description)
+        return bool(required) and self.years_in_range(min(required))
+
+    def years_in_range(self, years: int) -> bool:
+        if years < self.min_years:
+            return False
+        return self.max_years is None or years <= self.max_years
+
+
+EXPERIENCE_RULES = {
+    level: ExperienceRule(level, pattern, EXPERIENCE_YEAR_RANGES[level])
+    for level, pattern in EXPERIENCE_PATTERNS.items()
+}
+
+
+def get_experience_rule(experience_level: str) -> Optional[ExperienceRule]:
+    """Returns the precompiled rule for an experience level, or None if it has no filter."""
+    return EXPERIENCE_RULES.get((experience_level or "").lower().strip())
+
+
+def extract_years_of_experience(text: str) -> list[int]:
+    """
+    Extracts the minimum years from every "N+ years" style phrase that states
+    required experience (see `_EXPERIENCE_AFTER` / `_EXPERIENCE_BEFORE`).
+
+    Args:
+        text: Job title or description
+
+    Returns:
+        List of year values in the order they appear (e.g. "3-5 years of experience" -> 3)
+    """
+    if not isinstance(text, str) or not text:
+        return []
+    return [
+        int(match.group(1))
+        for match in YEARS_PATTERN.finditer(text)
+        if _EXPERIENCE_AFTER.match(text, match.end(), match.end() + 40)
+        or _EXPERIENCE_BEFORE.search(text, max(0, match.start() - 30), match.start())
+    ]
+
+
+def filter_by_experience(jobs_df: pd.DataFrame, experience_level: str, limit: Optional[int] = None) -> pd.DataFrame:
+    """
+    Keeps only the postings that match the requested experience level.
+
+    Each row's (short) title is checked first; its description is only
+    scanned when the title did not already match, and scanning stops as soon
+    as `limit` qualifying rows have been found. Row order is preserved, so the
+    result is the same as filtering everything and then calling `head(limit)`.
+
+    Args:
+        jobs_df: DataFrame returned by `scrape_jobs`
+        experience_level: Experience level selected by the user
+        limit: Maximum number of rows to keep (None keeps every match)
+
+    Returns:
+        Filtered DataFrame
+    """
+    if get_experience_rule(experience_level) is None or jobs_df.get('description') is None:
+        return jobs_df if limit is None else jobs_df.head(limit)
+
+    return jobs_df.iloc[experience_match_positions(jobs_df, experience_level, limit)]
+
+
+def experience_match_positions(jobs_df: pd.DataFrame, experience_level: str, limit: Optional[int] = None) -> list[int]:
+    """
+    Returns the row positions that pass the experience filter (see `filter_by_experience`).
+
+    When fewer than `limit` positions come back, every row was scanned;
+    otherwise scanning stopped at the last returned position.
+    """
+    rule = get_experience_rule(experience_level)
+    if rule is None or jobs_df.get('description') is None:
+        positions = list(range(len(jobs_df)))
+        return positions if limit is None else positions[:limit]
+
+    titles = jobs_df['title'] if 'title' in jobs_df else [None] * len(jobs_df)
+
+    selected = []
+    for position, (title, description) in enumerate(zip(titles, jobs_df['description'])):
+        if rule.matches_title(title) or rule.matches_description(description):
+            selected.append(position)
+            if limit is not None and len(selected) >= limit:
+                break
+
+    return selected
+
+
+class FilterYieldTracker:
+    """
+    Tracks how many scraped postings survive the experience filter, per
+    (role, experience level), and sizes the next scrape from it.
+
+    Counts decay with every new observation so the estimate follows changes in
+    what the job sites return, and a small prior keeps a single short scrape
+    from swinging it. Shared across the executor threads that run
+    `fetch_jobs_with_jobspy`, hence the lock.
+    """
+
+    def __init__(self, default_rate: float = 0.2, prior_rows: int = 10, decay: float = 0.9, min_rate: float = 0.05):
+        self.default_rate = default_rate
+        self.prior_rows = prior_rows
+        self.decay = decay
+        self.min_rate = min_rate
+        # (role, level) -> [passed, scanned]
+        self._counts: dict[tuple[str, str], list[float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _keys(roles: list[str], experience_level: str) -> list[tuple[str, str]]:
+        level = (experience_level or "").lower().strip()
+        return [(role.lower().strip(), level) for role in (roles or [""])]
+
+    def pass_rate(self, roles: list[str], experience_level: str) -> float:
+        """Estimated fraction of scraped rows that pass the filter (averaged over the roles)."""
+        if get_experience_rule(experience_level) is None:
+            return 1.0
+        rates = []
+        with self._lock:
+            for key in self._keys(roles, experience_level):
+                passed, scanned = self._counts.get(key, (0.0, 0.0))
+                rates.append((passed + self.default_rate * self.prior_rows) / (scanned + self.prior_rows))
+        return max(self.min_rate, sum(rates) / len(rates))
+
+    def record(self, roles: list[str], experience_level: str, scanned: int, passed: int):
+        """Folds the outcome of one filtered scrape into the per-role counts."""
+        if scanned <= 0 or get_experience_rule(experience_level) is None:
+            return
+        with self._lock:
+            for key in self._keys(roles, experience_level):
+                counts = self._counts.setdefault(key, [0.0, 0.0])
+                counts[0] = counts[0] * self.decay + passed
+                counts[1] = counts[1] * self.decay + scanned
+
+    def results_wanted(
+        self,
+        roles: list[str],
+        experience_level: str,
+        needed: int,
+        site_count: int,
+        minimum: int,
+        maximum: int,
+        headroom: float = 1.25
+    ) -> int:
+        """Per-site `results_wanted` expected to yield `needed` postings after filtering."""
+        rate = self.pass_rate(roles, experience_level)
+        per_site = math.ceil(needed * headroom / (rate * max(site_count, 1)))
+        return max(minimum, min(maximum, per_site))
@@ -0,0 +1,285 @@
+import hashlib
+import html
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from cache import LocalTier
+from metrics import REGISTRY
+
+
+JD_BYTES = REGISTRY.counter(
+    "navica_jd_preprocess_bytes_total",
+    "Job description bytes per preprocessing stage: raw, cleaned (markup stripped), relevant (sent to NLP)",
+    ("stage",)
+)
+
+# Size bound of the in-process cache of preprocessed descriptions
+JD_CACHE_MAX_BYTES = int(float(os.getenv("NAVICA_JD_CACHE_MB", "8")) * 1024 * 1024)
+JD_CACHE_TTL = 24 * 3600
+
+# Preprocessed descriptions by hash of the raw text, so the raw text itself is not kept
+_preprocess_cache = LocalTier("jd_preprocess", JD_CACHE_MAX_BYTES)
+
+# Section kinds
+REQUIRED = "required"
+PREFERRED = "preferred"
+RESPONSIBILITIES = "responsibilities"
+BOILERPLATE = "boilerplate"
+GENERAL = "general"
+
+# Heading text -> section kind, first match wins ("Preferred qualifications" is preferred)
+_SECTION_PATTERNS = [
+    (PREFERRED, re.compile(
+        r"nice[\s-]to[\s-]have|good[\s-]to[\s-]have|preferred|bonus|desir(ed|able)|\bpluses\b|added advantage|optional"
+    )),
+    (BOILERPLATE, re.compile(
+        r"benefit|perks|what we offer|we offer|compensation|salary|pay range|about (us|the company|our company|the team)"
+        r"|who we are|our (story|mission|culture|values)|company overview|equal (employment )?opportunit|\beeo\b"
+        r"|diversity|inclusion|accommodation|how to apply|application process|why (join|work)|life at"
+        r"|job type|schedule|disclaimer|privacy"
+    )),
+    (REQUIRED, re.compile(
+        r"requirement|qualification|must[\s-]haves?|what you('ll| will)? (need|bring)|what we('re| are) looking for"
+        r"|who you are|skills|experience|you have|ideal candidate|prerequisite|competenc|tech(nical)? stack|tools"
+    )),
+    (RESPONSIBILITIES, re.compile(
+        r"responsibilit|what you('ll| will)? do|duties|the role|your role|day[\s-]to[\s-]day|key tasks"
+        r"|job description|overview|summary"
+    )),
+]
+
+# Lines that are boilerplate wherever they appear (outside requirement sections)
+_BOILERPLATE_LINE = re.compile(
+    r"equal opportunity|without regard to|protected (veteran|status|characteristic)|reasonable accommodation"
+    r"|e-verify|background check|drug[- ]free|privacy (policy|notice)|benefits include|health insurance"
+    r"|paid time off|401\(k\)|apply now|click apply|founded (in|over)|our company has grown|#li-\w+",
+    re.IGNORECASE
+)
+
+_MARKDOWN_HEADING = re.compile(r"^\s{0,3}#{1,6}(?:\s+(.*?))?\s*#*\s*$")
+_BOLD_HEADING = re.compile(r"^\s*(?:\*\*|__)([^*_]{2,80}?)\s*:?\s*(?:\*\*|__)\s*:?\s*$")
+_COLON_HEADING = re.compile(r"^\s*([A-Za-z][^.!?:]{1,60}):\s*$")
+# "Requirements: Python, SQL" -- heading and content on one line
+_INLINE_HEADING = re.compile(r"^\s*(?:\*\*|__)?([A-Za-z][^.!?:*_]{1,40}?)\s*:?(?:\*\*|__)?\s*:\s*(.+)$")
+_BULLET = re.compile(r"^\s*(?:[-*+•·▪●]|\d{1,2}[.)])\s+")
+
+# Words heading phrases are made of; a line without markup or colon only counts
+# as a heading when all its words are among them ("Preferred Qualifications",
+# not "Strong SQL skills")
+_HEADING_WORDS = frozenset("""
+    a an and the of to for in at with our your we we're you you'll will are is who what how why
+    requirements requirement qualifications qualification must have haves need bring looking
+    skills skill experience ideal candidate prerequisites prerequisite competencies competency
+    tech technical stack tools nice good preferred bonus points desired desirable pluses plus added
+    advantage optional benefits benefit perks offer compensation salary pay range about us company
+    team story mission culture values overview equal employment opportunity opportunities eeo
+    diversity inclusion accommodation accommodations apply application process join work life job
+    type types schedule disclaimer privacy responsibilities responsibility do duties role day
+    day-to-day key tasks description summary minimum basic required core main additional essential
+    mandatory general education profile
+""".split())
+_WORD = re.compile(r"[a-z][a-z'-]*")
+
+_MARKDOWN_ESCAPE = re.compile(r"\\([\\`*_{}\[\]()#+\-.!&|>~])")
+_HTML_TAG = re.compile(r"<[^>]{1,200}>")
+_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_URL = re.compile(r"https?://\S+")
+_EMPHASIS = re.compile(r"\*+|~~|`+|(?<!\w)_+|_+(?!\w)")
+_TABLE_RULE = re.compile(r"^\s*\|?[\s:|-]+\|[\s:|-]*$")
+_SPACES = re.compile(r"[ \t |]+")
+
+
+def _byte_length(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+def classify_heading(heading: str) -> Optional[str]:
+    """Section kind for a heading, or None when it is not a recognized section."""
+    heading = heading.lower()
+    for kind, pattern in _SECTION_PATTERNS:
+        if pattern.search(heading):
+            return kind
+    return None
+
+
+def clean_line(line: str) -> str:
+    """Strips markdown/HTML markup, bullets and URLs from one line."""
+    line = _MARKDOWN_ESCAPE.sub(r"\1", line)
+    if "<" in line:
+        line = _HTML_TAG.sub(" ", line)
+    if "&" in line:
+        line = html.unescape(line)
+    if "](" in line:
+        line = _LINK.sub(r"\1", _IMAGE.sub(" ", line))
+    line = _URL.sub(" ", line)
+    line = _BULLET.sub("", line)
+    line = _EMPHASIS.sub("", line)
+    line = _MARKDOWN_HEADING.sub(r"\1", line)
+    return _SPACES.sub(" ", line).strip()
+
+
+def _is_heading_phrase(text: str) -> bool:
+    words = _WORD.findall(text.lower())
+    return bool(words) and all(word in _HEADING_WORDS for word in words)
+
+
+def _heading(line: str) -> Optional[Tuple[Optional[str], str]]:
+    """
+    (section kind, content of the line) when `line` opens a section, else None.
+    A kind of None marks a boilerplate field ("Schedule: Monday to Friday"):
+    the line is dropped but does not open a section.
+    """
+    match = _MARKDOWN_HEADING.match(line) or _BOLD_HEADING.match(line) or _COLON_HEADING.match(line)
+    if match:
+        heading = match.group(1) or ""
+        kind = classify_heading(heading)
+        if kind is None:
+            # An unrecognized heading ("Senior Python Developer") is content itself
+            return GENERAL, heading
+        # So is a requirement heading that names more than the section ("Python experience:")
+        keep = kind in (REQUIRED, PREFERRED) and not _is_heading_phrase(heading)
+        return kind, heading if keep else ""
+
+    if _BULLET.match(line):
+        return None
+    match = _INLINE_HEADING.match(line)
+    if match and _is_heading_phrase(match.group(1)):
+        kind = classify_heading(match.group(1))
+        if kind == BOILERPLATE:
+            return None, ""
+        return (kind, match.group(2)) if kind else None
+
+    # A short title-like line without punctuation ("Nice to have", "BENEFITS")
+    stripped = line.strip()
+    if stripped and stripped[0].isupper() and len(stripped.split()) <= 5 and stripped[-1] not in ".,;!?":
+        if _is_heading_phrase(stripped):
+            kind = classify_heading(stripped)
+            if kind:
+                return kind, ""
+    return None
+
+
+def split_sections(text: str) -> List[Tuple[str, List[str]]]:
+    """
+    Splits a description into (kind, cleaned lines) sections at its headings.
+    Text before the first heading and under unrecognized headings is GENERAL.
+    """
+    sections: List[Tuple[str, List[str]]] = [(GENERAL, [])]
+    for line in text.splitlines():
+        if not line.strip() or _TABLE_RULE.match(line):
+            continue
+        heading = _heading(line)
+        if heading is not None:
+            kind, rest = heading
+            if kind is None:
+                continue
+            sections.append((kind, []))
+            line = rest
+        cleaned = clean_line(line)
+        if cleaned:
+            sections[-1][1].append(cleaned)
+    return [(kind, lines) for kind, lines in sections if lines]
+
+
+class PreprocessedDescription:
+    """
+    A job description reduced to the parts worth matching skills against.
+
+    `required` and `preferred` hold the requirement sections, `other` the
+    general and responsibility text; boilerplate is dropped.
+    """
+
+    __slots__ = ("required", "preferred", "other", "raw_bytes", "cleaned_bytes")
+
+    def __init__(self, required: str, preferred: str, other: str, raw_bytes: int, cleaned_bytes: int):
+        self.required = required
+        self.preferred = preferred
+        self.other = other
+        self.raw_bytes = raw_bytes
+        self.cleaned_bytes = cleaned_bytes
+
+    @property
+    def relevant_text(self) -> str:
+        """Everything but the boilerplate: the text sent to skill extraction."""
+        return "\n".join(part for part in (self.other, self.required, self.preferred) if part)
+
+    @property
+    def byte_counts(self) -> Dict[str, int]:
+        return {
+            "raw": self.raw_bytes,
+            "cleaned": self.cleaned_bytes,
+            "relevant": _byte_length(self.relevant_text),
+        }
+
+    def preferred_skills(self, skills: Iterable[str]) -> List[str]:
+        """Skills mentioned only in the preferred ("nice to have") sections."""
+        if not self.preferred:
+            return []
+        elsewhere = f"{self.other}\n{self.required}".lower()
+        preferred = self.preferred.lower()
+        return [skill for skill in skills if skill.lower() in preferred and skill.lower() not in elsewhere]
+
+    def encode(self) -> bytes:
+        return json.dumps(
+            [self.required, self.preferred, self.other, self.raw_bytes, self.cleaned_bytes],
+            ensure_ascii=False
+        ).encode("utf-8")
+
+    @classmethod
+    def decode(cls, data: bytes) -> "PreprocessedDescription":
+        return cls(*json.loads(data))
+
+
+def clear_preprocess_cache():
+    """Empties the cache of preprocessed descriptions."""
+    _preprocess_cache.clear()
+
+
+def preprocess_job_description(text: str) -> PreprocessedDescription:
+    """
+    Strips markup and boilerplate from a (JobSpy markdown) job description and
+    splits out its requirement sections. Results are cached by a hash of the
+    text (NAVICA_JD_CACHE_MB bounds the cache), and every call, cached or not,
+    adds the byte count of each stage to `navica_jd_preprocess_bytes_total`.
+
+    Args:
+        text: The raw job description
+
+    Returns:
+        PreprocessedDescription (falls back to all cleaned text if nothing
+        relevant is left, e.g. when every heading looked like boilerplate)
+    """
+    raw = text.encode("utf-8")
+    JD_BYTES.inc(len(raw), stage="raw")
+    key = hashlib.blake2b(raw, digest_size=16).hexdigest()
+    data = _preprocess_cache.get(key)
+    if data is not None:
+        prepared = PreprocessedDescription.decode(data)
+    else:
+        prepared = _preprocess(text)
+        _preprocess_cache.set(key, prepared.encode(), JD_CACHE_TTL)
+    JD_BYTES.inc(prepared.cleaned_bytes, stage="cleaned")
+    JD_BYTES.inc(_byte_length(prepared.relevant_text), stage="relevant")
+    return prepared
+
+
+def _preprocess(text: str) -> PreprocessedDescription:
+    parts = {REQUIRED: [], PREFERRED: [], GENERAL: []}
+    cleaned_bytes = 0
+    for kind, lines in split_sections(text):
+        cleaned_bytes += sum(_byte_length(line) + 1 for line in lines)
+        if kind == BOILERPLATE:
+            continue
+        if kind not in (REQUIRED, PREFERRED):
+            lines = [line for line in lines if not _BOILERPLATE_LINE.search(line)]
+            kind = GENERAL
+        parts[kind].extend(lines)
+
+    required, preferred, other = ("\n".join(parts[kind]) for kind in (REQUIRED, PREFERRED, GENERAL))
+    if not (required or preferred or other) and cleaned_bytes:
+        other = "\n".join(line for _, lines in split_sections(text) for line in lines)
+
+    return PreprocessedDescription(required, preferred, other, _byte_length(text), cleaned_bytes)
@@ -0,0 +1,369 @@
+import contextvars
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from metrics import REGISTRY
+from executors import report_pool_usage
+
+
+logger = logging.getLogger(__name__)
+
+# Request priorities (lower runs first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+PRIORITY_BACKGROUND = 20
+
+LLM_QUEUE_DEPTH = REGISTRY.gauge(
+    "navica_llm_queue_depth",
+    "LLM calls waiting for a rate-limit token"
+)
+
+LLM_OUTCOMES = REGISTRY.counter(
+    "navica_llm_scheduler_outcomes_total",
+    "LLM calls by final outcome (success, error, circuit_open, expired)",
+    ("outcome",)
+)
+
+LLM_RETRIES = REGISTRY.counter(
+    "navica_llm_retries_total",
+    "LLM call attempts retried after a transient error"
+)
+
+LLM_QUEUE_WAIT = REGISTRY.histogram(
+    "navica_llm_queue_wait_seconds",
+    "Time an LLM call waited for a rate-limit token before its first attempt"
+)
+
+LLM_CIRCUIT_OPEN = REGISTRY.gauge(
+    "navica_llm_circuit_open",
+    "1 while the LLM circuit breaker is open, else 0"
+)
+
+
+class LLMUnavailableError(Exception):
+    """The call was not made; the caller should use its fallback."""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """The provider has been failing and the circuit breaker is open."""
+
+
+class DeadlineExpiredError(LLMUnavailableError):
+    """The caller's deadline passed while the call was waiting in the queue."""
+
+
+# Exception class names / message fragments that indicate a retryable provider error
+_TRANSIENT_ERROR_NAMES = {
+    "ResourceExhausted", "ServiceUnavailable", "DeadlineExceeded", "InternalServerError",
+    "TooManyRequests", "GatewayTimeout", "Timeout", "TimeoutError", "ConnectionError",
+}
+_TRANSIENT_ERROR_MARKERS = ("429", "500", "502", "503", "504", "resource has been exhausted", "unavailable", "timed out")
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """True for rate-limit, timeout and 5xx style errors that are worth retrying."""
+    if type(error).__name__ in _TRANSIENT_ERROR_NAMES:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in _TRANSIENT_ERROR_MARKERS)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `rate_per_minute`, holding up to `burst` tokens."""
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """Takes a token if one is available; otherwise returns the seconds until the next one."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def refund(self):
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + 1)
+
+    def set_rate(self, rate_per_minute: float, drain: bool = False):
+        """Changes the refill rate; `drain` also empties the bucket (no burst right after slowing down)."""
+        with self._lock:
+            self._refill()
+            self.rate = rate_per_minute / 60.0
+            if drain:
+                self._tokens = 0.0
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures so calls go straight
+    to the fallback; after `reset_timeout` seconds one trial call is let
+    through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        # Start of the half-open trial call; a trial that never reports back
+        # (e.g. it expired in the queue) is superseded after reset_timeout
+        self._trial_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            if self._trial_started is not None and now - self._trial_started < self.reset_timeout:
+                return False
+            self._trial_started = now  # half-open: let one call probe the provider
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_started = None
+        LLM_CIRCUIT_OPEN.set(0)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            reopen = self._trial_started is not None or self._failures >= self.failure_threshold
+            self._trial_started = None
+            if reopen:
+                self._opened_at = time.monotonic()
+        if reopen:
+            LLM_CIRCUIT_OPEN.set(1)
+
+
+class _Job:
+    __slots__ = ("func", "context", "deadline", "future", "attempt", "enqueued_at")
+
+    def __init__(self, func: Callable[[], str], deadline: Optional[float]):
+        self.func = func
+        self.context = contextvars.copy_context()
+        self.deadline = deadline
+        self.future: Future = Future()
+        self.attempt = 0
+        self.enqueued_at = time.monotonic()
+
+
+class LLMScheduler:
+    """
+    Central scheduler for LLM provider calls.
+
+    Calls are queued by priority, each attempt waits for a token from the
+    requests-per-minute bucket, transient errors are retried with jittered
+    exponential backoff, and the circuit breaker fails calls immediately while
+    the provider is down. Calls run on a small pool of worker threads, in the
+    submitting request's context (so traces and deadlines carry over).
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        burst: int,
+        concurrency: int,
+        max_retries: int,
+        backoff_base: float,
+        breaker: CircuitBreaker
+    ):
+        self.bucket = TokenBucket(requests_per_minute, burst)
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.concurrency = max(1, concurrency)
+        self._running = 0
+        # (priority, sequence, not_before, job); sequence keeps FIFO order within a priority
+        self._pending: list = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._workers = [
+            threading.Thread(target=self._run, name=f"navica-llm-{index}", daemon=True)
+            for index in range(self.concurrency)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(
+        self,
+        func: Callable[[], str],
+        priority: int = PRIORITY_INTERACTIVE,
+        deadline: Optional[float] = None
+    ) -> Future:
+        """
+        Queues `func` (a single provider call that raises on failure).
+
+        Args:
+            func: Zero-argument callable making one LLM call
+            priority: Lower values are served first
+            deadline: Absolute time.monotonic() after which the call is pointless
+
+        Returns:
+            Future resolving to the call's result, or failing with
+            CircuitOpenError / DeadlineExpiredError / the provider error
+        """
+        job = _Job(func, deadline)
+        if not self.breaker.allow():
+            LLM_OUTCOMES.inc(outcome="circuit_open")
+            job.future.set_exception(CircuitOpenError("LLM circuit breaker is open"))
+            return job.future
+        self._enqueue(job, priority, time.monotonic())
+        return job.future
+
+    def _report_usage(self):
+        # Called with the condition held; exported under pool="llm" next to the executors
+        LLM_QUEUE_DEPTH.set(len(self._pending))
+        report_pool_usage("llm", self._running + len(self._pending), self.concurrency)
+
+    def _enqueue(self, job: _Job, priority: int, not_before: float):
+        with self._condition:
+            self._pending.append((priority, next(self._sequence), not_before, job))
+            self._report_usage()
+            self._condition.notify()
+
+    def _next_job(self):
+        """Blocks until a token is available and returns the highest-priority ready job."""
+        with self._condition:
+            while not self._stopped:
+                now = time.monotonic()
+                ready = [entry for entry in self._pending if entry[2] <= now]
+                if not ready:
+                    wake_at = min((entry[2] for entry in self._pending), default=None)
+                    self._condition.wait(None if wake_at is None else max(0.0, wake_at - now))
+                    continue
+                wait = self.bucket.try_acquire()
+                if wait > 0:
+                    self._condition.wait(wait)
+                    continue
+                entry = min(ready)
+                self._pending.remove(entry)
+                self._running += 1
+                self._report_usage()
+                return entry[0], entry[3]
+            return None, None
+
+    def _run(self):
+        while True:
+            priority, job = self._next_job()
+            if job is None:
+                return
+            try:
+                if job.attempt == 0 and not job.future.set_running_or_notify_cancel():
+                    self.bucket.refund()
+                    continue
+                if job.deadline is not None and time.monotonic() >= job.deadline:
+                    self.bucket.refund()
+                    LLM_OUTCOMES.inc(outcome="expired")
+                    job.future.set_exception(DeadlineExpiredError("Deadline passed while waiting for the LLM"))
+                    continue
+                self._attempt(priority, job)
+            finally:
+                with self._condition:
+                    self._running -= 1
+                    self._report_usage()
+
+    def _attempt(self, priority: int, job: _Job):
+        if job.attempt == 0:
+            LLM_QUEUE_WAIT.observe(time.monotonic() - job.enqueued_at)
+        job.attempt += 1
+        try:
+            result = job.context.run(job.func)
+        except Exception as e:
+            self.breaker.record_failure()
+            retry_in = self.backoff_base * (2 ** (job.attempt - 1)) * random.random()  # full jitter
+            can_retry = (
+                is_transient_error(e)
+                and job.attempt <= self.max_retries
+                and not self.breaker.is_open
+                and (job.deadline is None or time.monotonic() + retry_in < job.deadline)
+            )
+            if can_retry:
+                LLM_RETRIES.inc()
+                logger.info("Retrying LLM call after transient error", extra={"attempt": job.attempt, "error": str(e)})
+                self._enqueue(job, priority, time.monotonic() + retry_in)
+                return
+            LLM_OUTCOMES.inc(outcome="error")
+            job.future.set_exception(e)
+            return
+
+        self.breaker.record_success()
+        LLM_OUTCOMES.inc(outcome="success")
+        job.future.set_result(result)
+
+    def shutdown(self, timeout: float = 5.0):
+        with self._condition:
+            self._stopped = True
+            pending = [entry[3] for entry in self._pending]
+            self._pending.clear()
+            self._report_usage()
+            self._condition.notify_all()
+        for job in pending:
+            if job.attempt > 0 or job.future.set_running_or_notify_cancel():
+                job.future.set_exception(LLMUnavailableError("LLM scheduler shut down"))
+        for worker in self._workers:
+            worker.join(timeout)
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    """
+    Returns the process-wide Gemini scheduler, created on first use from
+    NAVICA_GEMINI_RPM (default 10), NAVICA_GEMINI_BURST (5),
+    NAVICA_GEMINI_CONCURRENCY (4), NAVICA_GEMINI_MAX_RETRIES (2),
+    NAVICA_GEMINI_BREAKER_FAILURES (5) and NAVICA_GEMINI_BREAKER_RESET_SECONDS (30).
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler(
+                requests_per_minute=float(os.getenv("NAVICA_GEMINI_RPM", "10")),
+                burst=int(os.getenv("NAVICA_GEMINI_BURST", "5")),
+                concurrency=int(os.getenv("NAVICA_GEMINI_CONCURRENCY", "4")),
+                max_retries=int(os.getenv("NAVICA_GEMINI_MAX_RETRIES", "2")),
+                backoff_base=float(os.getenv("NAVICA_GEMINI_BACKOFF_SECONDS", "1.0")),
+                breaker=CircuitBreaker(
+                    failure_threshold=int(os.getenv("NAVICA_GEMINI_BREAKER_FAILURES", "5")),
+                    reset_timeout=float(os.getenv("NAVICA_GEMINI_BREAKER_RESET_SECONDS", "30")),
+                ),
+            )
+        return _scheduler
+
+
+def shutdown_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            _scheduler.shutdown()
+            _scheduler = None
@@ -0,0 +1,147 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+from tracing import current_span
+
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "sampled"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def sampled(**fields) -> dict:
+    """
+    Builds an `extra=` dict for a high-volume, per-job log message so it is
+    subject to NAVICA_LOG_SAMPLE_RATE.
+    """
+    return {"sampled": True, **fields}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, extra fields and trace id."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps only a fraction of records flagged as sampled; other records always pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = max(0.0, min(1.0, rate))
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or record.levelno >= logging.WARNING:
+            return True
+        return self.rate >= 1.0 or random.random() < self.rate
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that attaches the active trace/span ids before the record
+    leaves the request's context, and skips the eager message formatting the
+    stock QueueHandler does on the calling thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        span = current_span()
+        if span.trace is not None:
+            record.trace_id = span.trace.trace_id
+            record.span_id = span.span_id
+        if record.exc_info and not record.exc_text:
+            # Tracebacks can't cross the queue lazily; render them now
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(
+    level: Optional[str] = None,
+    log_format: Optional[str] = None,
+    sample_rate: Optional[float] = None
+):
+    """
+    Routes all logging through a non-blocking queue to a single background
+    writer thread. Defaults come from NAVICA_LOG_LEVEL (INFO),
+    NAVICA_LOG_FORMAT ("json" or "text") and NAVICA_LOG_SAMPLE_RATE (0.1).
+
+    Args:
+        level: Root log level
+        log_format: "json" for structured output, "text" for human-readable lines
+        sample_rate: Fraction of sampled per-job messages to keep
+    """
+    global _listener
+
+    level = (level or os.getenv("NAVICA_LOG_LEVEL", "INFO")).upper()
+    log_format = (log_format or os.getenv("NAVICA_LOG_FORMAT", "json")).lower()
+    if sample_rate is None:
+        sample_rate = float(os.getenv("NAVICA_LOG_SAMPLE_RATE", "0.1"))
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if log_format == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    if _listener is not None:
+        _listener.stop()
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = ContextQueueHandler(log_queue)
+    # Sample before enqueueing so dropped records cost nothing downstream
+    queue_handler.addFilter(SamplingFilter(sample_rate))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """
+    Drains the queue and stops the writer thread. The queue handler is
+    replaced on the root logger by the writer's own handlers, so records
+    logged afterwards (e.g. during interpreter exit) are written directly
+    instead of being queued with nobody to write them.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, ContextQueueHandler):
+            root.removeHandler(handler)
+    for handler in _listener.handlers:
+        root.addHandler(handler)
+    _listener = None
+
+
+atexit.register(shutdown_logging)
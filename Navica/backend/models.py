@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 
 
 class UserSkillProfile(BaseModel):
@@ -59,6 +59,12 @@ class SkillAnalysis(BaseModel):
         ..., 
         description="AI-generated advice for the candidate"
     )
+    suggestion_source: str = Field(
+        ...,
+        description="Path that produced the suggestion: 'gemini', 'gemini_cached', "
+                    "'fallback' (Gemini unavailable or failed), 'deadline' (skipped to meet the request deadline) "
+                    "or 'degraded' (skipped because the search was queued under load)"
+    )
 
 
 class JobResult(BaseModel):
@@ -71,3 +77,85 @@ class JobResult(BaseModel):
         ..., 
         description="Skill analysis for this job"
     )
+
+
+class SelectedJobPosting(BaseModel):
+    """Job details of a search result; fields not selected with `fields` are left out."""
+    job_id: str = Field(..., description="Unique identifier for the job (always included)")
+    title: Optional[str] = Field(None, description="Job title")
+    company: Optional[str] = Field(None, description="Company name")
+    location: Optional[str] = Field(None, description="Job location")
+    job_description: Optional[str] = Field(
+        None,
+        description="Job description, truncated to `description_chars` characters "
+                    "(left out with description_chars=0; the full text is at /api/v1/jobs/{job_id})"
+    )
+    external_url: Optional[str] = Field(None, description="URL to the original job posting")
+
+
+class SearchResult(BaseModel):
+    """A search result: JobResult, with only the selected job details in slim responses."""
+    job_details: SelectedJobPosting = Field(
+        ...,
+        description="Job posting information (every field unless `fields` or `description_chars` is given)"
+    )
+    analysis: SkillAnalysis = Field(
+        ...,
+        description="Skill analysis for this job"
+    )
+
+
+class BulkJobInput(BaseModel):
+    """A job description submitted to the bulk matching endpoint."""
+    title: str = Field(
+        "",
+        description="Job title (used as context for suggestions)"
+    )
+    job_description: str = Field(
+        ...,
+        description="Full job description"
+    )
+
+
+class BulkCandidate(BaseModel):
+    """A parsed resume in a bulk match."""
+    filename: str = Field(..., description="Uploaded file name")
+    extracted_skills: List[str] = Field(..., description="Skills extracted from the resume")
+    error: Optional[str] = Field(None, description="Why the resume could not be parsed, if it could not")
+
+
+class BulkJob(BaseModel):
+    """A job in a bulk match, with the skills it requires."""
+    title: str = Field(..., description="Job title")
+    required_skills: List[str] = Field(..., description="Skills extracted from the job description")
+
+
+class CandidateJobMatch(BaseModel):
+    """One resume/job pair of a bulk match."""
+    candidate_index: int = Field(..., description="Index into `candidates`")
+    job_index: int = Field(..., description="Index into `jobs`")
+    score: float = Field(..., description="Fraction of the job's required skills the candidate has")
+    matched_skills: List[str] = Field(..., description="Required skills the candidate has")
+    missing_skills: List[str] = Field(..., description="Required skills the candidate lacks")
+    improvement_suggestion: Optional[str] = Field(
+        None,
+        description="Advice for the candidate (top-ranked pairs only)"
+    )
+    suggestion_source: Optional[str] = Field(
+        None,
+        description="Path that produced the suggestion (see SkillAnalysis)"
+    )
+
+
+class BulkMatchResult(BaseModel):
+    """Result of matching many resumes against many jobs."""
+    candidates: List[BulkCandidate] = Field(..., description="Resumes, in upload order")
+    jobs: List[BulkJob] = Field(..., description="Jobs, in request order")
+    score_matrix: List[List[float]] = Field(
+        ...,
+        description="score_matrix[candidate][job] for every pair"
+    )
+    matches: List[CandidateJobMatch] = Field(
+        ...,
+        description="Pairs with at least one matched skill, best first"
+    )
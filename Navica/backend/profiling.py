@@ -0,0 +1,281 @@
+import collections
+import logging
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from metrics import REGISTRY
+
+
+logger = logging.getLogger(__name__)
+
+# Shared secret that unlocks per-request profiles and the profile endpoints
+# (empty disables both; the background sampler runs regardless)
+PROFILE_TOKEN = os.getenv("NAVICA_PROFILE_TOKEN", "")
+
+# Request header / query parameter carrying the token to profile one request
+PROFILE_HEADER = "X-Navica-Profile"
+PROFILE_QUERY_PARAM = "profile"
+# Response header naming the saved profile
+PROFILE_FILE_HEADER = "X-Navica-Profile-File"
+
+# Where per-request profiles are saved, and how many are kept
+PROFILE_DIR = Path(os.getenv("NAVICA_PROFILE_DIR", "profiles"))
+PROFILE_MAX_FILES = int(os.getenv("NAVICA_PROFILE_MAX_FILES", "100"))
+
+# Sampling interval of a profiled request
+PROFILE_INTERVAL = float(os.getenv("NAVICA_PROFILE_INTERVAL_MS", "5")) / 1000
+
+# Always-on sampler: rate (0 disables), hot-function window and how many are exported
+BACKGROUND_HZ = float(os.getenv("NAVICA_PROFILE_BACKGROUND_HZ", "10"))
+HOT_WINDOW_SECONDS = float(os.getenv("NAVICA_PROFILE_WINDOW_SECONDS", "60"))
+HOT_TOP_FUNCTIONS = int(os.getenv("NAVICA_PROFILE_TOP_FUNCTIONS", "15"))
+
+# Distinct stacks kept per sampler; further new stacks are folded into "[other]"
+MAX_STACKS = 10000
+# Frames kept per stack, innermost first
+MAX_DEPTH = 96
+
+PROFILE_SAMPLES = REGISTRY.counter(
+    "navica_profile_samples_total",
+    "Thread stacks seen by the background sampler, busy or idle (blocked waiting for work)",
+    ("state",)
+)
+
+HOT_FUNCTIONS = REGISTRY.gauge(
+    "navica_profile_hot_function_ratio",
+    "Share of busy samples in the last window with the function on the stack (total) or running it (self)",
+    ("function", "kind")
+)
+
+# Innermost frames of threads that are only waiting for work
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("handlers.py", "dequeue"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+    ("socket.py", "accept"),
+}
+
+_POOL_THREAD_SUFFIX = re.compile(r"[_-]\d+$")
+
+# Idents of sampler threads, which never sample themselves or each other
+_sampler_threads = set()
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of every thread at a fixed interval from a
+    background thread (like py-spy, but in process) and aggregates them as
+    collapsed stacks: "thread;outer;...;inner" with a sample count.
+
+    Threads that are idle (blocked waiting for work) are left out. Code in
+    worker processes (e.g. the "nlp" pool in process mode) is not visible;
+    waiting on it shows up in the calling thread.
+    """
+
+    def __init__(self, interval: float, max_stacks: int = MAX_STACKS, name: str = "navica-profiler"):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.name = name
+        self.stacks: collections.Counter = collections.Counter()
+        self.samples = 0
+        self._labels: Dict[object, str] = {}
+        self._thread_names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        ident = threading.get_ident()
+        _sampler_threads.add(ident)
+        try:
+            while not self._stop.wait(self.interval):
+                self.sample()
+        finally:
+            _sampler_threads.discard(ident)
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{os.path.basename(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+        return label
+
+    def _thread_name(self, ident: int) -> str:
+        name = self._thread_names.get(ident)
+        if name is None:
+            self._thread_names = {thread.ident: _POOL_THREAD_SUFFIX.sub("", thread.name) for thread in threading.enumerate()}
+            name = self._thread_names.get(ident, "thread")
+        return name
+
+    def sample(self):
+        """Records the current stack of every busy thread."""
+        for ident, frame in sys._current_frames().items():
+            if ident in _sampler_threads:
+                continue
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES:
+                self._record_idle()
+                continue
+
+            labels = []
+            while frame is not None and len(labels) < MAX_DEPTH:
+                labels.append(self._label(frame.f_code))
+                frame = frame.f_back
+            labels.reverse()
+            self._record(self._thread_name(ident), labels)
+        self.samples += 1
+
+    def _record_idle(self):
+        pass
+
+    def _record(self, thread_name: str, labels: List[str]):
+        stack = ";".join([thread_name, *labels])
+        with self._lock:
+            if stack not in self.stacks and len(self.stacks) >= self.max_stacks:
+                stack = f"{thread_name};[other]"
+            self.stacks[stack] += 1
+
+    def folded(self) -> str:
+        """Collapsed stacks, most frequent first (flamegraph.pl / speedscope input)."""
+        with self._lock:
+            stacks = self.stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+
+class HotPathSampler(StackSampler):
+    """
+    The always-on sampler: besides the collapsed stacks, it counts per window
+    how often each function is running (self) or on the stack (total), and
+    publishes the top functions as `navica_profile_hot_function_ratio`.
+    """
+
+    def __init__(self, interval: float, window: float = HOT_WINDOW_SECONDS, top: int = HOT_TOP_FUNCTIONS):
+        super().__init__(interval, name="navica-hot-path-sampler")
+        self.window = window
+        self.top = top
+        self._window_start = time.monotonic()
+        self._busy = 0
+        self._self_counts: collections.Counter = collections.Counter()
+        self._total_counts: collections.Counter = collections.Counter()
+
+    def sample(self):
+        super().sample()
+        if time.monotonic() - self._window_start >= self.window:
+            self.publish()
+
+    def _record_idle(self):
+        PROFILE_SAMPLES.inc(state="idle")
+
+    def _record(self, thread_name: str, labels: List[str]):
+        super()._record(thread_name, labels)
+        PROFILE_SAMPLES.inc(state="busy")
+        self._busy += 1
+        if labels:
+            self._self_counts[labels[-1]] += 1
+            self._total_counts.update(set(labels))
+
+    def publish(self):
+        """Replaces the exported hot functions with the current window's and starts a new window."""
+        HOT_FUNCTIONS.clear()
+        if self._busy:
+            for kind, counts in (("self", self._self_counts), ("total", self._total_counts)):
+                for function, count in counts.most_common(self.top):
+                    HOT_FUNCTIONS.set(round(count / self._busy, 4), function=function, kind=kind)
+        self._window_start = time.monotonic()
+        self._busy = 0
+        self._self_counts.clear()
+        self._total_counts.clear()
+
+
+_background: Optional[HotPathSampler] = None
+
+
+def start_profiler():
+    """Starts the always-on sampler (once per process) unless NAVICA_PROFILE_BACKGROUND_HZ is 0."""
+    global _background
+    if _background is None and BACKGROUND_HZ > 0:
+        _background = HotPathSampler(1.0 / BACKGROUND_HZ)
+        _background.start()
+
+
+def shutdown_profiler():
+    global _background
+    if _background is not None:
+        _background.stop()
+        _background = None
+
+
+def background_profile() -> str:
+    """Collapsed stacks aggregated by the always-on sampler since startup."""
+    return _background.folded() if _background is not None else ""
+
+
+def authorized(headers, query_params) -> bool:
+    """Whether the request carries the profile token (header or query parameter)."""
+    if not PROFILE_TOKEN:
+        return False
+    supplied = headers.get(PROFILE_HEADER) or query_params.get(PROFILE_QUERY_PARAM) or ""
+    return secrets.compare_digest(supplied.encode(), PROFILE_TOKEN.encode())
+
+
+@contextmanager
+def profile_request():
+    """
+    Samples all threads while the block runs (the profiled request and
+    anything running concurrently with it).
+
+    Yields:
+        The sampler; its stacks are complete once the block exits
+    """
+    sampler = StackSampler(PROFILE_INTERVAL, name="navica-request-profiler")
+    sampler.start()
+    try:
+        yield sampler
+    finally:
+        sampler.stop()
+
+
+def save_profile(sampler: StackSampler, endpoint: str) -> str:
+    """
+    Writes a request's collapsed stacks to NAVICA_PROFILE_DIR, keeping the
+    newest NAVICA_PROFILE_MAX_FILES profiles.
+
+    Returns:
+        The file name (servable by `load_profile`)
+    """
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", endpoint).strip("_") or "request"
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}-{slug}-{secrets.token_hex(4)}.folded"
+    (PROFILE_DIR / name).write_text(sampler.folded(), encoding="utf-8")
+
+    saved = sorted(PROFILE_DIR.glob("*.folded"), key=lambda path: path.stat().st_mtime)
+    for old in saved[:-PROFILE_MAX_FILES]:
+        old.unlink(missing_ok=True)
+    logger.info("Saved request profile", extra={"profile": name, "samples": sampler.samples})
+    return name
+
+
+def load_profile(name: str) -> Optional[str]:
+    """A saved profile by file name, or None (names outside NAVICA_PROFILE_DIR are refused)."""
+    if not re.fullmatch(r"[A-Za-z0-9_.-]+\.folded", name):
+        return None
+    path = PROFILE_DIR / name
+    return path.read_text(encoding="utf-8") if path.is_file() else None
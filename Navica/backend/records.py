@@ -0,0 +1,153 @@
+import sys
+from typing import Iterable, Optional, Sequence, Tuple
+
+from models import JobPosting, SkillAnalysis
+from responses import dumps
+
+
+def _intern(value: str) -> str:
+    return sys.intern(value) if type(value) is str else value
+
+
+class JobRecord:
+    """
+    Internal representation of a job posting.
+
+    Slotted (no per-instance dict) with interned title/company/location, since
+    the same few values repeat across thousands of postings. Convert to
+    `JobPosting` only at the API boundary with `to_model`.
+    """
+
+    __slots__ = ("job_id", "title", "company", "location", "job_description", "external_url")
+
+    def __init__(self, job_id: str, title: str, company: str, location: str, job_description: str, external_url: str):
+        self.job_id = job_id
+        self.title = _intern(title)
+        self.company = _intern(company)
+        self.location = _intern(location)
+        self.job_description = job_description
+        self.external_url = external_url
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, JobRecord):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __hash__(self) -> int:
+        # Consistent with __eq__; records are not modified after construction
+        return hash(tuple(getattr(self, field) for field in self.__slots__))
+
+    def __repr__(self) -> str:
+        return f"JobRecord(job_id={self.job_id!r}, title={self.title!r}, company={self.company!r})"
+
+    @classmethod
+    def from_model(cls, posting: JobPosting) -> "JobRecord":
+        return cls(*(getattr(posting, field) for field in cls.__slots__))
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def to_model(self) -> JobPosting:
+        # Every field was set from scraped strings we produced, so validation is skipped
+        return JobPosting.model_construct(**self.to_dict())
+
+
+class AnalysisRecord:
+    """Internal representation of a skill analysis; skill names are interned."""
+
+    __slots__ = ("matched_skills", "missing_skills", "improvement_suggestion", "suggestion_source")
+
+    def __init__(
+        self,
+        matched_skills: Sequence[str],
+        missing_skills: Sequence[str],
+        improvement_suggestion: str,
+        suggestion_source: str
+    ):
+        self.matched_skills: Tuple[str, ...] = tuple(_intern(skill) for skill in matched_skills)
+        self.missing_skills: Tuple[str, ...] = tuple(_intern(skill) for skill in missing_skills)
+        self.improvement_suggestion = improvement_suggestion
+        self.suggestion_source = sys.intern(suggestion_source)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, AnalysisRecord):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __hash__(self) -> int:
+        # Consistent with __eq__; records are not modified after construction
+        return hash(tuple(getattr(self, field) for field in self.__slots__))
+
+    def __repr__(self) -> str:
+        return f"AnalysisRecord(matched={len(self.matched_skills)}, missing={len(self.missing_skills)}, source={self.suggestion_source!r})"
+
+    def to_model(self) -> SkillAnalysis:
+        return SkillAnalysis.model_construct(
+            matched_skills=list(self.matched_skills),
+            missing_skills=list(self.missing_skills),
+            improvement_suggestion=self.improvement_suggestion,
+            suggestion_source=self.suggestion_source
+        )
+
+
+# job_details fields a slim response can select (job_id is always included)
+JOB_FIELDS: Tuple[str, ...] = JobRecord.__slots__
+
+
+def parse_job_fields(value: Optional[str]) -> Tuple[str, ...]:
+    """
+    The job_details fields named in a comma-separated `fields` parameter.
+
+    Returns:
+        The fields in schema order, job_id first (all fields when `value` is empty)
+
+    Raises:
+        ValueError: For an unknown field name
+    """
+    requested = {name.strip() for name in (value or "").split(",") if name.strip()}
+    if not requested:
+        return JOB_FIELDS
+    unknown = requested.difference(JOB_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))} (available: {', '.join(JOB_FIELDS)})")
+    return tuple(field for field in JOB_FIELDS if field in requested or field == "job_id")
+
+
+def job_result_dict(
+    job: JobRecord,
+    analysis: AnalysisRecord,
+    fields: Sequence[str] = JOB_FIELDS,
+    description_chars: Optional[int] = None
+) -> dict:
+    """
+    One result in the JobResult layout as plain data, ready for `responses.dumps`.
+
+    Args:
+        job: The posting
+        analysis: Its skill analysis
+        fields: job_details fields to include
+        description_chars: Truncates job_description to this many characters (0 leaves it out)
+
+    Returns:
+        {"job_details": {...}, "analysis": {...}}
+    """
+    details = {field: getattr(job, field) for field in fields}
+    description = details.get("job_description")
+    if description is not None and description_chars is not None:
+        if description_chars <= 0:
+            del details["job_description"]
+        elif len(description) > description_chars:
+            details["job_description"] = description[:description_chars].rstrip() + "\u2026"
+    return {
+        "job_details": details,
+        "analysis": {field: getattr(analysis, field) for field in AnalysisRecord.__slots__}
+    }
+
+
+def job_results_json(
+    analyzed: Iterable[Tuple[JobRecord, AnalysisRecord]],
+    fields: Sequence[str] = JOB_FIELDS,
+    description_chars: Optional[int] = None
+) -> bytes:
+    """Serializes (job, analysis) pairs for the response body in one pass (no models, no revalidation)."""
+    return dumps([job_result_dict(job, analysis, fields, description_chars) for job, analysis in analyzed])
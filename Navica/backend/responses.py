@@ -0,0 +1,121 @@
+"""
+JSON response bodies: fast encoding (orjson when installed) and per-response
+compression negotiated from Accept-Encoding.
+
+API responses are compressed on the fly at fast levels; the static frontend
+is precompressed once at maximum levels instead (see static_assets).
+"""
+import gzip
+import json
+import os
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from metrics import REGISTRY, STAGE_LATENCY
+
+try:
+    import orjson
+except ImportError:  # standard library encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+
+# Smaller bodies are sent as they are (compression would not pay for its headers)
+COMPRESS_MIN_BYTES = int(os.getenv("NAVICA_COMPRESS_MIN_BYTES", "1024"))
+
+# Levels for on-the-fly compression; it runs on the event loop, so they are kept
+# low (most of the size reduction at a fraction of the CPU of the maximum levels)
+GZIP_LEVEL = int(os.getenv("NAVICA_GZIP_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("NAVICA_BROTLI_QUALITY", "4"))
+
+RESPONSE_BYTES = REGISTRY.counter(
+    "navica_response_bytes_total",
+    "JSON response body bytes as encoded and as sent (after compression), by content coding",
+    ("stage", "coding")
+)
+
+
+def dumps(value: Any) -> bytes:
+    """Encodes plain data (dicts, lists, tuples, str, numbers, None) as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def accepted_codings(accept_encoding: str) -> Dict[str, float]:
+    """Content codings of an Accept-Encoding header with their quality values."""
+    codings = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            codings[name] = quality
+    return codings
+
+
+def choose_coding(accept_encoding: str, available: Iterable[str]) -> Optional[str]:
+    """The preferred available coding (br before gzip) the client accepts, or None for identity."""
+    accepted = accepted_codings(accept_encoding)
+    available = set(available)
+    for coding in ("br", "gzip"):
+        if coding in available and accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    if coding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def json_response(
+    request: Request,
+    body: bytes,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    """
+    A response for an already encoded JSON body, compressed with the best
+    coding the client accepts when the body is large enough.
+
+    Args:
+        request: The request (for Accept-Encoding)
+        body: JSON bytes, e.g. from `dumps`
+        status_code: Response status
+        headers: Extra response headers
+
+    Returns:
+        The response
+    """
+    headers = dict(headers or {})
+    headers["Vary"] = "Accept-Encoding"
+    coding = None
+    if len(body) >= COMPRESS_MIN_BYTES:
+        coding = choose_coding(request.headers.get("accept-encoding", ""), ("br", "gzip") if brotli else ("gzip",))
+
+    sent = body
+    if coding:
+        with STAGE_LATENCY.time(stage="response_compress"):
+            compressed = compress(body, coding)
+        if len(compressed) < len(body):
+            sent = compressed
+            headers["Content-Encoding"] = coding
+        else:
+            coding = None
+    coding = coding or "identity"
+    RESPONSE_BYTES.inc(len(body), stage="encoded", coding=coding)
+    RESPONSE_BYTES.inc(len(sent), stage="sent", coding=coding)
+    return Response(content=sent, status_code=status_code, media_type="application/json", headers=headers)
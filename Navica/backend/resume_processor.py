@@ -2,8 +2,15 @@ import spacy
 from spacy.matcher import PhraseMatcher
 from fastapi import UploadFile
 import fitz  # PyMuPDF
-from typing import List
+from typing import Dict, Iterator, List
 import io
+import os
+import asyncio
+import hashlib
+from metrics import STAGE_LATENCY
+from tracing import traced, current_span
+from executors import run_in_pool, get_pool
+from cache import get_cache
 
 
 # Hardcoded skills list for matching
@@ -59,10 +66,40 @@ SKILLS_LIST = [
     "collaboration", "mentoring", "presentation", "analytical"
 ]
 
+# spaCy model used for tokenization
+SPACY_MODEL = "en_core_web_sm"
+
+# Hash of the skill taxonomy (skills list + model). It is part of every
+# skills-cache key, so editing SKILLS_LIST invalidates cached extractions.
+SKILLS_TAXONOMY_VERSION = hashlib.blake2b(
+    "\n".join([SPACY_MODEL, *SKILLS_LIST]).encode("utf-8"),
+    digest_size=6
+).hexdigest()
+
 # Global variables for NLP components
 nlp = None
 matcher = None
 
+# Skills extracted per text, shared across workers (see cache.py). The
+# in-process tier is bounded by size, since job descriptions vary a lot in length.
+SKILLS_CACHE_MAX_BYTES = int(float(os.getenv("NAVICA_SKILLS_CACHE_MB", "16")) * 1024 * 1024)
+SKILLS_CACHE_TTL = float(os.getenv("NAVICA_SKILLS_CACHE_TTL", str(7 * 24 * 3600)))
+skills_cache = get_cache("skills", SKILLS_CACHE_TTL, l1_max_bytes=SKILLS_CACHE_MAX_BYTES)
+
+# Texts per nlp.pipe call in batch extraction
+SKILLS_BATCH_SIZE = 32
+
+# Longer texts are split into chunks of at most this many characters, so a
+# huge resume or scraped page never becomes one giant Doc
+NLP_CHUNK_CHARS = int(os.getenv("NAVICA_NLP_CHUNK_CHARS", "20000"))
+
+# Consecutive chunks share this many characters, so a skill cut by a chunk
+# boundary still appears whole in one of them
+NLP_CHUNK_OVERLAP = max(len(skill) for skill in SKILLS_LIST)
+
+# Preferred chunk boundaries: paragraph, line, sentence, word
+_CHUNK_BOUNDARIES = ("\n\n", "\n", ". ", " ")
+
 
 def setup_nlp():
     """
@@ -73,7 +110,7 @@ def setup_nlp():
     
     if nlp is None:
         # Load spaCy English model
-        nlp = spacy.load("en_core_web_sm")
+        nlp = spacy.load(SPACY_MODEL)
         
         # Initialize PhraseMatcher
         matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
@@ -85,19 +122,16 @@ def setup_nlp():
     return nlp, matcher
 
 
-async def extract_text_from_pdf(pdf_file: UploadFile) -> str:
+def pdf_bytes_to_text(content: bytes) -> str:
     """
-    Extracts raw text from an uploaded PDF file.
+    Extracts raw text from PDF bytes. Runs on the "nlp" pool.
     
     Args:
-        pdf_file: The uploaded PDF file
+        content: The PDF file content
         
     Returns:
         Extracted text as a string
     """
-    # Read the file content
-    content = await pdf_file.read()
-    
     # Open PDF with PyMuPDF
     pdf_document = fitz.open(stream=content, filetype="pdf")
     
@@ -108,19 +142,73 @@ async def extract_text_from_pdf(pdf_file: UploadFile) -> str:
         text += page.get_text()
     
     pdf_document.close()
-    
     return text
 
 
-def extract_key_skills(text: str) -> List[str]:
+async def extract_text_from_pdf(pdf_file: UploadFile) -> str:
+    """
+    Extracts raw text from an uploaded PDF file.
+    
+    Parsing runs on the "nlp" pool so it never blocks the event loop.
+    
+    Args:
+        pdf_file: The uploaded PDF file
+        
+    Returns:
+        Extracted text as a string
+    """
+    # Read the file content
+    content = await pdf_file.read()
+    
+    with STAGE_LATENCY.time(stage="pdf_extraction"):
+        return await run_in_pool("nlp", pdf_bytes_to_text, content)
+
+
+def iter_chunks(text: str, chunk_chars: int = NLP_CHUNK_CHARS, overlap: int = NLP_CHUNK_OVERLAP) -> Iterator[str]:
+    """
+    Splits `text` into lowercased chunks of at most `chunk_chars` characters,
+    cut at the last paragraph, line, sentence or word boundary in the window.
+    Each chunk after the first starts at a word boundary at least `overlap`
+    characters before the end of the previous one.
+    
+    Args:
+        text: The text to split
+        chunk_chars: Maximum chunk length
+        overlap: Characters shared by consecutive chunks (at most half a chunk)
+        
+    Yields:
+        Lowercased chunks, in order
+    """
+    overlap = min(overlap, chunk_chars // 2)
+    start = 0
+    while len(text) - start > chunk_chars:
+        limit = start + chunk_chars
+        end = limit
+        for boundary in _CHUNK_BOUNDARIES:
+            # Only cut in the second half of the window, so chunks stay large
+            position = text.rfind(boundary, start + chunk_chars // 2, limit)
+            if position != -1:
+                end = position + len(boundary)
+                break
+        yield text[start:end].lower()
+        
+        next_start = end - overlap
+        while next_start > start and not text[next_start - 1].isspace():
+            next_start -= 1
+        start = next_start if next_start > start else end
+    yield text[start:].lower()
+
+
+def match_skills(text: str) -> List[str]:
     """
     Identifies skills in the provided text using spaCy and PhraseMatcher.
+    Texts longer than `NLP_CHUNK_CHARS` are matched chunk by chunk.
     
     Args:
         text: The text to extract skills from (e.g., resume text)
         
     Returns:
-        List of unique skills found in the text
+        List of unique skills found in the text, sorted
     """
     global nlp, matcher
     
@@ -128,6 +216,9 @@ def extract_key_skills(text: str) -> List[str]:
     if nlp is None or matcher is None:
         setup_nlp()
     
+    if len(text) > NLP_CHUNK_CHARS:
+        return match_skills_batch([text])[0]
+    
     # Process the text
     doc = nlp(text.lower())
     
@@ -140,4 +231,150 @@ def extract_key_skills(text: str) -> List[str]:
         span = doc[start:end]
         skills.add(span.text)
     
-    return sorted(list(skills))
\ No newline at end of file
+    return sorted(list(skills))
+
+
+def match_skills_batch(texts: List[str]) -> List[List[str]]:
+    """
+    Like `match_skills` for many texts, in one `nlp.pipe` pass. Long texts
+    are split with `iter_chunks` and the skills of their chunks merged;
+    chunks are produced lazily, so at most `SKILLS_BATCH_SIZE` chunk Docs
+    exist at a time however large the input.
+    
+    Args:
+        texts: The texts to extract skills from
+        
+    Returns:
+        Sorted unique skills per text, in input order
+    """
+    if nlp is None or matcher is None:
+        setup_nlp()
+    
+    skills = [set() for _ in texts]
+    chunks = ((chunk, index) for index, text in enumerate(texts) for chunk in iter_chunks(text))
+    for doc, index in nlp.pipe(chunks, as_tuples=True, batch_size=SKILLS_BATCH_SIZE):
+        skills[index].update(doc[start:end].text for _, start, end in matcher(doc))
+    return [sorted(found) for found in skills]
+
+
+def skills_cache_key(text: str) -> str:
+    """Content hash of `text` under the current skill taxonomy version."""
+    digest = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+    return f"{SKILLS_TAXONOMY_VERSION}:{digest}"
+
+
+@traced()
+def extract_key_skills(text: str) -> List[str]:
+    """
+    Identifies skills in the provided text, on the calling thread.
+    Results are cached per text, so repeated texts skip spaCy.
+    
+    Args:
+        text: The text to extract skills from (e.g., resume text)
+        
+    Returns:
+        List of unique skills found in the text
+    """
+    key = skills_cache_key(text)
+    skills = skills_cache.get(key)
+    cache_hit = skills is not None
+    if not cache_hit:
+        with STAGE_LATENCY.time(stage="skill_extraction"):
+            skills = match_skills(text)
+        skills_cache.set(key, skills)
+    
+    current_span().set_attributes(text_length=len(text), skill_count=len(skills), cache_hit=cache_hit)
+    return skills
+
+
+@traced("extract_key_skills")
+async def extract_key_skills_async(text: str) -> List[str]:
+    """
+    Identifies skills in the provided text on the "nlp" pool, so skill
+    extraction never blocks the event loop. Results are cached per text, so
+    repeated postings skip spaCy (and the pool) entirely.
+    
+    Args:
+        text: The text to extract skills from (e.g., resume text)
+        
+    Returns:
+        List of unique skills found in the text
+    """
+    key = skills_cache_key(text)
+    skills = await skills_cache.aget(key)
+    cache_hit = skills is not None
+    if not cache_hit:
+        with STAGE_LATENCY.time(stage="skill_extraction"):
+            skills = await run_in_pool("nlp", match_skills, text)
+        await skills_cache.aset(key, skills)
+    
+    current_span().set_attributes(text_length=len(text), skill_count=len(skills), cache_hit=cache_hit)
+    return skills
+
+
+def _cache_misses(keys: List[str], results: List) -> Dict[str, List[int]]:
+    """Positions of the texts not found in the cache, grouped by key (identical texts are extracted once)."""
+    pending: Dict[str, List[int]] = {}
+    for index, (key, skills) in enumerate(zip(keys, results)):
+        if skills is None:
+            pending.setdefault(key, []).append(index)
+    return pending
+
+
+def extract_key_skills_batch(texts: List[str]) -> List[List[str]]:
+    """
+    Identifies skills in many texts on the calling thread (for batch jobs):
+    cached texts are looked up, the rest go through one `nlp.pipe` pass.
+    
+    Args:
+        texts: The texts to extract skills from
+        
+    Returns:
+        List of unique skills per text, in input order
+    """
+    keys = [skills_cache_key(text) for text in texts]
+    results = [skills_cache.get(key) for key in keys]
+    pending = _cache_misses(keys, results)
+    
+    if pending:
+        with STAGE_LATENCY.time(stage="skill_extraction_batch"):
+            extracted = match_skills_batch([texts[indexes[0]] for indexes in pending.values()])
+        for (key, indexes), skills in zip(pending.items(), extracted):
+            for index in indexes:
+                results[index] = skills
+            skills_cache.set(key, skills)
+    return results
+
+
+@traced("extract_key_skills_batch")
+async def extract_key_skills_batch_async(texts: List[str]) -> List[List[str]]:
+    """
+    Identifies skills in many texts at once. Cached texts are answered from
+    the skills cache; the rest are split into one `nlp.pipe` batch per "nlp"
+    worker and extracted in parallel.
+    
+    Args:
+        texts: The texts to extract skills from (resumes, job descriptions)
+        
+    Returns:
+        List of unique skills per text, in input order
+    """
+    keys = [skills_cache_key(text) for text in texts]
+    results = list(await asyncio.gather(*(skills_cache.aget(key) for key in keys)))
+    pending = _cache_misses(keys, results)
+    
+    if pending:
+        misses = [texts[indexes[0]] for indexes in pending.values()]
+        workers = get_pool("nlp").max_workers
+        chunk_size = min(SKILLS_BATCH_SIZE, -(-len(misses) // workers))
+        chunks = [misses[start:start + chunk_size] for start in range(0, len(misses), chunk_size)]
+        with STAGE_LATENCY.time(stage="skill_extraction_batch"):
+            extracted = await asyncio.gather(*(run_in_pool("nlp", match_skills_batch, chunk) for chunk in chunks))
+        
+        for (key, indexes), skills in zip(pending.items(), (skills for chunk in extracted for skills in chunk)):
+            for index in indexes:
+                results[index] = skills
+            await skills_cache.aset(key, skills)
+    
+    current_span().set_attributes(text_count=len(texts), cache_misses=len(pending))
+    return results
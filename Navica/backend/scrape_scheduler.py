@@ -0,0 +1,355 @@
+"""
+Scheduling of the HTTP traffic JobSpy sends to the job sites.
+
+Each site gets a `SiteScheduler`: a token bucket for its HTTP requests, a cap
+on concurrent scrapes, and adaptive backoff. A 429 (or 503) halves the site's
+request rate and pauses it for Retry-After or an exponential backoff; the
+request is then retried. Successful responses restore the rate step by step.
+
+JobSpy opens a fresh HTTP session (new connections, TLS handshakes, cookies
+and proxy setup) in every scrape_jobs call and gives up on a 429 without
+telling the caller. With session pooling, its scrapers get long-lived
+sessions from a per-site pool instead, configured with NAVICA_SCRAPE_PROXIES
+and routed through the scheduler. A session serves one scrape at a time
+(JobSpy's sessions keep per-request state) and goes back to the pool when
+that scrape is over.
+"""
+import email.utils
+import functools
+import importlib
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from llm_scheduler import TokenBucket
+from metrics import REGISTRY
+
+
+logger = logging.getLogger(__name__)
+
+
+def _site_values(spec: str) -> Dict[str, float]:
+    values = {}
+    for pair in spec.split(","):
+        site, _, value = pair.partition("=")
+        if site.strip() and value.strip():
+            values[site.strip()] = float(value)
+    return values
+
+
+# Per-site limits as "site=value" pairs; other sites get the defaults.
+# Requests per second to a site (JobSpy makes one per results page)
+SITE_RATES = _site_values(os.getenv("NAVICA_SCRAPE_RPS", "indeed=2,google=0.5"))
+DEFAULT_RATE = float(os.getenv("NAVICA_SCRAPE_DEFAULT_RPS", "1"))
+SCRAPE_BURST = int(os.getenv("NAVICA_SCRAPE_BURST", "3"))
+# scrape_jobs calls running against a site at once
+SITE_CONCURRENCY = {site: int(value) for site, value in _site_values(os.getenv("NAVICA_SCRAPE_CONCURRENCY", "indeed=4,google=2")).items()}
+DEFAULT_CONCURRENCY = int(os.getenv("NAVICA_SCRAPE_DEFAULT_CONCURRENCY", "2"))
+
+# Retries of a throttled request, and the pause after consecutive throttled
+# responses (doubling from the base, at least Retry-After, at most the maximum)
+SCRAPE_MAX_RETRIES = int(os.getenv("NAVICA_SCRAPE_MAX_RETRIES", "2"))
+BACKOFF_BASE = float(os.getenv("NAVICA_SCRAPE_BACKOFF_SECONDS", "2"))
+BACKOFF_MAX = float(os.getenv("NAVICA_SCRAPE_BACKOFF_MAX_SECONDS", "120"))
+
+# Longest a scrape waits for a slot or a request waits for its turn; beyond
+# that the site is skipped for this search (it is still backing off)
+SCRAPE_MAX_WAIT = float(os.getenv("NAVICA_SCRAPE_MAX_WAIT_SECONDS", "10"))
+
+# Share of the configured rate restored per successful response after a
+# backoff, and the lowest share a site is slowed down to
+RATE_RECOVERY_STEP = 0.02
+MIN_RATE_SHARE = 1 / 16
+
+# Responses that mean "slow down"
+THROTTLE_STATUSES = (429, 503)
+
+# Hand JobSpy's scrapers pooled sessions (0 keeps JobSpy's session per scrape)
+SESSION_POOLING = os.getenv("NAVICA_SCRAPE_SESSION_POOLING", "1") == "1"
+
+# HTTP(S) proxies for every site, comma-separated (JobSpy rotates through them)
+SCRAPE_PROXIES: List[str] = [proxy.strip() for proxy in os.getenv("NAVICA_SCRAPE_PROXIES", "").split(",") if proxy.strip()]
+
+SCRAPE_HTTP_REQUESTS = REGISTRY.counter(
+    "navica_scrape_http_requests_total",
+    "HTTP requests sent to a job site through its scheduler, by status code",
+    ("site", "status")
+)
+
+SCRAPE_THROTTLED = REGISTRY.counter(
+    "navica_scrape_throttled_total",
+    "Throttled responses (429/503) per job site, by what followed (retried, gave_up)",
+    ("site", "action")
+)
+
+SCRAPE_WAIT = REGISTRY.histogram(
+    "navica_scrape_wait_seconds",
+    "Time an HTTP request to a job site waited for the rate limit or a backoff pause",
+    ("site",)
+)
+
+SCRAPE_RATE = REGISTRY.gauge(
+    "navica_scrape_rate_per_second",
+    "Current request rate allowed per job site (lowered after throttled responses)",
+    ("site",)
+)
+
+SCRAPE_SESSIONS = REGISTRY.counter(
+    "navica_scrape_sessions_total",
+    "HTTP sessions handed to JobSpy's scrapers per job site (created, reused)",
+    ("site", "kind")
+)
+
+
+class ScrapeThrottledError(Exception):
+    """The site is backing off or saturated beyond the longest wait; the scrape was not made."""
+
+
+def _retry_after_seconds(value: Optional[str]) -> float:
+    """A Retry-After header (seconds or HTTP date) in seconds; 0 when absent or invalid."""
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class SiteScheduler:
+    """
+    Request-rate limit, concurrency cap and adaptive backoff for one job site,
+    shared by every scrape of the process.
+    """
+
+    def __init__(
+        self,
+        site: str,
+        rate: float,
+        burst: int = SCRAPE_BURST,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_retries: int = SCRAPE_MAX_RETRIES,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX,
+        max_wait: float = SCRAPE_MAX_WAIT
+    ):
+        self.site = site
+        self.max_rate = rate
+        self.rate = rate
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_wait = max_wait
+        self.bucket = TokenBucket(rate * 60, burst)
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._paused_until = 0.0
+        self._throttled_streak = 0
+        # Idle sessions per creation arguments, and (session, arguments, scrape thread) in use
+        self._idle_sessions: Dict[Tuple, List[requests.Session]] = {}
+        self._leased_sessions: List[Tuple[requests.Session, Tuple, threading.Thread]] = []
+        self._lock = threading.Lock()
+        SCRAPE_RATE.set(rate, site=site)
+
+    def paused_for(self) -> float:
+        """Seconds left in the current backoff pause."""
+        with self._lock:
+            return max(0.0, self._paused_until - time.monotonic())
+
+    @contextmanager
+    def slot(self):
+        """
+        Holds one of the site's concurrent scrape slots for the block.
+
+        Raises:
+            ScrapeThrottledError: When the site pauses longer than the longest
+                wait, or no slot frees up within it
+        """
+        if self.paused_for() > self.max_wait:
+            raise ScrapeThrottledError(f"{self.site} is backing off")
+        if not self._slots.acquire(timeout=self.max_wait):
+            raise ScrapeThrottledError(f"No free scrape slot for {self.site}")
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._reclaim_sessions(threading.current_thread())
+            self._slots.release()
+
+    def wait_turn(self) -> bool:
+        """
+        Blocks until the site may be sent a request (backoff pause, then rate limit).
+
+        Returns:
+            False, without waiting, when that would take longer than the longest wait
+        """
+        started = time.monotonic()
+        while True:
+            pause = self.paused_for()
+            wait = pause if pause > 0 else self.bucket.try_acquire()
+            if wait <= 0:
+                SCRAPE_WAIT.observe(time.monotonic() - started, site=self.site)
+                return True
+            if time.monotonic() - started + wait > self.max_wait:
+                return False
+            time.sleep(wait)
+
+    def record(self, status: int, retry_after: Optional[str] = None) -> bool:
+        """
+        Adapts the request rate to a response: a throttled one halves it and
+        starts a pause, a successful one restores part of it.
+
+        Returns:
+            Whether the response was throttled
+        """
+        if status in THROTTLE_STATUSES:
+            with self._lock:
+                if self._paused_until > time.monotonic():
+                    # Sent before the current pause began: it is already backed off for
+                    return True
+                self._throttled_streak += 1
+                backoff = self.backoff_base * 2 ** (self._throttled_streak - 1)
+                pause = min(self.backoff_max, max(backoff, _retry_after_seconds(retry_after)))
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+                self.rate = max(self.max_rate * MIN_RATE_SHARE, self.rate / 2)
+                rate = self.rate
+            logger.warning(
+                "Job site throttled the scraper",
+                extra={"site": self.site, "status": status, "pause_seconds": round(pause, 1), "rate": rate}
+            )
+        elif status < 400:
+            with self._lock:
+                self._throttled_streak = 0
+                if self.rate >= self.max_rate:
+                    return False
+                self.rate = rate = min(self.max_rate, self.rate + self.max_rate * RATE_RECOVERY_STEP)
+        else:
+            return False
+        throttled = status in THROTTLE_STATUSES
+        self.bucket.set_rate(rate * 60, drain=throttled)
+        SCRAPE_RATE.set(rate, site=self.site)
+        return throttled
+
+    def send(self, request: Callable[..., requests.Response], method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Sends one request in the site's turn, retrying throttled responses
+        after the backoff pause while that fits in the longest wait.
+
+        Args:
+            request: The session's own `request` method
+            method, url, kwargs: As for `requests.Session.request`
+
+        Returns:
+            The response (the last throttled one when retries ran out)
+
+        Raises:
+            ScrapeThrottledError: When the site could not be sent the request at all
+        """
+        response = None
+        for attempt in range(self.max_retries + 1):
+            if not self.wait_turn():
+                if response is None:
+                    raise ScrapeThrottledError(f"{self.site} is backing off")
+                break
+            response = request(method, url, **kwargs)
+            SCRAPE_HTTP_REQUESTS.inc(site=self.site, status=str(response.status_code))
+            if not self.record(response.status_code, response.headers.get("Retry-After")):
+                return response
+            if attempt < self.max_retries:
+                SCRAPE_THROTTLED.inc(site=self.site, action="retried")
+        SCRAPE_THROTTLED.inc(site=self.site, action="gave_up")
+        return response
+
+    def wrap(self, session: requests.Session) -> requests.Session:
+        """Routes every request of `session` through this scheduler."""
+        session.request = functools.partial(self.send, session.request)
+        return session
+
+    def pooled_session(self, create_session: Callable[..., object], **kwargs):
+        """
+        Stands in for JobSpy's `create_session`: an idle scheduled session
+        created with the same arguments (and the configured proxies), or a
+        new one. The session is leased to the calling scrape thread and
+        returns to the pool once that thread has ended or the scrape slot is
+        released. Sessions that are not `requests` sessions (JobSpy's
+        TLS-impersonating ones) are created fresh as before.
+        """
+        kwargs = {**kwargs, "proxies": SCRAPE_PROXIES or kwargs.get("proxies")}
+        key = tuple(sorted((name, tuple(value) if isinstance(value, list) else value) for name, value in kwargs.items()))
+        with self._lock:
+            self._reclaim_sessions()
+            idle = self._idle_sessions.get(key)
+            session = idle.pop() if idle else None
+        if session is None:
+            session = create_session(**kwargs)
+            if not isinstance(session, requests.Session):
+                return session
+            session = self.wrap(session)
+            kind = "created"
+        else:
+            kind = "reused"
+        with self._lock:
+            self._leased_sessions.append((session, key, threading.current_thread()))
+        SCRAPE_SESSIONS.inc(site=self.site, kind=kind)
+        return session
+
+    def _reclaim_sessions(self, releasing: Optional[threading.Thread] = None):
+        """
+        Returns sessions whose scrape is over (their thread has ended, or is
+        `releasing`) to the idle pool, keeping at most one per scrape slot.
+        The caller holds the lock.
+        """
+        leased = []
+        for lease in self._leased_sessions:
+            session, key, thread = lease
+            if thread.is_alive() and thread is not releasing:
+                leased.append(lease)
+                continue
+            idle = self._idle_sessions.setdefault(key, [])
+            if len(idle) < self.concurrency:
+                idle.append(session)
+            else:
+                session.close()
+        self._leased_sessions = leased
+
+
+def _install_session_pool(scheduler: SiteScheduler):
+    """Makes JobSpy's scraper module for the site take its sessions from `scheduler`."""
+    try:
+        module = importlib.import_module(f"jobspy.{scheduler.site}")
+        create_session = module.create_session
+    except (ImportError, AttributeError):
+        logger.info("JobSpy has no session hook for %s; its scrapes open their own sessions", scheduler.site)
+        return
+    module.create_session = functools.partial(scheduler.pooled_session, create_session)
+
+
+_schedulers: Dict[str, SiteScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_site_scheduler(site: str) -> SiteScheduler:
+    """
+    Returns the process-wide scheduler of a job site, created on first use
+    from NAVICA_SCRAPE_RPS, NAVICA_SCRAPE_CONCURRENCY and the backoff settings
+    (and hooked into JobSpy unless NAVICA_SCRAPE_SESSION_POOLING is 0).
+    """
+    with _schedulers_lock:
+        scheduler = _schedulers.get(site)
+        if scheduler is None:
+            scheduler = _schedulers[site] = SiteScheduler(
+                site,
+                rate=SITE_RATES.get(site, DEFAULT_RATE),
+                concurrency=SITE_CONCURRENCY.get(site, DEFAULT_CONCURRENCY)
+            )
+            if SESSION_POOLING:
+                _install_session_pool(scheduler)
+        return scheduler
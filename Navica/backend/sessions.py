@@ -0,0 +1,188 @@
+import logging
+import os
+import secrets
+from typing import Dict, List, Optional, Tuple
+
+from records import JobRecord, AnalysisRecord
+from agent_core import analyze_job_and_resume, compute_skill_gap, extract_job_skills, prepare_job_description
+from cache import get_cache
+from metrics import REGISTRY
+from logging_config import sampled
+from tracing import traced, current_span
+
+
+logger = logging.getLogger(__name__)
+
+# Header carrying the session token (returned by a search, sent back to refine it)
+SESSION_HEADER = "X-Navica-Session"
+
+# How long an idle session is kept
+SESSION_TTL = float(os.getenv("NAVICA_SESSION_TTL", "1800"))
+
+# Size bound of the in-process tier of the session store
+SESSION_CACHE_MAX_BYTES = int(float(os.getenv("NAVICA_SESSION_CACHE_MB", "32")) * 1024 * 1024)
+
+# Sources whose suggestion was skipped for load or time reasons; worth another try
+_RETRY_SOURCES = ("deadline", "degraded")
+
+# Stored in the shared cache, so a refinement can land on any worker
+session_cache = get_cache("sessions", SESSION_TTL, l1_max_bytes=SESSION_CACHE_MAX_BYTES)
+
+SESSION_REQUESTS = REGISTRY.counter(
+    "navica_session_requests_total",
+    "Searches by session outcome (new, refined, refetched, expired)",
+    ("outcome",)
+)
+
+SESSION_JOBS = REGISTRY.counter(
+    "navica_session_jobs_total",
+    "Jobs of session searches by whether their analysis was reused or recomputed",
+    ("result",)
+)
+
+
+class AnalysisSession:
+    """
+    Analysis state of one user's search, kept between requests.
+
+    Holds the fetched postings, the skills extracted from each, and the last
+    analysis per job, so a refinement only recomputes the skill gap and only
+    calls Gemini for jobs whose gap changed.
+    """
+
+    __slots__ = ("token", "search", "jobs", "job_skills", "analyses")
+
+    def __init__(
+        self,
+        token: str,
+        search: Tuple,
+        jobs: List[JobRecord],
+        job_skills: Optional[Dict[str, List[str]]] = None,
+        analyses: Optional[Dict[str, AnalysisRecord]] = None
+    ):
+        self.token = token
+        self.search = tuple(search)
+        self.jobs = jobs
+        self.job_skills = job_skills or {}
+        self.analyses = analyses or {}
+
+    @staticmethod
+    def search_key(selected_roles: List[str], experience_level: str, work_model: str) -> Tuple:
+        """What the fetched postings depend on; skill edits alone reuse them."""
+        return (sorted(selected_roles or []), experience_level, work_model)
+
+    def replace_jobs(self, search: Tuple, jobs: List[JobRecord]):
+        """Switches to newly fetched postings, keeping what is known about postings seen before."""
+        job_ids = {job.job_id for job in jobs}
+        self.search = tuple(search)
+        self.jobs = jobs
+        self.job_skills = {job_id: skills for job_id, skills in self.job_skills.items() if job_id in job_ids}
+        self.analyses = {job_id: analysis for job_id, analysis in self.analyses.items() if job_id in job_ids}
+
+    def _reusable(self, job: JobRecord, user_skills: List[str]) -> Optional[AnalysisRecord]:
+        """The job's previous analysis when it still holds for `user_skills`, else None."""
+        skills = self.job_skills.get(job.job_id)
+        previous = self.analyses.get(job.job_id)
+        if skills is None or previous is None or previous.suggestion_source in _RETRY_SOURCES:
+            return None
+        _, _, matched_final, missing_final = compute_skill_gap(job.job_description, skills, user_skills)
+        if tuple(matched_final) == previous.matched_skills and tuple(missing_final) == previous.missing_skills:
+            return previous
+        return None
+
+    def reusable_analyses(self, user_skills: List[str]) -> Dict[str, AnalysisRecord]:
+        """
+        Previous analyses that still hold for `user_skills`, by job_id. A
+        refinement has work to do when this covers fewer jobs than the session.
+        """
+        reusable = {}
+        for job in self.jobs:
+            previous = self._reusable(job, user_skills)
+            if previous is not None:
+                reusable[job.job_id] = previous
+        return reusable
+
+    @traced("session.analyze")
+    async def analyze(
+        self,
+        user_skills: List[str],
+        use_llm: bool = True,
+        reusable: Optional[Dict[str, AnalysisRecord]] = None
+    ) -> List[Tuple[JobRecord, AnalysisRecord]]:
+        """
+        Analyzes every posting of the session against `user_skills`.
+
+        A job's previous analysis is reused when its shortened matched/missing
+        lists are unchanged (its suggestion would be the same), unless that
+        suggestion was skipped for time or load reasons.
+
+        Args:
+            user_skills: The user's skills
+            use_llm: False gives recomputed jobs rule-based suggestions (degraded mode)
+            reusable: `reusable_analyses(user_skills)` when the caller already has it
+
+        Returns:
+            (job, analysis) pairs in posting order; jobs that failed are left out
+        """
+        if reusable is None:
+            reusable = self.reusable_analyses(user_skills)
+        results = []
+        reused = 0
+        for job in self.jobs:
+            try:
+                previous = reusable.get(job.job_id)
+                if previous is not None:
+                    results.append((job, previous))
+                    reused += 1
+                    continue
+
+                prepared = prepare_job_description(job.job_description)
+                skills = self.job_skills.get(job.job_id)
+                if skills is None:
+                    skills = self.job_skills[job.job_id] = await extract_job_skills(job.job_description, prepared)
+
+                analysis = await analyze_job_and_resume(
+                    job_desc=job.job_description,
+                    user_skills=user_skills,
+                    job_title=job.title,
+                    use_llm=use_llm,
+                    job_skills=skills,
+                    prepared=prepared
+                )
+                self.analyses[job.job_id] = analysis
+                results.append((job, analysis))
+            except Exception as e:
+                logger.error("Error analyzing job %s: %s", job.title, e)
+                # Continue with other jobs even if one fails
+                continue
+
+        SESSION_JOBS.inc(reused, result="reused")
+        SESSION_JOBS.inc(len(results) - reused, result="recomputed")
+        logger.info("Session analyzed", extra=sampled(jobs=len(self.jobs), reused=reused))
+        current_span().set_attributes(jobs=len(self.jobs), reused=reused)
+        return results
+
+
+def new_session(search: Tuple, jobs: List[JobRecord]) -> AnalysisSession:
+    return AnalysisSession(secrets.token_urlsafe(16), search, jobs)
+
+
+async def load_session(token: Optional[str]) -> Optional[AnalysisSession]:
+    """The session for `token`, or None when there is none (or it expired)."""
+    if not token:
+        return None
+    state = await session_cache.aget(token)
+    if state is None:
+        SESSION_REQUESTS.inc(outcome="expired")
+        return None
+    return AnalysisSession(token, state["search"], state["jobs"], state["job_skills"], state["analyses"])
+
+
+async def save_session(session: AnalysisSession):
+    """Stores the session (restarting its TTL)."""
+    await session_cache.aset(session.token, {
+        "search": list(session.search),
+        "jobs": session.jobs,
+        "job_skills": session.job_skills,
+        "analyses": session.analyses,
+    })
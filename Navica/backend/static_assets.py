@@ -0,0 +1,199 @@
+"""
+Static frontend assets, loaded and precompressed once and served from memory.
+
+Assets are answered with ETag / Last-Modified validators and Cache-Control,
+conditional requests get 304, and clients that accept brotli or gzip get the
+precompressed body. Serving therefore costs no disk I/O or compression on the
+API workers; to take it off them entirely, export the files for a reverse
+proxy or CDN:
+
+    python static_assets.py --export ./public
+"""
+import argparse
+import email.utils
+import gzip
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from responses import choose_coding
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+
+logger = logging.getLogger(__name__)
+
+# Re-read assets whose file changed on every request (for frontend development)
+STATIC_RELOAD = os.getenv("NAVICA_STATIC_RELOAD", "0") == "1"
+
+# Cache lifetimes: pages are revalidated often (cheap with ETags), images are kept long
+HTML_MAX_AGE = int(os.getenv("NAVICA_STATIC_HTML_MAX_AGE", "300"))
+ASSET_MAX_AGE = int(os.getenv("NAVICA_STATIC_MAX_AGE", str(7 * 24 * 3600)))
+
+# Smaller bodies are not worth compressing
+COMPRESS_MIN_BYTES = 512
+
+# Already compressed formats
+_INCOMPRESSIBLE = ("image/png", "image/jpeg", "image/webp")
+
+_BACKEND_DIR = Path(__file__).parent
+
+# URL path -> (file, media type, max-age); files that do not exist are skipped
+# (the Docker image only contains the backend directory)
+ASSET_FILES = {
+    "/": (_BACKEND_DIR / "index.html", "text/html; charset=utf-8", HTML_MAX_AGE),
+    "/navica-app.html": (_BACKEND_DIR.parent / "navica-app.html", "text/html; charset=utf-8", HTML_MAX_AGE),
+    "/static/navica-logo.png": (_BACKEND_DIR.parent.parent / "NAVICA LOGO.png", "image/png", ASSET_MAX_AGE),
+}
+
+
+class StaticAsset:
+    """One file held in memory with its precompressed variants and validators."""
+
+    __slots__ = ("path", "media_type", "max_age", "mtime", "body", "encoded", "etag", "last_modified")
+
+    def __init__(self, path: Path, media_type: str, max_age: int):
+        self.path = path
+        self.media_type = media_type
+        self.max_age = max_age
+        self.load()
+
+    def load(self):
+        self.mtime = self.path.stat().st_mtime
+        self.body = self.path.read_bytes()
+        self.etag = '"' + hashlib.blake2b(self.body, digest_size=8).hexdigest() + '"'
+        self.last_modified = email.utils.formatdate(int(self.mtime), usegmt=True)
+
+        # content-coding -> body, only where it saves bytes
+        self.encoded: Dict[str, bytes] = {}
+        if len(self.body) >= COMPRESS_MIN_BYTES and self.media_type not in _INCOMPRESSIBLE:
+            candidates = {"gzip": gzip.compress(self.body, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                candidates["br"] = brotli.compress(self.body, quality=11)
+            self.encoded = {coding: data for coding, data in candidates.items() if len(data) < len(self.body)}
+
+    def reload_if_changed(self):
+        try:
+            if self.path.stat().st_mtime != self.mtime:
+                self.load()
+                logger.info("Reloaded static asset %s", self.path.name)
+        except OSError as e:
+            logger.warning("Could not reload static asset %s: %s", self.path, e)
+
+    def etag_for(self, coding: Optional[str]) -> str:
+        # Each representation gets its own validator ("<hash>-br")
+        return self.etag if coding is None else self.etag[:-1] + "-" + coding + '"'
+
+
+def _not_modified(request: Request, asset: StaticAsset) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Any representation of the current content matches, weak or strong
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return any(tag == asset.etag or (tag.startswith(asset.etag[:-1] + "-")) for tag in tags)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(asset.mtime) <= since
+    return False
+
+
+class StaticAssets:
+    """The registry of served assets (URL path -> StaticAsset)."""
+
+    def __init__(self, files: Dict[str, Tuple[Path, str, int]], reload: bool = STATIC_RELOAD):
+        self.reload = reload
+        self.assets: Dict[str, StaticAsset] = {}
+        for url, (path, media_type, max_age) in files.items():
+            if path.is_file():
+                self.assets[url] = StaticAsset(path, media_type, max_age)
+            else:
+                logger.info("Static asset %s not found; %s is not served", path, url)
+
+    def get(self, url: str) -> Optional[StaticAsset]:
+        asset = self.assets.get(url)
+        if asset is not None and self.reload:
+            asset.reload_if_changed()
+        return asset
+
+    def response(self, request: Request, url: str) -> Optional[Response]:
+        """
+        The response for a GET/HEAD of `url`: 304 when the client's copy is
+        current, otherwise the best encoding the client accepts.
+
+        Returns:
+            The response, or None when `url` is not a known asset
+        """
+        asset = self.get(url)
+        if asset is None:
+            return None
+
+        coding = choose_coding(request.headers.get("accept-encoding", ""), asset.encoded)
+        headers = {
+            "ETag": asset.etag_for(coding),
+            "Last-Modified": asset.last_modified,
+            "Cache-Control": "no-cache" if self.reload else f"public, max-age={asset.max_age}",
+            "Vary": "Accept-Encoding",
+        }
+        if _not_modified(request, asset):
+            return Response(status_code=304, headers=headers)
+
+        body = asset.encoded[coding] if coding else asset.body
+        if coding:
+            headers["Content-Encoding"] = coding
+        if request.method == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            body = b""
+        return Response(content=body, media_type=asset.media_type, headers=headers)
+
+    def export(self, directory: Path) -> List[Path]:
+        """Writes every asset and its .gz/.br variants (for nginx gzip_static / brotli_static or a CDN)."""
+        written = []
+        suffixes = {"gzip": ".gz", "br": ".br"}
+        for url, asset in self.assets.items():
+            target = directory / (url.strip("/") or "index.html")
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(asset.body)
+            written.append(target)
+            for coding, data in asset.encoded.items():
+                variant = target.with_name(target.name + suffixes[coding])
+                variant.write_bytes(data)
+                written.append(variant)
+        return written
+
+
+_assets: Optional[StaticAssets] = None
+
+
+def get_static_assets() -> StaticAssets:
+    """Loads (once per process) and returns the static assets."""
+    global _assets
+    if _assets is None:
+        _assets = StaticAssets(ASSET_FILES)
+    return _assets
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Export the precompressed static assets")
+    parser.add_argument("--export", required=True, metavar="DIR", help="Directory to write the assets to")
+    args = parser.parse_args(argv)
+    for path in get_static_assets().export(Path(args.export)):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ Run this after installing dependencies and setting up the environment.
 """
 import asyncio
 from models import JobSearchParams
-from agent_core import fetch_jobs_from_apify, analyze_job_and_resume
+from agent_core import fetch_jobs_with_jobspy, analyze_job_and_resume
 from resume_processor import setup_nlp, extract_key_skills
 
 
@@ -40,12 +40,14 @@ async def test_skill_extraction():
 
 
 async def test_job_fetching():
-    """Test job fetching (mock data)."""
+    """Test job fetching (live JobSpy scrape)."""
     print("\nTesting job fetching...")
     try:
-        jobs = await fetch_jobs_from_apify(
-            skills=["python", "fastapi"],
-            roles=["Backend Developer"]
+        jobs = fetch_jobs_with_jobspy(
+            user_skills=["python", "fastapi"],
+            selected_roles=["Backend Developer"],
+            experience_level="3 to 4",
+            work_model="Remote"
         )
         print(f"✓ Fetched {len(jobs)} job postings")
         for job in jobs[:2]:  # Show first 2 jobs
@@ -75,7 +77,7 @@ async def test_llm_analysis():
         return True
     except Exception as e:
         print(f"✗ LLM analysis failed: {e}")
-        print("  Note: This requires OPENAI_API_KEY in .env file")
+        print("  Note: This requires GEMINI_API_KEY in .env file")
         return False
 
 
@@ -0,0 +1,42 @@
+import asyncio
+
+import cache_warmer
+
+
+def test_top_searches_use_the_most_common_skill_set():
+    searches = {
+        "a": {"roles": ["Data Engineer"], "experience_level": "3 to 4", "work_model": "Hybrid", "count": 4.0,
+              "skills": {"x": [["python", "sql"], 3.0], "y": [["java"], 1.0]}},
+        "b": {"roles": ["QA Engineer"], "experience_level": "1 to 2", "work_model": "Remote", "count": 1.0,
+              "skills": {"z": [["selenium"], 1.0]}},
+    }
+    assert cache_warmer.top_searches(searches, 1) == [(["python", "sql"], ["Data Engineer"], "3 to 4", "Hybrid")]
+    assert len(cache_warmer.top_searches(searches, 5)) == 2
+
+
+def test_seed_searches_only_without_recorded_searches(monkeypatch):
+    monkeypatch.setattr(cache_warmer, "WARM_SEED_FILTERS", [("1 to 2", "Remote")])
+    seeds = cache_warmer.top_searches({}, 2, ["QA Engineer", "Data Engineer", "DevOps Engineer"])
+    assert seeds == [([], ["QA Engineer"], "1 to 2", "Remote"), ([], ["Data Engineer"], "1 to 2", "Remote")]
+    searches = {"a": {"roles": ["Data Engineer"], "experience_level": "3 to 4", "work_model": "Hybrid", "count": 1.0,
+                      "skills": {"x": [["python"], 1.0]}}}
+    assert cache_warmer.top_searches(searches, 2, ["QA Engineer"]) == [(["python"], ["Data Engineer"], "3 to 4", "Hybrid")]
+
+
+def test_only_one_worker_takes_the_lease():
+    cache_warmer.warm_cache.l1.clear()
+    assert asyncio.run(cache_warmer._acquire_lease("a"))
+    assert not asyncio.run(cache_warmer._acquire_lease("b"))
+    assert cache_warmer.warm_cache.get("lease") == "a"
+    cache_warmer.warm_cache.l1.clear()
+
+
+def test_cycle_without_recorded_searches_is_skipped(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("nothing should be scraped")
+
+    monkeypatch.setattr(cache_warmer, "fetch_jobs_with_jobspy", fail)
+    cache_warmer.warm_cache.set("stats", {"updated": 0, "searches": {}})
+    outcomes = asyncio.run(cache_warmer.warm_once("test"))
+    assert outcomes == {"warmed": 0, "failed": 0, "over_budget": 0, "busy": 0}
+    assert cache_warmer.warm_cache.get("lease") is None
@@ -0,0 +1,38 @@
+import pandas as pd
+
+from experience_filter import EXPERIENCE_RULES, experience_match_positions, extract_years_of_experience
+
+
+def test_years_are_only_taken_from_experience_requirements():
+    text = "Senior engineer. 10+ years required. We offer 2 years of tuition support."
+    assert extract_years_of_experience(text) == [10]
+    assert extract_years_of_experience("Junior role, 0-1 years. Founded 10 years ago.") == []
+    assert extract_years_of_experience("Minimum 1 year in a similar role.") == [1]
+    assert extract_years_of_experience("3-5 years of professional software development") == [3]
+    assert extract_years_of_experience("Experience: 2 yrs") == [2]
+
+
+def test_unrelated_year_counts_do_not_pass_the_filter():
+    junior = EXPERIENCE_RULES["1 to 2"]
+    senior = EXPERIENCE_RULES["above 5"]
+    assert not junior.matches_description("Great engineer. 10+ years required. We offer 2 years of tuition support.")
+    assert not senior.matches_description("Small team, 0-1 years. Founded 10 years ago.")
+
+
+def test_minimum_required_years_decides():
+    senior = EXPERIENCE_RULES["above 5"]
+    mid = EXPERIENCE_RULES["3 to 4"]
+    assert senior.matches_description("We need 7+ years of experience with Go.")
+    # The smallest requirement is the entry bar for the posting
+    assert not senior.matches_description("2+ years experience with Python and 6+ years experience overall")
+    assert mid.matches_description("Requirements: at least 4 yrs building APIs")
+    assert not mid.matches_description("Requirements: at least 6 yrs building APIs")
+
+
+def test_title_and_keyword_matches_still_apply():
+    df = pd.DataFrame({
+        "title": ["Junior Developer", "Developer", "Developer"],
+        "description": ["", "Entry-level position", "8+ years of experience"],
+    })
+    assert experience_match_positions(df, "1 to 2") == [0, 1]
+    assert experience_match_positions(df, "above 5") == [2]
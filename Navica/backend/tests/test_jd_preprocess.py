@@ -0,0 +1,55 @@
+from jd_preprocess import BOILERPLATE, GENERAL, JD_BYTES, PREFERRED, REQUIRED, RESPONSIBILITIES, preprocess_job_description, split_sections
+
+
+def test_content_lines_are_not_taken_for_headings():
+    text = "Requirements\nPython experience\nStrong SQL skills\nDocker"
+    assert split_sections(text) == [(REQUIRED, ["Python experience", "Strong SQL skills", "Docker"])]
+
+
+def test_bare_heading_phrases_open_sections():
+    text = "We are hiring.\nKey Responsibilities\nBuild APIs\nPreferred Qualifications\nGo\nBENEFITS\nHealth insurance"
+    assert split_sections(text) == [
+        (GENERAL, ["We are hiring."]),
+        (RESPONSIBILITIES, ["Build APIs"]),
+        (PREFERRED, ["Go"]),
+        (BOILERPLATE, ["Health insurance"]),
+    ]
+
+
+def test_inline_boilerplate_field_drops_only_its_line():
+    text = "## Requirements\n- Python\nSchedule: Monday to Friday\n- SQL\nJob Type: Full-time\n- Docker"
+    assert split_sections(text) == [(REQUIRED, ["Python", "SQL", "Docker"])]
+
+
+def test_requirement_heading_text_is_kept():
+    text = "**Experience with AWS:**\n- Terraform\nSkills: Python, SQL"
+    assert split_sections(text) == [(REQUIRED, ["Experience with AWS", "Terraform"]), (REQUIRED, ["Python, SQL"])]
+
+
+def test_preprocess_drops_boilerplate_and_markup():
+    text = (
+        "**Senior Backend Developer**\n"
+        "## What you'll do\nDesign services in [Python](https://python.org)\n"
+        "## Requirements\n- C\\+\\+ and SQL\n- We are an equal opportunity employer\n"
+        "## Nice to have\n- Kubernetes\n"
+        "## About us\nFounded in 1999, we sell shoes.\n"
+    )
+    prepared = preprocess_job_description(text)
+    assert prepared.required == "C++ and SQL\nWe are an equal opportunity employer"
+    assert prepared.preferred == "Kubernetes"
+    assert prepared.other == "Senior Backend Developer\nDesign services in Python"
+    assert "shoes" not in prepared.relevant_text
+    assert prepared.preferred_skills(["sql", "kubernetes"]) == ["kubernetes"]
+
+
+def test_preprocess_falls_back_to_all_text_when_nothing_relevant_is_left():
+    prepared = preprocess_job_description("## Benefits\nPython training budget")
+    assert prepared.relevant_text == "Python training budget"
+
+
+def test_preprocess_counts_bytes_of_cached_descriptions():
+    text = "## Requirements\nGo and Rust"
+    preprocess_job_description(text)
+    before = JD_BYTES.value(stage="raw")
+    assert preprocess_job_description(text).required == "Go and Rust"
+    assert JD_BYTES.value(stage="raw") - before == len(text)
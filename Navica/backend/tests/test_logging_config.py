@@ -0,0 +1,39 @@
+import json
+import logging
+
+import pytest
+
+import logging_config
+
+
+@pytest.fixture
+def restore_root():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield root
+    logging_config.shutdown_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_records_after_shutdown_are_still_written(restore_root, capsys):
+    logging_config.setup_logging(level="INFO", log_format="json", sample_rate=1.0)
+    logging.getLogger("navica.test").info("queued")
+    logging_config.shutdown_logging()
+
+    assert not any(isinstance(handler, logging_config.ContextQueueHandler) for handler in restore_root.handlers)
+    logging.getLogger("navica.test").info("after shutdown")
+
+    messages = [json.loads(line)["msg"] for line in capsys.readouterr().out.splitlines()]
+    assert messages == ["queued", "after shutdown"]
+
+
+def test_setup_after_shutdown_routes_through_the_queue_again(restore_root):
+    logging_config.setup_logging(level="INFO", sample_rate=1.0)
+    logging_config.shutdown_logging()
+    logging_config.setup_logging(level="INFO", sample_rate=1.0)
+
+    assert [type(handler) for handler in restore_root.handlers] == [logging_config.ContextQueueHandler]
@@ -0,0 +1,27 @@
+import json
+
+from records import AnalysisRecord, JobRecord
+
+
+def make_job(job_id="job_1"):
+    return JobRecord(job_id, "Backend Developer", "Acme", "Remote", "Python and SQL", "https://example.com/job_1")
+
+
+def test_equal_records_hash_equal():
+    assert make_job() == make_job()
+    assert len({make_job(), make_job(), make_job("job_2")}) == 2
+
+    analysis = AnalysisRecord(["python"], ["sql"], "Learn SQL", "fallback")
+    same = AnalysisRecord(("python",), ("sql",), "Learn SQL", "fallback")
+    assert analysis == same and hash(analysis) == hash(same)
+
+
+def test_slim_results_match_the_search_result_schema():
+    from models import SearchResult
+    from records import job_result_dict, parse_job_fields
+    from responses import dumps
+
+    analysis = AnalysisRecord(["python"], ["sql"], "Learn SQL", "fallback")
+    for fields, description_chars in ((parse_job_fields(None), None), (parse_job_fields("title"), 0), (parse_job_fields(None), 5)):
+        result = json.loads(dumps(job_result_dict(make_job(), analysis, fields, description_chars)))
+        assert SearchResult.model_validate(result).model_dump(exclude_unset=True) == result
@@ -0,0 +1,48 @@
+import pytest
+
+import agent_core
+from benchmarks.corpora import make_jobs_dataframe
+
+
+class SiteFake:
+    """`scrape_jobs` stand-in serving a fixed number of postings per site."""
+
+    def __init__(self, available):
+        self.fixtures = {site: make_jobs_dataframe(count, 200, seed=index, site=site) for index, (site, count) in enumerate(available.items())}
+        self.calls = []
+
+    def __call__(self, site_name, results_wanted=15, offset=0, **kwargs):
+        site = site_name[0]
+        self.calls.append((site, offset))
+        return self.fixtures[site].iloc[offset:offset + results_wanted].reset_index(drop=True)
+
+
+@pytest.fixture
+def fake_sites(monkeypatch):
+    def install(available):
+        fake = SiteFake(available)
+        monkeypatch.setattr(agent_core, "scrape_jobs", fake)
+        monkeypatch.setattr(agent_core, "JOB_SITES", list(available))
+        monkeypatch.setattr(agent_core, "yield_tracker", agent_core.FilterYieldTracker())
+        return fake
+    return install
+
+
+def fetch(target_results):
+    return agent_core.fetch_jobs_with_jobspy(["python"], ["Backend Developer"], "", "Remote", target_results=target_results, refresh=True)
+
+
+def test_stops_when_every_site_returned_a_short_page(fake_sites):
+    # Both sites are exhausted after the first page: no follow-up scrapes
+    fake = fake_sites({"indeed": 4, "google": 3})
+    postings = fetch(target_results=50)
+    assert len(fake.calls) == 2
+    assert len(postings) == 7
+
+
+def test_only_sites_with_a_full_page_are_paged(fake_sites):
+    fake = fake_sites({"indeed": 400, "google": 3})
+    fetch(target_results=200)
+    follow_ups = [site for site, offset in fake.calls if offset > 0]
+    assert follow_ups and set(follow_ups) == {"indeed"}
+    assert len(fake.calls) == agent_core.MAX_SCRAPE_ROUNDS + 1
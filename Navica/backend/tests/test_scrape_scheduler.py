@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from benchmarks.fakes import ThrottlingServer
+from scrape_scheduler import RATE_RECOVERY_STEP, SiteScheduler
+
+
+def make_scheduler(rate=200.0, **kwargs):
+    return SiteScheduler("test", rate=rate, burst=5, concurrency=2, backoff_base=0.1, max_wait=5, **kwargs)
+
+
+def new_session(**kwargs):
+    return requests.Session()
+
+
+def test_throttled_request_backs_off_halves_the_rate_and_is_retried():
+    scheduler = make_scheduler()
+    with ThrottlingServer(rate=3, burst=1, retry_after=0.4) as server, scheduler.slot():
+        session = scheduler.pooled_session(new_session)
+        assert session.get(server.url).status_code == 200
+
+        started = time.monotonic()
+        response = session.get(server.url)
+        waited = time.monotonic() - started
+
+    assert response.status_code == 200
+    assert server.throttled == 1
+    # Paused for Retry-After before the retry
+    assert waited >= 0.4
+    # Halved by the 429, then one recovery step for the successful retry
+    assert scheduler.rate == pytest.approx(scheduler.max_rate * (0.5 + RATE_RECOVERY_STEP))
+
+
+def test_rate_recovers_after_successful_responses():
+    scheduler = make_scheduler()
+    scheduler.record(429, "0")
+    assert scheduler.rate == scheduler.max_rate / 2
+
+    with ThrottlingServer(rate=1000, burst=100) as server, scheduler.slot():
+        session = scheduler.pooled_session(new_session)
+        for _ in range(int(0.5 / RATE_RECOVERY_STEP)):
+            assert session.get(server.url).status_code == 200
+
+    assert server.throttled == 0
+    assert scheduler.rate == scheduler.max_rate
+
+
+def test_concurrent_scrapes_get_their_own_session():
+    scheduler = make_scheduler()
+    handed_out = []
+    ready = threading.Barrier(2)
+
+    def scrape():
+        with scheduler.slot():
+            handed_out.append(scheduler.pooled_session(new_session))
+            ready.wait()
+
+    threads = [threading.Thread(target=scrape) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert handed_out[0] is not handed_out[1]
+
+    # Released with the slots: reused by the next scrapes, but only for the same options
+    with scheduler.slot():
+        assert scheduler.pooled_session(new_session) in handed_out
+        assert scheduler.pooled_session(new_session, user_agent="other") not in handed_out
@@ -0,0 +1,28 @@
+from agent_core import compute_skill_gap
+from records import AnalysisRecord, JobRecord
+from sessions import AnalysisSession
+
+
+DESCRIPTION = "Requirements:\nPython and Docker experience. Kubernetes is a plus."
+
+
+def make_session(user_skills, source="gemini"):
+    job = JobRecord("job_1", "Backend Developer", "Acme", "Remote", DESCRIPTION, "https://example.com/job_1")
+    skills = ["python", "docker", "kubernetes"]
+    _, _, matched, missing = compute_skill_gap(DESCRIPTION, skills, user_skills)
+    return AnalysisSession(
+        "token", ("roles",), [job],
+        job_skills={"job_1": skills},
+        analyses={"job_1": AnalysisRecord(matched, missing, "suggestion", source)}
+    )
+
+
+def test_unchanged_gap_is_reusable():
+    session = make_session(["python"])
+    assert session.reusable_analyses(["python"]) == {"job_1": session.analyses["job_1"]}
+
+
+def test_changed_gap_or_skipped_suggestion_is_not_reusable():
+    assert make_session(["python"]).reusable_analyses(["python", "docker"]) == {}
+    assert make_session(["python"], source="degraded").reusable_analyses(["python"]) == {}
+    assert AnalysisSession("token", ("roles",), make_session(["python"]).jobs).reusable_analyses(["python"]) == {}
@@ -0,0 +1,31 @@
+import asyncio
+
+import agent_core
+
+
+def test_bulk_and_search_suggestions_see_the_same_skill_gap(monkeypatch):
+    seen = []
+
+    async def fake_gemini(**kwargs):
+        seen.append((kwargs["matched_skills"], kwargs["missing_skills"]))
+        return "suggestion", "gemini"
+
+    monkeypatch.setattr(agent_core, "_generate_suggestion_within_deadline", fake_gemini)
+    user_skills = ["python", "docker", "aws", "go"]
+    job_skills = ["rust", "kafka"]
+    description = "Requirements:\nRust and Kafka"
+
+    asyncio.run(agent_core.analyze_job_and_resume(description, user_skills, "Backend Developer", job_skills=job_skills))
+    _, missing, _, _ = agent_core.compute_skill_gap(description, job_skills, user_skills)
+    asyncio.run(agent_core.generate_suggestion(user_skills, [], missing, "Backend Developer"))
+
+    assert seen[0] == seen[1] == (["python", "docker", "aws"], ["rust", "kafka"])
+
+
+def test_degraded_suggestion_skips_gemini(monkeypatch):
+    async def fail(**kwargs):
+        raise AssertionError("Gemini should not be called")
+
+    monkeypatch.setattr(agent_core, "_generate_suggestion_within_deadline", fail)
+    suggestion, source = asyncio.run(agent_core.generate_suggestion(["python"], [], ["rust"], use_llm=False))
+    assert source == "degraded" and suggestion
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+import tracing
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracing.configure_tracing(sample_rate=1.0, exporter=str(path))
+    yield path
+    tracing.shutdown_tracing()
+    tracing.configure_tracing(sample_rate=0.0, exporter="")
+
+
+def read_spans(path):
+    tracing.shutdown_tracing()
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_spans_are_exported_with_their_parents(trace_file):
+    with tracing.start_trace("request") as root:
+        with tracing.start_span("child", size=3):
+            pass
+    spans = {span["name"]: span for span in read_spans(trace_file)}
+    assert spans["child"]["parentSpanId"] == root.span_id
+    assert spans["child"]["attributes"] == {"size": 3}
+    assert spans["request"]["status"] == {"code": "OK"}
+
+
+def test_span_ending_after_its_root_is_still_exported(trace_file):
+    with tracing.start_trace("request") as root:
+        # e.g. a Gemini call abandoned at the deadline, still running in the background
+        late = tracing.Span("background", root.trace, root.span_id)
+    late.end()
+    names = [span["name"] for span in read_spans(trace_file)]
+    assert names == ["request", "background"]
@@ -0,0 +1,321 @@
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import queue
+import random
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+
+# Fraction of requests that are traced (0 disables tracing entirely)
+DEFAULT_SAMPLE_RATE = 0.0
+# "stdout", a file path for JSON lines, or empty for no export
+DEFAULT_EXPORTER = ""
+
+# Span that is active in the current task/thread (None when not tracing)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("navica_current_span", default=None)
+
+
+class Trace:
+    """
+    Spans recorded for one request; exported together when the root span ends.
+    Spans that end later (e.g. a Gemini call abandoned at the deadline) are
+    exported on their own as they end.
+    """
+
+    __slots__ = ("trace_id", "spans", "exported", "lock")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List["Span"] = []
+        self.exported = False
+        self.lock = threading.Lock()
+
+    def finish(self):
+        """Hands the spans ended so far to the exporter; later spans follow one by one."""
+        with self.lock:
+            self.exported = True
+            spans, self.spans = self.spans, []
+        exporter = _exporter
+        if exporter is not None:
+            exporter.export(spans)
+
+
+class Span:
+    """
+    A timed operation within a trace. Exported as a Navica-specific JSON
+    object: the field names are borrowed from OTLP/JSON (traceId, spanId,
+    startTimeUnixNano, ...), but attributes are a plain object, the status
+    code is "OK" or "ERROR" rather than a number, and `durationMs` is added.
+    It is not OTLP: convert it before loading it into OTel tooling.
+    """
+
+    __slots__ = ("trace", "span_id", "parent_span_id", "name", "attributes", "start_ns", "end_ns", "status", "events")
+
+    def __init__(self, name: str, trace: Trace, parent_span_id: str = "", attributes: Optional[Dict[str, Any]] = None):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.status = "OK"
+        self.events: List[Dict[str, Any]] = []
+
+    def update_name(self, name: str):
+        self.name = name
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes):
+        self.events.append({"name": name, "timeUnixNano": time.time_ns(), "attributes": attributes})
+
+    def record_exception(self, error: BaseException):
+        self.status = "ERROR"
+        self.add_event("exception", **{"exception.type": type(error).__name__, "exception.message": str(error)})
+
+    def end(self):
+        if self.end_ns:
+            return
+        self.end_ns = time.time_ns()
+        with self.trace.lock:
+            late = self.trace.exported
+            if not late:
+                self.trace.spans.append(self)
+        exporter = _exporter
+        if late and exporter is not None:
+            exporter.export([self])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "events": self.events,
+            "status": {"code": self.status},
+        }
+
+
+class _NoopSpan:
+    """Returned when the request is not sampled so instrumentation costs nothing."""
+
+    __slots__ = ()
+    trace = None
+    span_id = ""
+
+    def update_name(self, name: str):
+        pass
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, **attributes):
+        pass
+
+    def add_event(self, name: str, **attributes):
+        pass
+
+    def record_exception(self, error: BaseException):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter:
+    """
+    Writes finished spans as JSON lines (one span per line) to stdout or a
+    file from a background thread, so exporting never blocks a request.
+    """
+
+    def __init__(self, target: str):
+        self.target = target
+        self._queue: queue.Queue = queue.Queue(maxsize=10000)
+        self._thread = threading.Thread(target=self._run, name="navica-trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, spans: List[Span]):
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            pass  # Drop traces rather than slow requests down
+
+    def _run(self):
+        while True:
+            spans = self._queue.get()
+            if spans is None:
+                break
+            lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+            try:
+                if self.target == "stdout":
+                    sys.stdout.write(lines)
+                    sys.stdout.flush()
+                else:
+                    with open(self.target, "a", encoding="utf-8") as f:
+                        f.write(lines)
+            except Exception as e:
+                print(f"Trace export failed: {e}", file=sys.stderr)
+
+    def shutdown(self, timeout: float = 5.0):
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+_sample_rate = float(os.getenv("NAVICA_TRACE_SAMPLE_RATE", DEFAULT_SAMPLE_RATE))
+_exporter: Optional[SpanExporter] = None
+
+
+def configure_tracing(sample_rate: Optional[float] = None, exporter: Optional[str] = None):
+    """
+    Sets the sampling rate and export target. Defaults come from the
+    NAVICA_TRACE_SAMPLE_RATE and NAVICA_TRACE_EXPORTER environment variables.
+
+    Args:
+        sample_rate: Fraction of requests to trace, between 0 and 1
+        exporter: "stdout", a file path for JSON lines, or "" to disable export
+    """
+    global _sample_rate, _exporter
+    if sample_rate is None:
+        sample_rate = float(os.getenv("NAVICA_TRACE_SAMPLE_RATE", DEFAULT_SAMPLE_RATE))
+    if exporter is None:
+        exporter = os.getenv("NAVICA_TRACE_EXPORTER", DEFAULT_EXPORTER)
+
+    _sample_rate = max(0.0, min(1.0, sample_rate))
+    if _exporter is not None and _exporter.target != exporter:
+        _exporter.shutdown()
+        _exporter = None
+    if exporter and _exporter is None:
+        _exporter = SpanExporter(exporter)
+
+
+def shutdown_tracing():
+    """Flushes and stops the exporter thread."""
+    global _exporter
+    if _exporter is not None:
+        _exporter.shutdown()
+        _exporter = None
+
+
+def _parse_traceparent(traceparent: Optional[str]):
+    """Parses a W3C `traceparent` header into (trace_id, parent_span_id, sampled)."""
+    if not traceparent:
+        return None
+    parts = traceparent.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = int(parts[3], 16) & 1 == 1
+    except ValueError:
+        return None
+    return parts[1], parts[2], sampled
+
+
+@contextmanager
+def start_trace(name: str, traceparent: Optional[str] = None, **attributes):
+    """
+    Starts the root span of a request. Whether the request is traced is
+    decided here: an incoming W3C `traceparent` header is honoured, otherwise
+    the request is sampled at the configured rate.
+
+    Yields:
+        The root span, or a no-op span when the request is not sampled
+    """
+    parent = _parse_traceparent(traceparent)
+    if parent is not None:
+        trace_id, parent_span_id, sampled = parent
+    else:
+        trace_id, parent_span_id = "", ""
+        sampled = _sample_rate > 0 and random.random() < _sample_rate
+
+    if not sampled or _exporter is None:
+        yield NOOP_SPAN
+        return
+
+    trace = Trace(trace_id or secrets.token_hex(16))
+    span = Span(name, trace, parent_span_id, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+        trace.finish()
+
+
+@contextmanager
+def start_span(name: str, **attributes):
+    """
+    Starts a child span of the active span. Does nothing (and costs almost
+    nothing) when the current request is not being traced.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+
+    span = Span(name, parent.trace, parent.span_id, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def traced(name: Optional[str] = None):
+    """
+    Decorator that runs a sync or async function inside a child span named
+    after it. The function can add attributes through `current_span()`.
+    """
+    def decorator(func):
+        span_name = name or func.__name__
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with start_span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with start_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def current_span():
+    """Returns the active span, or the no-op span when not tracing."""
+    return _current_span.get() or NOOP_SPAN
+
+
+def traceparent_header() -> Optional[str]:
+    """W3C `traceparent` value for the active span, for response headers or outgoing calls."""
+    span = _current_span.get()
+    if span is None:
+        return None
+    return f"00-{span.trace.trace_id}-{span.span_id}-01"